@@ -1,21 +1,258 @@
-from http.server import BaseHTTPRequestHandler
+"""
+Read API over the SQLite product store.
+
+    GET /products/<product_id>           one product
+    GET /products/<product_id>/history   price history (oldest first)
+    GET /products?q=&brand=&min_price=&max_price=&sort=&order=&limit=&cursor=
+                                         filtered listing, keyset-paginated via next_cursor
+    GET /health
+
+Responses carry an ETag and Last-Modified derived from the database file,
+so clients revalidate with a 304 until the next crawl is saved, and are
+gzipped when the client accepts it. Runs under Vercel's Python runtime
+(the `handler` class) or locally:
+
+    python api/index.py --db products.db --port 8000
+
+Missing indexes are built when the local server starts; before deploying a
+database to Vercel, build them once with
+
+    python api/index.py --db products.db --ensure-indexes
+"""
+import argparse
+import base64
+import gzip
+import hashlib
 import json
+import logging
+import os
+import sys
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jumia_scraper.query import KEYSET_COLUMNS, ProductQuery
+
+logger = logging.getLogger("jumia_scraper.api")
+
+DB_PATH = os.environ.get("PRODUCTS_DB", os.path.join(ROOT, "products.db"))
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+GZIP_MIN_BYTES = 1024
+JSON_FIELDS = ("category_path", "gtm_tags")
+
+_queries = {}
+
+
+def get_query(db_path: str) -> ProductQuery:
+    """One ProductQuery per database file (column metadata is cached on it)"""
+    query = _queries.get(db_path)
+    if query is None:
+        query = _queries[db_path] = ProductQuery(db_path)
+    return query
+
+
+def encode_cursor(key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    value, product_id = json.loads(base64.urlsafe_b64decode(padded))
+    return value, product_id
+
+
+def _decode_row(row):
+    for field in JSON_FIELDS:
+        if isinstance(row.get(field), str):
+            try:
+                row[field] = json.loads(row[field])
+            except ValueError:
+                pass
+    return row
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
 
 class handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
+    protocol_version = "HTTP/1.1"
+    # Keep-alive clients would otherwise wait on delayed ACKs between the header and body writes
+    disable_nagle_algorithm = True
+    db_path = DB_PATH
+
+    def log_message(self, format, *args):
+        pass
+
+    # ---------- Caching ----------
+
+    def _validators(self, path: str):
+        """ETag / Last-Modified of the database, or None when it does not exist"""
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None, None
+        mtime = stat.st_mtime
+        wal = self.db_path + "-wal"
+        if os.path.exists(wal):
+            mtime = max(mtime, os.stat(wal).st_mtime)
+        tag = hashlib.blake2b(f"{stat.st_size}:{mtime}:{path}".encode(), digest_size=8).hexdigest()
+        return f'W/"{tag}"', mtime
+
+    def _not_modified(self, etag, mtime) -> bool:
+        if etag is None:
+            return False
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            return etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    # ---------- Responses ----------
+
+    def _send_json(self, status: int, payload, etag=None, mtime=None):
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        encoding = None
+        if len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            encoding = "gzip"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if etag and status == 200:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+            self.send_header("Cache-Control", "public, max-age=0, must-revalidate")
         self.end_headers()
-        
-        response = {
-            "message": "Jumia Scraper API on Vercel",
-            "status": "running",
-            "note": "The Streamlit Dashboard cannot run on Vercel Serverless. Please deploy to Streamlit Cloud for the full experience.",
-            "links": {
-                "streamlit_cloud": "https://share.streamlit.io",
-                "github_repo": "https://github.com/crab-xieyujin/playwright_jumia"
-            }
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        route = parts.path.rstrip("/") or "/"
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        try:
+            if route == "/health":
+                self._send_json(200, {"status": "ok", "database": os.path.exists(self.db_path)})
+                return
+            if route == "/":
+                self._send_json(200, {
+                    "message": "Jumia Scraper API",
+                    "endpoints": ["/products", "/products/<product_id>", "/products/<product_id>/history", "/health"],
+                })
+                return
+
+            etag, mtime = self._validators(self.path)
+            if etag is None:
+                raise ApiError(503, "Product database not found")
+            if self._not_modified(etag, mtime):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            segments = [unquote(s) for s in route.split("/") if s]
+            if segments == ["products"]:
+                payload = self._search(params)
+            elif len(segments) == 2 and segments[0] == "products":
+                payload = get_query(self.db_path).get(segments[1])
+                if payload is None:
+                    raise ApiError(404, f"Unknown product {segments[1]}")
+                payload = _decode_row(payload)
+            elif len(segments) == 3 and segments[0] == "products" and segments[2] == "history":
+                history = get_query(self.db_path).price_history(segments[1], self._int(params, "limit", 500, 5000))
+                payload = {"product_id": segments[1], "history": history}
+            else:
+                raise ApiError(404, "Not found")
+            self._send_json(200, payload, etag, mtime)
+        except ApiError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except Exception:
+            logger.exception(f"Unhandled error serving {self.path}")
+            self._send_json(500, {"error": "Internal server error"})
+
+    @staticmethod
+    def _int(params, name, default, maximum):
+        try:
+            return max(1, min(maximum, int(params.get(name, default))))
+        except ValueError:
+            raise ApiError(400, f"{name} must be an integer")
+
+    @staticmethod
+    def _float(params, name):
+        if params.get(name) in (None, ""):
+            return None
+        try:
+            return float(params[name])
+        except ValueError:
+            raise ApiError(400, f"{name} must be a number")
+
+    def _search(self, params):
+        sort = params.get("sort") or None
+        if sort is not None and sort not in KEYSET_COLUMNS:
+            raise ApiError(400, f"sort must be one of {', '.join(KEYSET_COLUMNS)}")
+        after = None
+        if params.get("cursor"):
+            try:
+                after = decode_cursor(params["cursor"])
+            except (ValueError, TypeError):
+                raise ApiError(400, "Invalid cursor")
+        rows, next_key = get_query(self.db_path).seek(
+            search=params.get("q"),
+            brand=params.get("brand"),
+            min_price=self._float(params, "min_price"),
+            max_price=self._float(params, "max_price"),
+            sort_by=sort,
+            descending=params.get("order", "asc").lower() == "desc",
+            limit=self._int(params, "limit", DEFAULT_LIMIT, MAX_LIMIT),
+            after=after,
+        )
+        return {
+            "items": [_decode_row(row) for row in rows],
+            "next_cursor": encode_cursor(next_key) if next_key else None,
         }
-        
-        self.wfile.write(json.dumps(response).encode('utf-8'))
-        return
+
+
+def serve(db_path: str, port: int = 8000, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    handler.db_path = db_path
+    if os.path.exists(db_path):
+        # Build missing indexes now rather than inside a request
+        get_query(db_path).ensure_indexes()
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read API over a products.db")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--ensure-indexes", action="store_true", help="Build missing indexes and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.ensure_indexes:
+        get_query(args.db).ensure_indexes()
+        print(f"Indexes ready on {args.db}")
+        sys.exit(0)
+
+    server = serve(args.db, args.port, args.host)
+    print(f"Serving {args.db} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,155 @@
+"""
+Load test for the read API (api/index.py).
+
+Builds a synthetic products.db through StorageHandler (two crawls, so
+price_history has data), serves it on a local port and drives it with
+concurrent keep-alive clients over a mix of product lookups, filtered
+keyset pages (following next_cursor), price history and ETag
+revalidations. Reports p50/p95/p99 per endpoint; exits 1 when any p99 is
+over --budget-ms.
+
+    python benchmarks/bench_api.py --products 50000 --requests 5000 --clients 8
+"""
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.index import serve
+from jumia_scraper.batch import ProductBatch
+from jumia_scraper.metrics import percentile
+from jumia_scraper.storage import StorageHandler
+
+BRANDS = ["Samsung", "Tecno", "Infinix", "Itel", "Oppo", "Xiaomi", "Nokia", "Apple"]
+
+
+def build_db(path, n):
+    for crawl in range(2):
+        crawled_at = datetime(2026, 10, 1) + timedelta(days=crawl)
+        batch = ProductBatch()
+        for i in range(n):
+            batch.append_values(
+                product_id=f"GE{i:08d}",
+                name=f"{BRANDS[i % len(BRANDS)]} Phone {i % 97} {64 * (1 + i % 4)}GB",
+                brand=BRANDS[i % len(BRANDS)],
+                url=f"https://www.jumia.co.ke/product-{i}.html",
+                currency="KES",
+                current_price=5000.0 + (i * 37) % 90000 - crawl * (i % 3) * 100,
+                old_price=9000.0 + (i * 37) % 90000,
+                discount_percentage=float(i % 60),
+                rating=round(3 + (i % 20) / 10, 1),
+                review_count=i % 500,
+                category_path=["Phones & Tablets", "Mobile Phones"],
+                crawled_at=crawled_at,
+            )
+        StorageHandler(path, "sqlite").save(batch)
+
+
+class Client(threading.Thread):
+    def __init__(self, port, n_products, requests, latencies, errors, seed):
+        super().__init__(daemon=True)
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        self.n_products = n_products
+        self.requests = requests
+        self.latencies = latencies
+        self.errors = errors
+        self.rng = random.Random(seed)
+        self.etags = {}
+        self.cursor = None
+
+    def get(self, kind, path, revalidate=False):
+        headers = {"Accept-Encoding": "gzip"}
+        if revalidate and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        started = time.perf_counter()
+        self.conn.request("GET", path, headers=headers)
+        response = self.conn.getresponse()
+        body = response.read()
+        self.latencies[kind].append(time.perf_counter() - started)
+        if response.status == 200:
+            self.etags[path] = response.getheader("ETag")
+            if response.getheader("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            return json.loads(body)
+        if response.status != 304:
+            self.errors[f"{kind} {response.status}"] += 1
+        return None
+
+    def run(self):
+        for _ in range(self.requests):
+            roll = self.rng.random()
+            pid = f"GE{self.rng.randrange(self.n_products):08d}"
+            if roll < 0.35:
+                self.get("product", f"/products/{pid}")
+            elif roll < 0.5:
+                self.get("history", f"/products/{pid}/history")
+            elif roll < 0.8:
+                if self.cursor:
+                    payload = self.get("search_next", f"/products?brand=Samsung&sort=current_price&cursor={self.cursor}")
+                else:
+                    payload = self.get("search", "/products?brand=Samsung&sort=current_price&min_price=10000")
+                self.cursor = payload and payload["next_cursor"]
+            elif roll < 0.9:
+                brand = self.rng.choice(BRANDS).lower()
+                self.get("fulltext", f"/products?q={brand}+{self.rng.randrange(97)}&limit=20")
+            else:
+                self.get("revalidate", f"/products/GE{self.rng.randrange(50):08d}", revalidate=True)
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read API load test")
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--requests", type=int, default=5000, help="Total requests across clients")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="p99 budget per endpoint")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db = os.path.join(workdir, "products.db")
+        started = time.perf_counter()
+        build_db(db, args.products)
+        print(f"built {args.products} products x 2 crawls in {time.perf_counter() - started:.1f}s")
+
+        server = serve(db, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        clients = [Client(port, args.products, args.requests // args.clients, latencies, errors, seed)
+                   for seed in range(args.clients)]
+        started = time.perf_counter()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - started
+        server.shutdown()
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{total} requests in {elapsed:.2f}s ({total / elapsed:.0f} req/s) with {args.clients} clients")
+    failed = False
+    for kind, values in sorted(latencies.items()):
+        p99 = percentile(values, 99) * 1000
+        over = p99 > args.budget_ms
+        failed |= over
+        print(f"  {kind:<12} x{len(values):<6} p50 {percentile(values, 50) * 1000:7.2f}ms  "
+              f"p95 {percentile(values, 95) * 1000:7.2f}ms  p99 {p99:7.2f}ms  {'OVER BUDGET' if over else ''}")
+    for kind, n in errors.items():
+        print(f"  error {kind}: {n}")
+    sys.exit(1 if failed or errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Scaling benchmark for the sharded crawler (jumia_scraper.crawl).
+
+Serves the fixture site, queues categories x pages listing tasks and
+crawls them with 1, 2, 4, ... worker processes, reporting pages/s and
+scaling efficiency against the single-worker run.
+
+    python benchmarks/bench_crawl.py --categories 4 --pages 5 --workers 1 2 4 8
+
+Requires playwright with Chromium installed (playwright install chromium).
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import start_site
+from jumia_scraper.crawl import enqueue, run
+from jumia_scraper.taskqueue import TaskQueue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded crawl scaling benchmark against a local fixture site")
+    parser.add_argument("--categories", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    results = []
+    with start_site(pages=args.pages) as site, tempfile.TemporaryDirectory() as workdir:
+        # Workers are spawned processes and read their settings from the environment
+        os.environ.update({"BASE_URL": site.url, "RATE_LIMIT": "1000", "RATE_LIMIT_MAX": "1000", "MAX_RETRIES": "1",
+                           "STORAGE_STATE_DIR": ""})
+        categories = [f"{site.url}/category-{i}/" for i in range(args.categories)]
+        for workers in args.workers:
+            queue_path = os.path.join(workdir, f"queue-{workers}.db")
+            output = os.path.join(workdir, f"products-{workers}.db")
+            enqueue(TaskQueue(queue_path), ["ng"], categories, args.pages)
+            started = time.perf_counter()
+            run(queue_path, workers, output, "sqlite", merge_interval=1.0)
+            elapsed = time.perf_counter() - started
+            pages = args.categories * args.pages
+            with sqlite3.connect(output) as conn:
+                products = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+            results.append((workers, elapsed, pages / elapsed, products))
+
+    base_rate = results[0][2] / results[0][0]
+    print(f"{'workers':>8} {'seconds':>9} {'pages/s':>9} {'products':>9} {'efficiency':>11}")
+    for workers, elapsed, rate, products in results:
+        print(f"{workers:>8} {elapsed:>9.2f} {rate:>9.2f} {products:>9} {rate / (base_rate * workers):>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
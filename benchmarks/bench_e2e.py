@@ -0,0 +1,234 @@
+"""
+End-to-end benchmark against a local copy of the site.
+
+Serves homepage.html / category.html / subcategory.html (with synthetic
+?page=N variants, see fixtures.start_site) and runs the real pipeline
+against it: JumiaScraper -> StorageHandler (sqlite + jsonl), then
+jumia_category_stats.py in with_counts mode. Reports pages/s, products/s,
+peak RSS and per-stage latency percentiles, and saves everything as JSON
+(tagged with the git commit) so runs can be compared across commits.
+
+    python benchmarks/bench_e2e.py --pages 5 --leaves 10
+    python benchmarks/bench_e2e.py --compare benchmarks/results/e2e-<old>.json
+
+Requires playwright with Chromium installed (playwright install chromium).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import ROOT, start_site
+from jumia_scraper.config import ScraperConfig
+from jumia_scraper.metrics import percentile
+from jumia_scraper.scraper import JumiaScraper
+from jumia_scraper.storage import StorageHandler
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+QUANTILES = (50, 90, 95, 99)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class RssSampler:
+    """Peak resident memory of this process plus its descendants (the browser), sampled from /proc"""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak_total = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def _rss_by_pid():
+        rss, parents = {}, {}
+        page = os.sysconf("SC_PAGE_SIZE")
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                parents[int(entry)] = int(fields[1])
+                rss[int(entry)] = int(fields[21]) * page
+            except (OSError, IndexError, ValueError):
+                continue
+        return rss, parents
+
+    def sample(self):
+        rss, parents = self._rss_by_pid()
+        tree = {os.getpid()}
+        changed = True
+        while changed:
+            changed = False
+            for pid, ppid in parents.items():
+                if ppid in tree and pid not in tree:
+                    tree.add(pid)
+                    changed = True
+        self.peak_total = max(self.peak_total, sum(rss.get(pid, 0) for pid in tree))
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if os.path.isdir("/proc"):
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+
+    def report(self):
+        self_peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB on Linux
+        return {
+            "python_mb": round(self_peak_kb / 1024, 1),
+            "process_tree_mb": round(self.peak_total / 2 ** 20, 1) if self.peak_total else None,
+        }
+
+
+def stage_percentiles(metrics):
+    out = {}
+    for name, values in metrics.stage_times.items():
+        out[name] = {"count": len(values), "total": round(sum(values), 4)}
+        out[name].update({f"p{q}": round(percentile(values, q), 4) for q in QUANTILES})
+    return out
+
+
+def bench_scraper(site, pages, workdir):
+    config = ScraperConfig(
+        COUNTRY_CODE="ng",
+        BASE_URL=site.url,
+        CATEGORY_URL=site.url + "/phones-tablets/",
+        MAX_PAGES=pages,
+        HEADLESS=True,
+        # The fixture never throttles; let the limiter run flat out
+        RATE_LIMIT=1000,
+        RATE_LIMIT_MAX=1000,
+        MAX_RETRIES=1,
+    )
+    scraper = JumiaScraper(config)
+    started = time.perf_counter()
+    products = scraper.run()
+    scrape_elapsed = time.perf_counter() - started
+
+    for fmt, name in (("sqlite", "bench.db"), ("jsonl", "bench.jsonl")):
+        with scraper.metrics.stage("storage"):
+            StorageHandler(os.path.join(workdir, name), fmt).save(products)
+    elapsed = time.perf_counter() - started
+
+    pages_done = scraper.metrics.counters.get("pages", 0)
+    return {
+        "pages": pages_done,
+        "pages_failed": scraper.metrics.counters.get("pages_failed", 0),
+        "products": len(products),
+        "scrape_seconds": round(scrape_elapsed, 3),
+        "total_seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages_done / scrape_elapsed, 4) if scrape_elapsed else 0.0,
+        "products_per_sec": round(len(products) / scrape_elapsed, 2) if scrape_elapsed else 0.0,
+        "requests": scraper.metrics.counters.get("requests", 0),
+        "stages": stage_percentiles(scraper.metrics),
+        "retries": scraper.retry_stats.as_dict(),
+    }
+
+
+def bench_category_stats(site, leaves, workdir):
+    from jumia_category_stats import get_category_stats
+
+    started = time.perf_counter()
+    # The script reports progress with print(); keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        get_category_stats(
+            mode="with_counts",
+            output_file=os.path.join(workdir, "hierarchy.json"),
+            limit=leaves,
+            base_url=site.url,
+        )
+    elapsed = time.perf_counter() - started
+    pages = leaves + 1  # homepage + one listing per leaf
+    return {
+        "leaves": leaves,
+        "page_requests": pages,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 4) if elapsed else 0.0,
+    }
+
+
+def compare(current, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline.get('commit')} ({baseline_path})")
+
+    def line(label, new, old, higher_is_better=True):
+        if not old or new is None:
+            return
+        change = (new - old) / old * 100
+        better = change >= 0 if higher_is_better else change <= 0
+        print(f"  {label:<28} {old:>10} -> {new:>10}  {change:+6.1f}% {'' if better else '(worse)'}")
+
+    line("scraper pages/s", current["scraper"]["pages_per_sec"], baseline["scraper"]["pages_per_sec"])
+    line("scraper products/s", current["scraper"]["products_per_sec"], baseline["scraper"]["products_per_sec"])
+    line("category stats pages/s", current["category_stats"]["pages_per_sec"], baseline["category_stats"]["pages_per_sec"])
+    line("peak RSS (tree, MB)", current["peak_rss"]["process_tree_mb"], baseline["peak_rss"]["process_tree_mb"], False)
+    for name, stats in current["scraper"]["stages"].items():
+        old = baseline["scraper"]["stages"].get(name)
+        if old:
+            line(f"{name} p50 (s)", stats["p50"], old["p50"], False)
+            line(f"{name} p95 (s)", stats["p95"], old["p95"], False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end scraper benchmark against a local fixture site")
+    parser.add_argument("--pages", type=int, default=5, help="Listing pages to scrape")
+    parser.add_argument("--leaves", type=int, default=10, help="Leaf categories for jumia_category_stats (0 skips it)")
+    parser.add_argument("--output", default=None, help="Result JSON path (default benchmarks/results/e2e-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    result = {"commit": git_commit(), "timestamp": time.time(), "pages": args.pages, "leaves": args.leaves}
+    with tempfile.TemporaryDirectory() as workdir, RssSampler() as rss, start_site(pages=args.pages) as site:
+        result["scraper"] = bench_scraper(site, args.pages, workdir)
+        result["category_stats"] = bench_category_stats(site, args.leaves, workdir) if args.leaves else {}
+        result["fixture"] = {"requests": site.requests, "bytes_sent": site.bytes_sent}
+    result["peak_rss"] = rss.report()
+
+    s = result["scraper"]
+    print(f"scraper: {s['pages']} pages, {s['products']} products in {s['scrape_seconds']}s "
+          f"({s['pages_per_sec']} pages/s, {s['products_per_sec']} products/s)")
+    for name, stats in s["stages"].items():
+        quantiles = "  ".join(f"p{q} {stats[f'p{q}']:.3f}s" for q in QUANTILES)
+        print(f"  {name:<12} x{stats['count']:<4} {quantiles}")
+    if result["category_stats"]:
+        c = result["category_stats"]
+        print(f"category stats: {c['page_requests']} pages in {c['seconds']}s ({c['pages_per_sec']} pages/s)")
+    print(f"peak RSS: python {result['peak_rss']['python_mb']} MB, process tree {result['peak_rss']['process_tree_mb']} MB")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"e2e-{result['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"saved {output}")
+
+    if args.compare:
+        compare(result, args.compare)
+
+
+if __name__ == "__main__":
+    main()
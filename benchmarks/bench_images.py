@@ -0,0 +1,83 @@
+"""
+Offline benchmark of the image pipeline against a stand-in image host.
+
+Downloads N product images from fixtures.start_images() (with some URLs
+aliasing the same bytes) twice: serially with urllib, the way the old
+one-off script did, and through ImageDownloader. Then runs the downloader
+again to show repeats cost nothing. Fails when the per-host limit is
+exceeded, duplicates are stored twice or the second run re-downloads.
+
+    python benchmarks/bench_images.py --images 300 --latency 0.02
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import start_images
+from jumia_scraper.images import ImageDownloader, ImageStore, pillow_available
+
+
+def serial(urls, workdir):
+    started = time.perf_counter()
+    for i, url in enumerate(urls):
+        with urllib.request.urlopen(url, timeout=10) as response, open(os.path.join(workdir, f"{i}.gif"), "wb") as f:
+            f.write(response.read())
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Image downloader benchmark")
+    parser.add_argument("--images", type=int, default=300)
+    parser.add_argument("--size", type=int, default=20000, help="Bytes per image")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per image request")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=4)
+    parser.add_argument("--duplicate-every", type=int, default=10, help="Every Nth URL serves image 0's bytes")
+    args = parser.parse_args()
+
+    failures = []
+    with start_images(size=args.size, latency=args.latency, duplicate_every=args.duplicate_every) as host, \
+            tempfile.TemporaryDirectory() as workdir:
+        urls = [f"{host.url}/img/{n}.gif" for n in range(1, args.images + 1)]
+        unique = len({0 if n % args.duplicate_every == 0 else n for n in range(1, args.images + 1)}) \
+            if args.duplicate_every else args.images
+
+        serial_seconds = serial(urls, tempfile.mkdtemp(dir=workdir))
+        print(f"serial urllib:   {args.images} images in {serial_seconds:.2f}s")
+
+        store = ImageStore(os.path.join(workdir, "store"))
+        downloader = ImageDownloader(store, workers=args.workers, per_host=args.per_host)
+        host.server.max_inflight = 0
+        first = downloader.download(urls)
+        print(f"ImageDownloader: {first['downloaded']} images in {first['seconds']:.2f}s "
+              f"({serial_seconds / first['seconds']:.1f}x), {first['deduplicated']} deduplicated, "
+              f"{first['thumbnails']} thumbnails, peak {host.server.max_inflight} in flight")
+
+        requests_before = host.requests
+        second = downloader.download(urls)
+        print(f"second run:      {second['cached']} cached, {host.requests - requests_before} requests in {second['seconds']:.2f}s")
+
+        stored = sum(len(files) for _, _, files in os.walk(store.objects_dir))
+        if host.server.max_inflight > args.per_host:
+            failures.append(f"{host.server.max_inflight} concurrent requests exceed the per-host limit of {args.per_host}")
+        if first["failed"]:
+            failures.append(f"{first['failed']} downloads failed")
+        if stored != unique:
+            failures.append(f"{stored} files stored for {unique} distinct images")
+        if host.requests != requests_before:
+            failures.append("second run re-downloaded images")
+        if pillow_available() and first["thumbnails"] != unique:
+            failures.append(f"{first['thumbnails']} thumbnails for {unique} distinct images")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: ProductItem construction and serialization paths.
+
+Compares full pydantic validation, the trusted ProductItem.trusted()
+path used by the scraper, and validate_batch() for untrusted input.
+
+    python benchmarks/bench_models.py --items 20000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jumia_scraper.models import ProductItem, validate_batch
+
+
+def make_rows(n):
+    rows = []
+    for i in range(n):
+        rows.append({
+            "product_id": f"GE{i:08d}",
+            "name": f"Samsung Galaxy A{i % 90} 6.7\" 128GB + 4GB RAM",
+            "brand": ["Samsung", "Tecno", "Infinix", "Itel", "Oppo"][i % 5],
+            "url": f"https://www.jumia.co.ke/product-{i}.html",
+            "image_url": f"https://ke.jumia.is/unsafe/fit-in/300x300/product/{i}.jpg",
+            "currency": "KES",
+            "current_price": 10000.0 + i,
+            "rating": 4.2,
+            "review_count": i % 500,
+            "seller_id": str(i % 300),
+            "category_path": ["Phones & Tablets", "Mobile Phones", "Smartphones"],
+            "old_price": 15000.0 + i,
+            "discount_percentage": 33.0,
+            "promo_tag": None,
+            "is_express": bool(i % 2),
+            "gtm_tags": ["Official Store", "Express"],
+            "list_position": i % 40 + 1,
+            "rating_ratio": 0.84,
+            "ga4_category_1": "Phones & Tablets",
+            "ga4_category_2": "Mobile Phones",
+            "ga4_price": 80.5,
+            "is_second_chance": False,
+        })
+    return rows
+
+
+def timed(label, fn, n):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<38} {elapsed * 1000:9.1f} ms  {n / elapsed:12,.0f} items/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ProductItem construction benchmark")
+    parser.add_argument("--items", type=int, default=20000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.items)
+    n = len(rows)
+    crawled_at = datetime.utcnow()
+
+    validated = timed("ProductItem(**row) (validated)", lambda: [ProductItem(**r) for r in rows], n)
+    trusted = timed("ProductItem.trusted(**row)", lambda: [ProductItem.trusted(crawled_at, **r) for r in rows], n)
+    batch, errors = timed("validate_batch(rows)", lambda: validate_batch(rows), n)
+    assert not errors and len(batch) == n
+
+    timed("model_dump_json (validated items)", lambda: [i.model_dump_json() for i in validated], n)
+    timed("model_dump_json (trusted items)", lambda: [i.model_dump_json() for i in trusted], n)
+    timed("model_dump (trusted items)", lambda: [i.model_dump() for i in trusted], n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: price cleaning and page normalization.
+
+Cleans N synthetic price strings with the old character loop, the
+str.translate clean_price() path and (when pandas is installed) the
+vectorized pandas path, then normalizes synthetic raw card dicts.
+
+    python benchmarks/bench_normalize.py --prices 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jumia_scraper import normalize
+
+
+def legacy_clean_price(price_str):
+    """The original utils.clean_price, kept as the baseline"""
+    if not price_str:
+        return 0.0
+    cleaned = ''.join(c for c in price_str if c.isdigit() or c == '.')
+    try:
+        return float(cleaned)
+    except ValueError:
+        return 0.0
+
+
+def make_prices(n, seed=42):
+    rng = random.Random(seed)
+    templates = ["KSh {:,}", "₦ {:,}", "GH₵ {:,}.{:02d}", "{:,} Dhs", "EGP {:,}.{:02d}", "USh {:,}"]
+    out = []
+    for _ in range(n):
+        t = rng.choice(templates)
+        out.append(t.format(rng.randint(50, 2_000_000), rng.randint(0, 99)))
+    return out
+
+
+def make_cards(n):
+    return [{
+        "href": f"/product-{i}.html",
+        "gtm_id": f"GE{i:08d}",
+        "name": f"  Tecno Spark {i % 30} 128GB  ",
+        "gtm_brand": "Tecno",
+        "price": f"KSh {10000 + i:,}",
+        "img_data_src": f"https://ke.jumia.is/product/{i}.jpg",
+        "rating_attr": "4.3",
+        "review_attr": str(i % 400),
+        "seller_id": str(i % 200),
+        "category": "Phones & Tablets / Mobile Phones / Smartphones",
+        "old_price": f"KSh {15000 + i:,}",
+        "discount": "-33%",
+        "promo": None,
+        "is_express": i % 2 == 0,
+        "gtm_tags": "Official Store|Express",
+        "position": str(i % 40 + 1),
+        "ratio_style": "width: 86%",
+        "ga4_price": "80.5",
+        "is_second_chance": "false",
+    } for i in range(n)]
+
+
+def timed(label, fn, n, unit):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:8.3f} s  {n / elapsed:14,.0f} {unit}/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalization benchmark")
+    parser.add_argument("--prices", type=int, default=1_000_000)
+    parser.add_argument("--cards", type=int, default=50_000)
+    args = parser.parse_args()
+
+    prices = make_prices(args.prices)
+    baseline = timed("legacy char loop", lambda: [legacy_clean_price(p) for p in prices], len(prices), "prices")
+    translated = timed("clean_price (translate table)", lambda: [normalize.clean_price(p) for p in prices], len(prices), "prices")
+    assert translated == baseline
+
+    try:
+        import pandas  # noqa: F401
+        vectorized = timed("clean_prices (pandas)", lambda: normalize.clean_prices(prices), len(prices), "prices")
+        assert vectorized == baseline
+    except ImportError:
+        print("clean_prices (pandas)              skipped: pandas not installed")
+
+    cards = make_cards(args.cards)
+    timed("normalize_cards", lambda: normalize.normalize_cards(cards, "https://www.jumia.co.ke"), len(cards), "cards")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Fuzz test and benchmark for the locale-aware price parser.
+
+Generates random prices for all nine markets, formats them the way each
+site does (group separators incl. NBSP / narrow NBSP, comma or dot
+decimals, symbol before or after, occasional ranges) and checks that
+parse_price() recovers the exact values and ISO currency. A share of the
+cases print a market's prices in another market's number format, and a
+few fixed strings cover formats seen on real listings. Then times
+parse_price() against the legacy clean_price() on the same strings.
+
+    python benchmarks/bench_prices.py --fuzz 200000 --bench 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jumia_scraper.normalize import clean_price
+from jumia_scraper.prices import PRICE_FORMATS, parse_price
+
+
+def format_amount(rng, cents, fmt):
+    whole, frac = divmod(cents, 100)
+    group_sep = rng.choice(fmt.thousands) if fmt.thousands else ","
+    digits = f"{whole:,}".replace(",", group_sep)
+    style = rng.random()
+    if style < 0.4:
+        return digits, float(whole)
+    if style < 0.7:
+        return f"{digits}{fmt.decimal}{frac:02d}", whole + frac / 100
+    # Ungrouped amount
+    return str(whole), float(whole)
+
+
+# (text, country, expected) strings that do not follow their market's table
+KNOWN_CASES = [
+    ("1,099.00 Dhs", "ma", (1099.0, 1099.0, "MAD")),
+    ("Dhs 1 099,00", "ma", (1099.0, 1099.0, "MAD")),
+    ("KSh 1.299,50", "ke", (1299.5, 1299.5, "KES")),
+    ("KSh 1 299", "ke", (1299.0, 1299.0, "KES")),
+    ("₦ 12,50", "ng", (12.5, 12.5, "NGN")),
+    # No market format fits: legacy digits-and-dots reading, logged as ambiguous
+    ("KSh 1,2345", "ke", (12345.0, 12345.0, "KES")),
+    ("KSh 12,345.678", "ke", (12345.678, 12345.678, "KES")),
+]
+
+
+def make_case(rng, country, fmt, number_fmt=None):
+    """number_fmt prints the amounts in another market's format"""
+    symbol = rng.choice(fmt.symbols)
+    amounts = [rng.randint(0, 500_000_000)]
+    if rng.random() < 0.15:
+        amounts.append(amounts[0] + rng.randint(0, 50_000_000))
+
+    parts, values = [], []
+    for cents in amounts:
+        text, value = format_amount(rng, cents, number_fmt or fmt)
+        values.append(value)
+        parts.append(f"{symbol} {text}" if rng.random() < 0.5 else f"{text} {symbol}")
+    joiner = rng.choice([" - ", " – ", "-", " to "])
+    return joiner.join(parts), (min(values), max(values), fmt.currency)
+
+
+def fuzz(n, seed):
+    rng = random.Random(seed)
+    countries = list(PRICE_FORMATS.items())
+    cases = list(KNOWN_CASES)
+    for _ in range(n):
+        country, fmt = rng.choice(countries)
+        # One case in five prints the amounts the way another market does
+        number_fmt = rng.choice(countries)[1] if rng.random() < 0.2 else None
+        text, expected = make_case(rng, country, fmt, number_fmt)
+        cases.append((text, country, expected))
+
+    failures = 0
+    for text, country, expected in cases:
+        got = parse_price(text, country)
+        if (abs(got[0] - expected[0]) > 1e-6 or abs(got[1] - expected[1]) > 1e-6 or got[2] != expected[2]):
+            failures += 1
+            if failures <= 10:
+                print(f"MISMATCH [{country}] {text!r}: expected {expected}, got {got}")
+    print(f"fuzz: {len(cases)} cases, {failures} failures")
+    return failures
+
+
+def bench(n, seed):
+    rng = random.Random(seed)
+    countries = list(PRICE_FORMATS.items())
+    cases = []
+    for _ in range(n):
+        country, fmt = rng.choice(countries)
+        cases.append((make_case(rng, country, fmt)[0], country))
+
+    start = time.perf_counter()
+    for text, _ in cases:
+        clean_price(text)
+    legacy = time.perf_counter() - start
+    print(f"clean_price (legacy)        {legacy:8.3f} s  {n / legacy:12,.0f} prices/s")
+
+    parse_price.cache_clear()
+    start = time.perf_counter()
+    for text, country in cases:
+        parse_price.__wrapped__(text, country)
+    uncached = time.perf_counter() - start
+    print(f"parse_price (no cache)      {uncached:8.3f} s  {n / uncached:12,.0f} prices/s")
+
+    # Real listings repeat prices heavily; replay a small vocabulary through the cache
+    vocab = cases[:5000]
+    replay = [vocab[i % len(vocab)] for i in range(n)]
+    start = time.perf_counter()
+    for text, country in replay:
+        parse_price(text, country)
+    cached = time.perf_counter() - start
+    print(f"parse_price (memoized)      {cached:8.3f} s  {n / cached:12,.0f} prices/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Price parser fuzz test and benchmark")
+    parser.add_argument("--fuzz", type=int, default=200_000)
+    parser.add_argument("--bench", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    failures = fuzz(args.fuzz, args.seed)
+    if args.bench:
+        bench(args.bench, args.seed)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
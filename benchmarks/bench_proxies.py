@@ -0,0 +1,85 @@
+"""
+Offline check of ProxyPool scheduling against stand-in proxies.
+
+Starts a local origin and four fixture proxies (fast, slow, flaky, banned),
+sends N requests through whichever proxy the pool hands out, and reports
+each proxy's share of traffic and health. Fails when the fast proxy does
+not end up carrying most of the traffic or the banned one is not sidelined.
+
+    python benchmarks/bench_proxies.py --requests 400 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import start_origin, start_proxy
+from jumia_scraper.proxies import Proxy, ProxyPool, proxy_fault
+from jumia_scraper.retry import HTTPStatusError, NetworkError
+
+
+def fetch(pool, origin_url):
+    proxy = pool.acquire()
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({"http": proxy.server}))
+    started = time.monotonic()
+    try:
+        opener.open(origin_url, timeout=5).read()
+        pool.report(proxy, ok=True, latency=time.monotonic() - started)
+        return True
+    except urllib.error.HTTPError as e:
+        error = HTTPStatusError(e.code, origin_url)
+    except (urllib.error.URLError, OSError) as e:
+        error = NetworkError(str(e))
+    finally:
+        pool.release(proxy)
+    blamed, banned = proxy_fault(error)
+    if blamed:
+        pool.report(proxy, ok=False, banned=banned)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ProxyPool scheduling benchmark")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with start_origin() as origin, \
+            start_proxy(latency=0.005) as fast, \
+            start_proxy(latency=0.08) as slow, \
+            start_proxy(latency=0.01, fail_rate=0.6) as flaky, \
+            start_proxy(status=403) as banned:
+        names = {fast.url: "fast", slow.url: "slow", flaky.url: "flaky", banned.url: "banned"}
+        fixtures = {"fast": fast, "slow": slow, "flaky": flaky, "banned": banned}
+        pool = ProxyPool([Proxy.parse(url) for url in names], base_cooldown=0.5, max_cooldown=30, evict_after=6)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(lambda _: fetch(pool, origin.url + "/catalog/"), range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+        ok = sum(results)
+        print(f"{args.requests} requests in {elapsed:.2f}s ({args.requests / elapsed:.0f} req/s), {ok} succeeded")
+        for stat in pool.stats():
+            name = names[stat["server"]]
+            share = fixtures[name].requests / args.requests
+            latency = f"{stat['latency'] * 1000:6.1f} ms" if stat["latency"] is not None else "     n/a"
+            print(
+                f"  {name:<7} share {share:6.1%}  latency {latency}  ok {stat['successes']:4d}  "
+                f"failed {stat['failures']:3d}  cooling {stat['cooling']!s:<5}  evicted {stat['evicted']}"
+            )
+
+        fast_share = fast.requests / args.requests
+        banned_share = banned.requests / args.requests
+        passed = fast_share >= 0.5 and banned_share <= 0.05
+        print("PASS" if passed else "FAIL: pool did not converge on the healthy fast proxy")
+        sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
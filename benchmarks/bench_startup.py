@@ -0,0 +1,93 @@
+"""
+Startup benchmark: import cost of the CLI and the offline modules.
+
+Runs each target in a fresh interpreter under `python -X importtime`,
+sums the reported import time, lists the slowest top-level imports and
+checks two guards:
+
+- the import-time total stays within the target's budget (ms);
+- modules that target must not load (Playwright for `main.py --help`,
+  storage and re-parsing) are absent.
+
+Exits non-zero when a guard fails, so it can run in CI.
+
+    python benchmarks/bench_startup.py --runs 5 --scale 1.5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name, argv after the interpreter, import budget (ms), modules that must not be imported
+TARGETS = [
+    ("main.py --help", ["main.py", "--help"], 80, ("playwright", "tenacity", "pydantic", "pydantic_settings")),
+    ("import normalize", ["-c", "import jumia_scraper.normalize"], 50, ("playwright", "tenacity", "pydantic")),
+    ("import storage", ["-c", "import jumia_scraper.storage"], 400, ("playwright", "tenacity", "pandas")),
+    ("import query", ["-c", "import jumia_scraper.query"], 400, ("playwright", "tenacity", "pandas")),
+]
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def run_target(argv):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    return parse_importtime(proc.stderr), wall, proc.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per target (median is reported)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow CI machines)")
+    parser.add_argument("--top", type=int, default=5, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+
+    failures = 0
+    for name, argv, budget_ms, forbidden in TARGETS:
+        totals, walls, rows = [], [], []
+        for _ in range(args.runs):
+            rows, wall, returncode = run_target(argv)
+            totals.append(sum(r[1] for r in rows) / 1000)
+            walls.append(wall * 1000)
+        if returncode != 0:
+            # Missing third-party packages in this environment; nothing meaningful to time
+            print(f"{name:<20} skipped (exit code {returncode})")
+            continue
+
+        imported = {r[0] for r in rows}
+        loaded = sorted(m for m in forbidden if m in imported)
+        total = statistics.median(totals)
+        limit = budget_ms * args.scale
+        ok = total <= limit and not loaded
+        failures += not ok
+
+        print(f"{name:<20} imports {total:7.1f} ms (budget {limit:.0f})  wall {statistics.median(walls):7.1f} ms  {'OK' if ok else 'FAIL'}")
+        if loaded:
+            print(f"{'':<20} must not import: {', '.join(loaded)}")
+        top_level = sorted((r for r in rows if r[3] == 0), key=lambda r: r[2], reverse=True)
+        for module, _, cumulative_us, _ in top_level[:args.top]:
+            print(f"{'':<20}   {cumulative_us / 1000:7.1f} ms  {module}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
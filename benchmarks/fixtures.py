@@ -0,0 +1,331 @@
+"""
+Local stand-ins for the network, so benchmarks run offline.
+
+- start_origin(): a tiny HTTP server playing the part of a Jumia host.
+- start_site(): serves the checked-in homepage.html / category.html /
+  subcategory.html snapshots as a paginated Jumia site.
+- start_images(): an image host (product pictures) with latency and a
+  peak in-flight request counter.
+- start_proxy(): a forward HTTP proxy (absolute-URI requests and CONNECT
+  tunnels) with configurable latency, random failures and a forced status
+  (e.g. 403 to act banned, 429 to act throttled).
+
+Each returns a handle with .url, .requests, .bytes_sent and .close(), and works as
+a context manager:
+
+    with start_origin() as origin, start_proxy(latency=0.2) as proxy:
+        ...
+"""
+import http.client
+import os
+import random
+import re
+import select
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_HOST = "https://www.jumia.com.ng"
+
+
+class _Fixture:
+    def __init__(self, server: ThreadingHTTPServer):
+        self.server = server
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        server.fixture = self
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, size: int = 0):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += size
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, keep-alive clients stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+class _OriginHandler(_QuietHandler):
+    def do_GET(self):
+        self.server.fixture.count()
+        body = self.server.body or f"<html><body><h1>{self.path}</h1></body></html>".encode()
+        self._send(200, body)
+
+    do_HEAD = do_GET
+
+
+def start_origin(body: bytes = b"", host: str = "127.0.0.1", port: int = 0) -> _Fixture:
+    server = ThreadingHTTPServer((host, port), _OriginHandler)
+    server.daemon_threads = True
+    server.body = body
+    return _Fixture(server)
+
+
+class _ProxyHandler(_QuietHandler):
+    def _misbehave(self) -> bool:
+        """Apply latency / failures; True when the request was already answered"""
+        server = self.server
+        server.fixture.count()
+        if server.latency:
+            time.sleep(server.latency * random.uniform(0.8, 1.2))
+        if server.status:
+            headers = {"Retry-After": str(server.retry_after)} if server.retry_after else None
+            self._send(server.status, b"<html><title>Access denied</title></html>", headers=headers)
+            return True
+        if server.fail_rate and random.random() < server.fail_rate:
+            # Drop the connection like a dying proxy would
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return True
+        return False
+
+    def do_CONNECT(self):
+        if self._misbehave():
+            return
+        host, _, port = self.path.partition(":")
+        try:
+            upstream = socket.create_connection((host, int(port or 443)), timeout=10)
+        except OSError:
+            self._send(502)
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, _ = select.select(sockets, [], [], 10)
+                if not readable:
+                    break
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    (upstream if sock is self.connection else self.connection).sendall(data)
+        finally:
+            upstream.close()
+            self.close_connection = True
+
+    def _relay(self):
+        if self._misbehave():
+            return
+        target = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in ("proxy-connection", "proxy-authorization")}
+        conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=10)
+        try:
+            path = target.path or "/"
+            if target.query:
+                path += "?" + target.query
+            conn.request(self.command, path, body=body, headers=headers)
+            response = conn.getresponse()
+            payload = response.read()
+        except OSError:
+            self._send(502)
+            return
+        finally:
+            conn.close()
+        passthrough = {k: v for k, v in response.getheaders() if k.lower() not in ("content-length", "transfer-encoding", "connection", "content-type")}
+        self._send(response.status, payload, response.getheader("Content-Type", "application/octet-stream"), passthrough)
+
+    do_GET = do_HEAD = do_POST = _relay
+
+
+def start_proxy(
+    latency: float = 0.0,
+    fail_rate: float = 0.0,
+    status: int = 0,
+    retry_after: int = 0,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> _Fixture:
+    server = ThreadingHTTPServer((host, port), _ProxyHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.fail_rate = fail_rate
+    server.status = status
+    server.retry_after = retry_after
+    return _Fixture(server)
+
+
+def gif_image(seed: int, size: int = 0) -> bytes:
+    """Valid 1x1 GIF whose colour depends on seed, padded to about size bytes with a comment block"""
+    color = (seed * 2654435761 & 0xFFFFFF).to_bytes(3, "big")
+    header = b"GIF89a" + bytes.fromhex("01000100800000") + color + b"\xff\xff\xff"
+    padding = b""
+    remaining = max(0, size - 40)
+    if remaining:
+        chunks = []
+        while remaining > 0:
+            n = min(255, remaining)
+            chunks.append(bytes([n]) + b"x" * n)
+            remaining -= n + 1
+        padding = b"\x21\xfe" + b"".join(chunks) + b"\x00"
+    return header + padding + bytes.fromhex("2c00000000010001000002024401003b")
+
+
+class _ImageHandler(_QuietHandler):
+    def do_GET(self):
+        server = self.server
+        match = re.fullmatch(r"/img/(\d+)\.gif", urlsplit(self.path).path)
+        with server.fixture._lock:
+            server.inflight += 1
+            server.max_inflight = max(server.max_inflight, server.inflight)
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+            if not match:
+                server.fixture.count()
+                self._send(404, b"not found", "text/plain")
+                return
+            n = int(match.group(1))
+            # Every duplicate_every-th URL serves the bytes of image 0, like a CDN alias
+            seed = 0 if server.duplicate_every and n % server.duplicate_every == 0 else n
+            body = gif_image(seed, server.size)
+            server.fixture.count(len(body))
+            self._send(200, body, "image/gif")
+        finally:
+            with server.fixture._lock:
+                server.inflight -= 1
+
+    do_HEAD = do_GET
+
+
+def start_images(size: int = 20000, latency: float = 0.0, duplicate_every: int = 0,
+                 host: str = "127.0.0.1", port: int = 0) -> _Fixture:
+    """Serves /img/<n>.gif; .server.max_inflight records peak concurrent requests"""
+    server = ThreadingHTTPServer((host, port), _ImageHandler)
+    server.daemon_threads = True
+    server.size = size
+    server.latency = latency
+    server.duplicate_every = duplicate_every
+    server.inflight = 0
+    server.max_inflight = 0
+    return _Fixture(server)
+
+
+# Snapshot rewriting: no third-party scripts (the pages are server-rendered and the
+# browser has no egress), image src served locally (data-src, which the scraper
+# prefers, keeps the real CDN URL), and links pointed at the fixture host.
+SCRIPT_RE = re.compile(r"<script\b.*?</script>", re.S | re.I)
+STYLESHEET_RE = re.compile(r"<link\b[^>]*rel=\"(?:stylesheet|preconnect|dns-prefetch|preload)\"[^>]*>", re.I)
+IMG_SRC_RE = re.compile(r'(<img\b[^>]*?\s)src="https?://[^"]*"', re.I)
+NEXT_PAGE_RE = re.compile(r'<a href="[^"]*" class="pg" aria-label="Next Page">')
+PRODUCT_ID_RE = re.compile(r'(data-(?:gtm-)?id=")([^"]+)(")')
+# 1x1 transparent GIF
+PIXEL = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+
+def _load_snapshot(name: str) -> str:
+    with open(os.path.join(ROOT, name), "r", encoding="utf-8") as f:
+        html = f.read()
+    html = SCRIPT_RE.sub("", html)
+    html = STYLESHEET_RE.sub("", html)
+    return IMG_SRC_RE.sub(r'\1src="/_img/pixel.gif"', html)
+
+
+class _SiteHandler(_QuietHandler):
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        if parts.path.startswith("/_img/"):
+            server.fixture.count(len(PIXEL))
+            self._send(200, PIXEL, "image/gif")
+            return
+
+        page = int(parse_qs(parts.query).get("page", ["1"])[0] or 1)
+        if parts.path == "/":
+            template = "homepage"
+        elif re.fullmatch(r"/[\w-]+/", parts.path) and page <= server.pages:
+            template = "category" if parts.path == server.category_path else "subcategory"
+        else:
+            server.fixture.count()
+            self._send(404, b"<html><title>Not found</title></html>")
+            return
+
+        body = server.render(template, parts.path, page)
+        server.fixture.count(len(body))
+        self._send(200, body)
+
+    do_HEAD = do_GET
+
+
+class _SiteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pages: int, category_path: str):
+        super().__init__(address, _SiteHandler)
+        self.pages = pages
+        self.category_path = category_path
+        self.templates = {name: _load_snapshot(f"{name}.html") for name in ("homepage", "category", "subcategory")}
+        self._rendered = {}
+        self._lock = threading.Lock()
+
+    def render(self, template: str, path: str, page: int) -> bytes:
+        key = (template, path, page)
+        with self._lock:
+            cached = self._rendered.get(key)
+        if cached is not None:
+            return cached
+
+        base = "http://%s:%s" % self.server_address[:2]
+        html = self.templates[template].replace(SNAPSHOT_HOST, base)
+        if template != "homepage":
+            if page < self.pages:
+                next_link = f'<a href="{path}?page={page + 1}#catalog-listing" class="pg" aria-label="Next Page">'
+            else:
+                next_link = '<a href="#" class="pg">'
+            html = NEXT_PAGE_RE.sub(next_link, html)
+            if page > 1:
+                # Distinct products per page, like a real listing
+                html = PRODUCT_ID_RE.sub(lambda m: f"{m.group(1)}{m.group(2)}P{page}{m.group(3)}", html)
+        body = html.encode("utf-8")
+        with self._lock:
+            self._rendered[key] = body
+        return body
+
+
+def start_site(pages: int = 5, category_path: str = "/phones-tablets/", host: str = "127.0.0.1", port: int = 0) -> _Fixture:
+    """
+    Jumia look-alike: '/' is the homepage snapshot, category_path the category
+    snapshot and any other '/<slug>/' the subcategory snapshot. Listings have
+    `pages` pages (?page=N) with rewritten Next Page links and distinct
+    product ids per page.
+    """
+    return _Fixture(_SiteServer((host, port), pages, category_path))
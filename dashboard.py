@@ -3,10 +3,11 @@ import sqlite3
 import pandas as pd
 import json
 import os
-import subprocess
-import plotly.express as px
-import plotly.graph_objects as go
-from deep_translator import GoogleTranslator
+from jumia_scraper.query import ProductQuery
+from jumia_scraper.search import SearchIndex, sidecar_path
+from jumia_scraper.loader import IncrementalLoader
+# Page-specific dependencies (plotly, deep_translator, the job runner) are imported
+# inside the page that renders them, so other pages don't pay for them on every rerun.
 
 st.set_page_config(page_title="Jumia Scraper Dashboard", layout="wide", page_icon="🛍️")
 
@@ -14,50 +15,68 @@ st.set_page_config(page_title="Jumia Scraper Dashboard", layout="wide", page_ico
 st.sidebar.title("Navigation")
 page = st.sidebar.radio("Go to", ["Data View", "Data Analytics", "New Scrape Job", "Category Research"])
 
-def load_data_sqlite(db_path):
-    if not os.path.exists(db_path):
-        return None
-    conn = sqlite3.connect(db_path)
-    try:
-        df = pd.read_sql_query("SELECT * FROM products", conn)
-    except Exception:
-        df = None
-    finally:
-        conn.close()
-    return df
+@st.cache_resource
+def get_loader():
+    """Process-wide loader so parsed frames survive reruns and sessions"""
+    return IncrementalLoader()
+
+@st.cache_resource
+def get_job_runner():
+    """One background job runner per dashboard process, shared by all sessions"""
+    from jumia_scraper.jobs import JobRunner
+    return JobRunner("jobs.db", max_workers=2)
 
 def load_data_jsonl(file_path):
-    if not os.path.exists(file_path):
-        return None
-    data = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                data.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
-    return pd.DataFrame(data)
+    return get_loader().load_jsonl(file_path)
+
+def search_mask(frame, source_path, term):
+    """Rows of a JSONL-backed frame matching term, via the output's sidecar search index"""
+    index = SearchIndex(sidecar_path(source_path)) if source_path else None
+    if index is None or not os.path.exists(index.db_path):
+        # Files written before the index existed: substring scan
+        return frame['name'].str.contains(term, case=False, na=False, regex=False)
+    matches = set(index.search(term))
+    mask = pd.Series(False, index=frame.index)
+    for key_col in ('product_id', 'url'):
+        if key_col in frame.columns:
+            mask |= frame[key_col].isin(matches)
+    return mask
+
+@st.cache_data(show_spinner=False)
+def _list_jsonl_files(directory, dir_mtime_ns):
+    jsonl_files = sorted(f for f in os.listdir(directory) if f.endswith('.jsonl'))
+    return jsonl_files if jsonl_files else ["No JSONL files found"]
 
 def get_jsonl_files():
-    """Get all JSONL files in current directory"""
-    jsonl_files = [f for f in os.listdir('.') if f.endswith('.jsonl')]
-    return jsonl_files if jsonl_files else ["No JSONL files found"]
+    """Get all JSONL files in current directory (re-listed only when the directory changes)"""
+    return _list_jsonl_files('.', os.stat('.').st_mtime_ns)
 
 # Common Data Loading Logic
 st.sidebar.header("Data Source")
 data_source = st.sidebar.radio("Select Data Source", ["SQLite Database", "JSONL File"])
 
 df = None
+query = None
 if data_source == "SQLite Database":
     db_file = st.sidebar.text_input("Database Path", "products.db")
     if st.sidebar.button("Load Data"):
-        with st.spinner("Loading data..."):
-            df = load_data_sqlite(db_file)
-            if df is None:
+        with st.spinner("Connecting to database..."):
+            if not os.path.exists(db_file):
                 st.error(f"Database file not found or invalid: {db_file}")
             else:
-                st.session_state['loaded_df'] = df
-                st.success(f"Loaded {len(df)} records.")
+                try:
+                    db_query = ProductQuery(db_file)
+                    db_query.ensure_indexes()
+                    total = db_query.count()
+                    st.session_state['db_path'] = db_file
+                    st.session_state.pop('loaded_df', None)
+                    st.success(f"Connected to {db_file} ({total} records).")
+                except sqlite3.Error as e:
+                    st.error(f"Database file not found or invalid: {db_file} ({e})")
+
+    # SQLite is queried page by page and analysed from precomputed summaries
+    if 'db_path' in st.session_state:
+        query = ProductQuery(st.session_state['db_path'])
 
 elif data_source == "JSONL File":
     jsonl_files = get_jsonl_files()
@@ -74,10 +93,11 @@ elif data_source == "JSONL File":
                 st.error(f"File not found: {jsonl_file}")
             else:
                 st.session_state['loaded_df'] = df
+                st.session_state['loaded_path'] = jsonl_file
                 st.success(f"Loaded {len(df)} records.")
 
 # Retrieve data from session state if available
-if 'loaded_df' in st.session_state:
+if data_source == "JSONL File" and 'loaded_df' in st.session_state:
     df = st.session_state['loaded_df']
 
 # Data Preprocessing
@@ -98,7 +118,73 @@ if df is not None and not df.empty:
 if page == "Data View":
     st.title("🛍️ Jumia Product Data View")
 
-    if df is not None and not df.empty:
+    product_column_config = {
+        "image_url": st.column_config.ImageColumn("Image"),
+        "url": st.column_config.LinkColumn("Link"),
+        "current_price": st.column_config.NumberColumn("Price", format="%.2f"),
+        "old_price": st.column_config.NumberColumn("Old Price", format="%.2f"),
+        "discount_percentage": st.column_config.NumberColumn("Discount", format="%.0f%%"),
+        "rating": st.column_config.NumberColumn("Rating", format="%.1f ⭐"),
+        "review_count": st.column_config.NumberColumn("Reviews"),
+        "is_express": st.column_config.CheckboxColumn("Express"),
+    }
+    default_cols = [
+        'image_url', 'name', 'brand', 'current_price', 'old_price', 
+        'discount_percentage', 'rating', 'review_count', 
+        'promo_tag', 'is_express', 'product_id', 'url'
+    ]
+
+    if query is not None:
+        # Filters (pushed down to SQL)
+        st.subheader("Filters")
+        col_f1, col_f2 = st.columns(2)
+        search_term = col_f1.text_input("Search by Name")
+        brands = ['All'] + query.brands()
+        selected_brand = col_f2.selectbox("Filter by Brand", brands)
+        brand_filter = None if selected_brand == 'All' else selected_brand
+
+        # Metrics over the filtered set
+        stats = query.metrics(search=search_term, brand=brand_filter)
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Total Products", stats['total'])
+        col2.metric("Avg Price", f"{stats['avg_price']:.2f}")
+        col3.metric("Avg Discount", f"{stats['avg_discount']:.1f}%")
+        col4.metric("Total Reviews", f"{int(stats['total_reviews'])}")
+
+        # Sorting and pagination
+        col_s1, col_s2, col_s3, col_s4 = st.columns(4)
+        sortable = [c for c in ['current_price', 'discount_percentage', 'rating', 'review_count', 'name', 'brand', 'crawled_at'] if c in query.columns]
+        sort_by = col_s1.selectbox("Sort by", ['(none)'] + sortable)
+        descending = col_s2.checkbox("Descending", value=True)
+        page_size = col_s3.selectbox("Rows per page", [50, 100, 250, 500], index=1)
+        total_pages = max(1, -(-stats['total'] // page_size))
+        page_num = col_s4.number_input("Page", min_value=1, max_value=total_pages, value=1)
+
+        available_cols = [c for c in default_cols if c in query.columns]
+        extra_cols = [c for c in query.columns if c not in available_cols]
+        selected_extra_cols = st.multiselect("Add more columns", extra_cols)
+        final_cols = available_cols + selected_extra_cols
+
+        rows = query.page(
+            search=search_term,
+            brand=brand_filter,
+            sort_by=None if sort_by == '(none)' else sort_by,
+            descending=descending,
+            limit=page_size,
+            offset=(page_num - 1) * page_size,
+            columns=final_cols,
+        )
+        st.caption(f"Showing {len(rows)} of {stats['total']} products (page {page_num}/{total_pages})")
+
+        st.subheader("Product List")
+        st.dataframe(
+            pd.DataFrame(rows, columns=final_cols),
+            column_config=product_column_config,
+            use_container_width=True,
+            height=800
+        )
+
+    elif df is not None and not df.empty:
         # Metrics
         col1, col2, col3, col4 = st.columns(4)
         col1.metric("Total Products", len(df))
@@ -121,7 +207,7 @@ if page == "Data View":
         
         filtered_df = df.copy()
         if search_term:
-            filtered_df = filtered_df[filtered_df['name'].str.contains(search_term, case=False, na=False)]
+            filtered_df = filtered_df[search_mask(filtered_df, st.session_state.get('loaded_path'), search_term)]
         if selected_brand != 'All':
             filtered_df = filtered_df[filtered_df['brand'] == selected_brand]
 
@@ -132,11 +218,6 @@ if page == "Data View":
         
         # Configure columns for display
         # Prioritize new fields
-        default_cols = [
-            'image_url', 'name', 'brand', 'current_price', 'old_price', 
-            'discount_percentage', 'rating', 'review_count', 
-            'promo_tag', 'is_express', 'product_id', 'url'
-        ]
         available_cols = [c for c in default_cols if c in filtered_df.columns]
         
         # Add other columns that might be interesting but not in default
@@ -149,16 +230,7 @@ if page == "Data View":
 
         st.dataframe(
             filtered_df[final_cols],
-            column_config={
-                "image_url": st.column_config.ImageColumn("Image"),
-                "url": st.column_config.LinkColumn("Link"),
-                "current_price": st.column_config.NumberColumn("Price", format="%.2f"),
-                "old_price": st.column_config.NumberColumn("Old Price", format="%.2f"),
-                "discount_percentage": st.column_config.NumberColumn("Discount", format="%.0f%%"),
-                "rating": st.column_config.NumberColumn("Rating", format="%.1f ⭐"),
-                "review_count": st.column_config.NumberColumn("Reviews"),
-                "is_express": st.column_config.CheckboxColumn("Express"),
-            },
+            column_config=product_column_config,
             use_container_width=True,
             height=800
         )
@@ -172,9 +244,152 @@ if page == "Data View":
 # PAGE: Data Analytics
 # ==========================================
 elif page == "Data Analytics":
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from jumia_scraper.analytics import AnalyticsStore, ALL
+
     st.title("📊 Data Analytics")
 
-    if df is not None and not df.empty:
+    if query is not None:
+        store = AnalyticsStore(query.db_path)
+        if not store.has_aggregates():
+            with st.spinner("Building analytics summaries (first run only)..."):
+                store.refresh()
+        if st.sidebar.button("Refresh Analytics"):
+            with st.spinner("Rebuilding analytics summaries..."):
+                store.refresh()
+
+        # Slice selectors ('All' reads the rolled-up summaries)
+        dim_values = store.dimension_values()
+        col_d1, col_d2, col_d3 = st.columns(3)
+        country_sel = col_d1.selectbox("Country", ['All'] + dim_values['country'])
+        category_sel = col_d2.selectbox("Category", ['All'] + dim_values['category'])
+        date_sel = col_d3.selectbox("Crawl Date", ['All'] + dim_values['crawl_date'])
+        slice_key = tuple(ALL if v == 'All' else v for v in (country_sel, category_sel, date_sel))
+
+        summary = store.summary(*slice_key)
+        if not summary:
+            st.warning("No data found to analyze.")
+        else:
+            st.caption(f"{summary['product_count']} products · summaries refreshed at {summary['refreshed_at']} UTC")
+
+            # 1. Price Distribution Analysis
+            st.subheader("1. Price Distribution Analysis")
+            col_p1, col_p2 = st.columns(2)
+            brand_stats = pd.DataFrame(store.brand_stats(*slice_key))
+
+            with col_p1:
+                hist = pd.DataFrame(store.price_histogram(*slice_key))
+                fig_price = go.Figure()
+                if not hist.empty:
+                    fig_price.add_bar(
+                        x=(hist['bin_start'] + hist['bin_end']) / 2,
+                        y=hist['count'],
+                        width=(hist['bin_end'] - hist['bin_start']).clip(lower=1e-9),
+                        marker_color='#1f77b4'
+                    )
+                fig_price.update_layout(title="Distribution of Current Price", xaxis_title="Price", yaxis_title="count")
+                st.plotly_chart(fig_price, use_container_width=True)
+
+            with col_p2:
+                # Box Plot for Price vs Brand (Top 10 Brands), drawn from precomputed quartiles
+                fig_box = go.Figure()
+                for _, row in brand_stats.head(10).iterrows():
+                    if pd.isna(row['price_median']):
+                        continue
+                    fig_box.add_trace(go.Box(
+                        name=row['brand'],
+                        q1=[row['price_q1']], median=[row['price_median']], q3=[row['price_q3']],
+                        lowerfence=[row['price_min']], upperfence=[row['price_max']]
+                    ))
+                fig_box.update_layout(title="Price Distribution by Top 10 Brands", xaxis_title="brand", yaxis_title="current_price")
+                st.plotly_chart(fig_box, use_container_width=True)
+
+            # Discount Analysis
+            discount_df = pd.DataFrame(store.discount_sample(*slice_key))
+            if not discount_df.empty:
+                st.markdown("#### Discount Analysis")
+                fig_discount = px.scatter(
+                    discount_df, 
+                    x="old_price", 
+                    y="current_price", 
+                    color="discount_percentage",
+                    size="discount_percentage",
+                    hover_data=['name', 'brand'],
+                    title="Old Price vs Current Price (Color/Size = Discount %)",
+                    labels={"old_price": "Old Price", "current_price": "Current Price"}
+                )
+                st.plotly_chart(fig_discount, use_container_width=True)
+
+            st.divider()
+
+            # 2. Brand Popularity Top 10
+            st.subheader("2. Brand Popularity Top 10 (by Product Count)")
+            brand_counts = brand_stats.head(10)[['brand', 'product_count']].rename(columns={'product_count': 'count'})
+            fig_brand = px.bar(
+                brand_counts, 
+                x='brand', 
+                y='count', 
+                title="Top 10 Brands by Number of Products",
+                text='count',
+                color='count',
+                color_continuous_scale='Viridis'
+            )
+            st.plotly_chart(fig_brand, use_container_width=True)
+
+            st.divider()
+
+            # 3. Review Count Top 5
+            st.subheader("3. Top 5 Products by Review Count")
+            top_reviews = pd.DataFrame(store.top_reviewed(*slice_key)).head(5)
+            if not top_reviews.empty:
+                top_reviews = top_reviews[['name', 'brand', 'review_count', 'rating', 'current_price', 'url']]
+                st.dataframe(
+                    top_reviews,
+                    column_config={
+                        "url": st.column_config.LinkColumn("Link"),
+                        "current_price": st.column_config.NumberColumn("Price", format="%.2f"),
+                        "rating": st.column_config.NumberColumn("Rating", format="%.1f ⭐"),
+                    },
+                    use_container_width=True,
+                    hide_index=True
+                )
+                fig_reviews = px.bar(
+                    top_reviews,
+                    x='review_count',
+                    y='name',
+                    orientation='h',
+                    title="Top 5 Most Reviewed Products",
+                    color='rating',
+                    hover_data=['brand', 'current_price']
+                )
+                fig_reviews.update_layout(yaxis={'categoryorder':'total ascending'}) # Sort bars
+                st.plotly_chart(fig_reviews, use_container_width=True)
+            else:
+                st.warning("Review count data not available.")
+
+            st.divider()
+
+            # 4. Highest Rated Brands
+            st.subheader("4. Highest Rated Brands (Avg Rating)")
+            st.caption("Minimum 3 products required to be included")
+            rated = brand_stats[(brand_stats['product_count'] >= 3) & brand_stats['avg_rating'].notna()]
+            if not rated.empty:
+                top_rated_brands = rated.nlargest(10, 'avg_rating').rename(columns={'avg_rating': 'rating'})
+                fig_rating = px.bar(
+                    top_rated_brands,
+                    x='brand',
+                    y='rating',
+                    title="Top 10 Highest Rated Brands (Avg Rating)",
+                    color='rating',
+                    range_y=[0, 5], # Rating is 0-5
+                    text_auto='.2f'
+                )
+                st.plotly_chart(fig_rating, use_container_width=True)
+            else:
+                st.warning("Rating data not available.")
+
+    elif df is not None and not df.empty:
         
         # 1. Price Distribution Analysis
         st.subheader("1. Price Distribution Analysis")
@@ -337,10 +552,10 @@ elif page == "New Scrape Job":
         country = [k for k, v in COUNTRIES.items() if v == country_display][0]
         pages = col2.number_input("Number of Pages", min_value=1, max_value=50, value=1)
         
-        category_url = st.text_input("Category URL", help="Full URL (e.g. https://www.jumia.co.ke/phones-tablets/) or Path (e.g. /phones-tablets/)")
+        category_url = st.text_input("Category URL", help="Full URL (e.g. https://www.jumia.co.ke/phones-tablets/) or Path (e.g. /phones-tablets/). Optional with a keyword: leave empty to search the whole site.")
         
         keyword_filter = st.text_input("Keyword Filter (Optional)", 
-                                       help="Filter products by keyword (e.g., 'perfume', '香水'). Leave empty to scrape all products.",
+                                       help="Only products whose name contains every word are scraped (e.g., 'perfume', '香水'). Leave empty to scrape all products.",
                                        placeholder="e.g., perfume, samsung, iphone")
         
         col3, col4 = st.columns(2)
@@ -352,119 +567,74 @@ elif page == "New Scrape Job":
         submitted = st.form_submit_button("🚀 Start Scraping", type="primary")
         
         if submitted:
-            if not category_url:
-                st.error("Please enter a Category URL.")
+            if not category_url and not keyword_filter:
+                st.error("Please enter a Category URL or a keyword.")
             else:
-                status_container = st.status("Initializing Scraper...", expanded=True)
-                
-                try:
-                    # Build CLI command
-                    cmd = [
-                        "python", "main.py",
-                        "--country", country,
-                        "--category", category_url,
-                        "--pages", str(pages),
-                        "--output", output_file,
-                        "--format", output_format
-                    ]
-                    
-                    if not headless:
-                        cmd.append("--no-headless")
-                    
-                    status_container.write(f"Running command: `{' '.join(cmd)}`")
-                    status_container.write("Starting scraper via CLI...")
-                    
-                    # Run the command
-                    process = subprocess.Popen(
-                        cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True,
-                        bufsize=1
-                    )
-                    
-                    # Stream output
-                    output_lines = []
-                    for line in process.stdout:
-                        line = line.strip()
-                        if line:
-                            output_lines.append(line)
-                            if "INFO" in line or "Scraped" in line or "Saved" in line:
-                                status_container.write(line)
-                    
-                    process.wait()
-                    
-                    if process.returncode == 0:
-                        status_container.write("✅ Scraping process completed successfully")
-                        
-                        # Load and count results
-                        if output_format == "jsonl":
-                            if os.path.exists(output_file):
-                                file_size = os.path.getsize(output_file)
-                                st.info(f"Debug: File `{output_file}` found. Size: {file_size} bytes.")
-                                
-                                with open(output_file, 'r', encoding='utf-8') as f:
-                                    products_data = []
-                                    for i, line in enumerate(f):
-                                        line = line.strip()
-                                        if line:
-                                            try:
-                                                products_data.append(json.loads(line))
-                                            except json.JSONDecodeError as e:
-                                                st.warning(f"Debug: Failed to parse line {i+1}: {e}")
-                                
-                                st.info(f"Debug: Loaded {len(products_data)} items from file.")
-                            else:
-                                st.error(f"Debug: File `{output_file}` NOT found in {os.getcwd()}")
-                                products_data = []
-                            
-                            # Apply keyword filter if provided
-                            if keyword_filter:
-                                original_count = len(products_data)
-                                products_data = [p for p in products_data if keyword_filter.lower() in p.get('name', '').lower()]
-                                status_container.write(f"Filtered: {original_count} → {len(products_data)} products (keyword: '{keyword_filter}')")
-                                
-                                # Save filtered results
-                                if len(products_data) < original_count:
-                                    filtered_file = output_file.replace('.jsonl', '_filtered.jsonl')
-                                    with open(filtered_file, 'w', encoding='utf-8') as f:
-                                        for p in products_data:
-                                            f.write(json.dumps(p, ensure_ascii=False) + '\n')
-                                    status_container.write(f"Saved filtered results to: {filtered_file}")
-                            
-                            product_count = len(products_data)
-                            status_container.update(label="✅ Scraping Complete!", state="complete", expanded=False)
-                            
-                            if keyword_filter and len(products_data) < original_count:
-                                st.warning(f"Scraped {original_count} items, but only {product_count} matched your filter: '{keyword_filter}'")
-                                st.success(f"Saved {product_count} filtered items to `{output_file}`")
-                            else:
-                                st.success(f"Successfully scraped {product_count} items to `{output_file}`")
-                            
-                            # Preview
-                            if product_count > 0:
-                                st.subheader("Preview (First 5 items)")
-                                preview_df = pd.DataFrame(products_data[:5])
-                                st.dataframe(preview_df)
-                        else:
-                            status_container.update(label="✅ Scraping Complete!", state="complete", expanded=False)
-                            st.success(f"Data saved to `{output_file}`")
-                    else:
-                        status_container.update(label="❌ Scraping Failed", state="error", expanded=True)
-                        st.error(f"Scraper exited with code {process.returncode}")
-                        st.code('\n'.join(output_lines), language="text")
-                        
-                except Exception as e:
-                    import traceback
-                    error_details = traceback.format_exc()
-                    status_container.update(label="❌ Scraping Failed", state="error", expanded=True)
-                    st.error(f"An error occurred: {str(e)}")
-                    st.code(error_details, language="python")
+                job_id = get_job_runner().submit({
+                    "country": country,
+                    "category": category_url or None,
+                    "pages": int(pages),
+                    "output_file": output_file,
+                    "output_format": output_format,
+                    "headless": headless,
+                    "keyword": keyword_filter or None,
+                })
+                st.success(f"Job `{job_id}` submitted. It keeps running in the background; track it below.")
+
+    # Jobs run in background threads of the dashboard process and survive page reloads
+    st.subheader("Scrape Jobs")
+    runner = get_job_runner()
+    if st.button("🔄 Refresh"):
+        st.rerun()
+
+    jobs = runner.list_jobs()
+    if not jobs:
+        st.info("No scrape jobs yet.")
+
+    STATUS_ICONS = {
+        "queued": "⏳", "running": "🕷️", "completed": "✅",
+        "cancelled": "⏹️", "failed": "❌", "interrupted": "⚠️"
+    }
+    for job in jobs:
+        params = job['params']
+        label = (
+            f"{STATUS_ICONS.get(job['status'], '')} `{job['id']}` · {params['country']} "
+            f"{params['category']} → {params['output_file']} ({job['status']})"
+        )
+        with st.expander(label, expanded=job['status'] in ('queued', 'running')):
+            max_pages = job['max_pages'] or 1
+            st.progress(min(job['pages_done'] / max_pages, 1.0), text=f"Pages {job['pages_done']}/{max_pages}")
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Items", job['items'])
+            m2.metric("Items/s", f"{job['items_per_sec'] or 0:.2f}")
+            if job['matched_items'] is not None:
+                m3.metric(f"Matched '{params.get('keyword')}'", job['matched_items'])
+
+            if job['error']:
+                st.error(job['error'])
+            if job['status'] in ('queued', 'running'):
+                if st.button("Cancel", key=f"cancel_{job['id']}"):
+                    runner.cancel(job['id'])
+                    st.rerun()
+
+            if job['preview']:
+                st.caption("Preview (First 5 items)")
+                st.dataframe(pd.DataFrame(job['preview']))
+
+            events = runner.events(job['id'])
+            if events:
+                st.code("\n".join(
+                    f"{pd.Timestamp(e['ts'], unit='s'):%H:%M:%S} {e['event']} {json.dumps(e['data'], ensure_ascii=False)}"
+                    for e in events[-20:]
+                ), language="text")
 
 # ==========================================
 # PAGE: Category Research
 # ==========================================
 elif page == "Category Research":
+    import subprocess
+    from deep_translator import GoogleTranslator
+
     st.title("🗂️ Jumia Category Research")
     st.markdown("Analyze the structure and size of Jumia's product catalog (3-Level Hierarchy).")
 
@@ -3,18 +3,39 @@ import json
 import time
 import re
 from playwright.sync_api import sync_playwright
+from jumia_scraper.useragents import get_pool
+from jumia_scraper.ratelimit import get_limiter
+from jumia_scraper.retry import classify
 
-def get_category_stats(mode="structure_only", output_file="jumia_hierarchy.json", limit=None):
+
+def paced_goto(page, url, timeout):
+    """page.goto() through the host's shared adaptive rate limiter"""
+    limiter = get_limiter(url)
+    limiter.acquire()
+    started = time.monotonic()
+    try:
+        response = page.goto(url, timeout=timeout)
+    except Exception as e:
+        # Only a bot challenge counts as throttling; timeouts, DNS and other failures keep the rate
+        error = classify(e)
+        limiter.record(latency=time.monotonic() - started, status=getattr(error, "status", None),
+                       throttled=error.kind == "challenge", retry_after=error.retry_after, failed=True)
+        raise
+    limiter.record(latency=time.monotonic() - started, status=response.status if response else None)
+    return response
+
+DEFAULT_BASE_URL = "https://www.jumia.com.ng"
+
+def get_category_stats(mode="structure_only", output_file="jumia_hierarchy.json", limit=None, base_url=DEFAULT_BASE_URL):
+    base_url = base_url.rstrip("/")
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
+        context = browser.new_context(**get_pool().for_context("ng").context_options())
         page = context.new_page()
         
         print("Navigating to Jumia Nigeria homepage...")
         try:
-            page.goto("https://www.jumia.com.ng/", timeout=60000)
+            paced_goto(page, base_url + "/", timeout=60000)
             
             try:
                 close_btn = page.wait_for_selector("#newsletter_popup_close-cta", timeout=5000)
@@ -46,7 +67,7 @@ def get_category_stats(mode="structure_only", output_file="jumia_hierarchy.json"
             l1_name = text_el.text_content() if text_el else "Unknown"
             l1_url = item.get_attribute("href")
             if l1_url and not l1_url.startswith("http"):
-                l1_url = "https://www.jumia.com.ng" + l1_url
+                l1_url = base_url + l1_url
             
             print(f"Processing Level 1: {l1_name}")
             
@@ -66,7 +87,7 @@ def get_category_stats(mode="structure_only", output_file="jumia_hierarchy.json"
                         l2_name = tit_el.text_content()
                         l2_url = tit_el.get_attribute("href")
                         if l2_url and not l2_url.startswith("http"):
-                            l2_url = "https://www.jumia.com.ng" + l2_url
+                            l2_url = base_url + l2_url
                         
                         l2_data = {
                             "name": l2_name,
@@ -79,7 +100,7 @@ def get_category_stats(mode="structure_only", output_file="jumia_hierarchy.json"
                             l3_name = s_item.text_content()
                             l3_url = s_item.get_attribute("href")
                             if l3_url and not l3_url.startswith("http"):
-                                l3_url = "https://www.jumia.com.ng" + l3_url
+                                l3_url = base_url + l3_url
                                 
                             l3_data = {
                                 "name": l3_name,
@@ -106,7 +127,7 @@ def get_category_stats(mode="structure_only", output_file="jumia_hierarchy.json"
                             continue
                         
                         try:
-                            page.goto(l3["url"], timeout=30000)
+                            paced_goto(page, l3["url"], timeout=30000)
                             
                             count = 0
                             found = False
@@ -160,6 +181,7 @@ if __name__ == "__main__":
     parser.add_argument("--mode", choices=["structure_only", "with_counts"], default="structure_only")
     parser.add_argument("--output", default="jumia_hierarchy.json")
     parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="Site root to crawl (e.g. a local fixture server)")
     args = parser.parse_args()
     
-    get_category_stats(mode=args.mode, output_file=args.output, limit=args.limit)
+    get_category_stats(mode=args.mode, output_file=args.output, limit=args.limit, base_url=args.base_url)
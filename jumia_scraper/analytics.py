@@ -0,0 +1,242 @@
+import argparse
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import product
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger("jumia_scraper.analytics")
+
+# Every summary row is keyed by (country, category, crawl_date); ALL marks a rolled-up dimension
+ALL = '*'
+DIMENSIONS = ['country', 'category', 'crawl_date']
+HISTOGRAM_BINS = 50
+TOP_REVIEWED = 10
+DISCOUNT_SAMPLE = 2000
+
+SUMMARY_TABLES = {
+    'agg_summary': (
+        "country TEXT, category TEXT, crawl_date TEXT, product_count INTEGER, "
+        "avg_price REAL, avg_discount REAL, total_reviews INTEGER, refreshed_at TEXT"
+    ),
+    'agg_price_histogram': (
+        "country TEXT, category TEXT, crawl_date TEXT, bin INTEGER, "
+        "bin_start REAL, bin_end REAL, count INTEGER"
+    ),
+    'agg_brand_stats': (
+        "country TEXT, category TEXT, crawl_date TEXT, brand TEXT, product_count INTEGER, "
+        "avg_price REAL, avg_rating REAL, price_min REAL, price_q1 REAL, price_median REAL, "
+        "price_q3 REAL, price_max REAL"
+    ),
+    'agg_top_reviewed': (
+        "country TEXT, category TEXT, crawl_date TEXT, rank INTEGER, product_id TEXT, name TEXT, "
+        "brand TEXT, review_count INTEGER, rating REAL, current_price REAL, url TEXT"
+    ),
+    'agg_discount_sample': (
+        "country TEXT, category TEXT, crawl_date TEXT, name TEXT, brand TEXT, "
+        "old_price REAL, current_price REAL, discount_percentage REAL"
+    ),
+}
+
+
+class AnalyticsStore:
+    """
+    Materialized summaries behind the dashboard's Data Analytics page.
+
+    refresh() scans the products table once and rewrites the agg_* tables
+    for every combination of country / top-level category / crawl date,
+    including rolled-up ('*') combinations, so the page reads a few
+    kilobytes instead of the full product table.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def has_aggregates(self) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='agg_summary'"
+            ).fetchone()
+        return row is not None
+
+    def refresh(self, conn: Optional[sqlite3.Connection] = None):
+        """Recompute every summary table; pass conn to join the caller's transaction"""
+        if conn is None:
+            with self._connect() as own_conn:
+                return self.refresh(own_conn)
+
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(products)")}
+        if not columns:
+            logger.warning(f"No products table in {self.db_path}; nothing to aggregate")
+            return
+
+        def col(name: str, expr: str = None) -> str:
+            return (expr or name) if name in columns else "NULL"
+
+        from .config import ScraperConfig
+
+        # Rows saved before products carried a country code: tell the site from the url
+        site_of_url = "CASE " + " ".join(
+            f"WHEN url LIKE '{base}/%' THEN '{code}'"
+            for code, base in ScraperConfig.model_fields['BASE_URL_MAP'].default.items()
+        ) + " END"
+
+        conn.execute("DROP TABLE IF EXISTS temp._agg_base")
+        conn.execute(f"""
+            CREATE TEMP TABLE _agg_base AS
+            SELECT
+                COALESCE({col('country')}, {col('url', site_of_url)}, 'Unknown') AS country,
+                COALESCE({col('category_path', "CASE WHEN json_valid(category_path) THEN json_extract(category_path, '$[0]') END")}, 'Unknown') AS category,
+                COALESCE(substr({col('crawled_at')}, 1, 10), 'Unknown') AS crawl_date,
+                {col('product_id')} AS product_id,
+                name,
+                COALESCE(NULLIF({col('brand')}, ''), 'Unknown') AS brand,
+                {col('url')} AS url,
+                CAST({col('current_price')} AS REAL) AS current_price,
+                CAST({col('old_price')} AS REAL) AS old_price,
+                COALESCE(CAST({col('discount_percentage')} AS REAL), 0) AS discount_percentage,
+                CAST({col('rating')} AS REAL) AS rating,
+                CAST({col('review_count')} AS INTEGER) AS review_count
+            FROM products
+        """)
+
+        for table, schema in SUMMARY_TABLES.items():
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"CREATE TABLE {table} ({schema})")
+            conn.execute(f"CREATE INDEX idx_{table}_key ON {table} (country, category, crawl_date)")
+
+        refreshed_at = datetime.utcnow().isoformat()
+        # Emulate GROUPING SETS: each dimension is either kept or rolled up to '*'
+        for keep in product([True, False], repeat=len(DIMENSIONS)):
+            dims = ", ".join(f"{d if k else repr(ALL)} AS {d}" for d, k in zip(DIMENSIONS, keep))
+            self._aggregate(conn, dims, refreshed_at)
+
+        conn.execute("DROP TABLE temp._agg_base")
+        logger.info(f"Refreshed analytics aggregates in {self.db_path}")
+
+    def _aggregate(self, conn: sqlite3.Connection, dims: str, refreshed_at: str):
+        # Base rows with rolled-up dimensions replaced by '*'
+        measures = "product_id, name, brand, url, current_price, old_price, discount_percentage, rating, review_count"
+        base = f"SELECT {dims}, {measures} FROM temp._agg_base"
+        key = "g.country, g.category, g.crawl_date"
+
+        conn.execute(f"""
+            INSERT INTO agg_summary
+            SELECT country, category, crawl_date, COUNT(*), AVG(current_price),
+                   AVG(discount_percentage), SUM(review_count), ?
+            FROM ({base}) GROUP BY country, category, crawl_date
+        """, (refreshed_at,))
+
+        conn.execute(f"""
+            INSERT INTO agg_price_histogram
+            WITH g AS ({base}),
+            bounds AS (
+                SELECT country, category, crawl_date, MIN(current_price) AS lo,
+                       (MAX(current_price) - MIN(current_price)) / {HISTOGRAM_BINS} AS width
+                FROM g WHERE current_price IS NOT NULL GROUP BY country, category, crawl_date
+            ),
+            binned AS (
+                SELECT {key}, b.lo, b.width,
+                       CASE WHEN b.width > 0
+                            THEN MIN({HISTOGRAM_BINS - 1}, CAST((g.current_price - b.lo) / b.width AS INTEGER))
+                            ELSE 0 END AS bin
+                FROM g JOIN bounds b USING (country, category, crawl_date)
+                WHERE g.current_price IS NOT NULL
+            )
+            SELECT country, category, crawl_date, bin, lo + bin * width, lo + (bin + 1) * width, COUNT(*)
+            FROM binned GROUP BY country, category, crawl_date, bin
+        """)
+
+        conn.execute(f"""
+            INSERT INTO agg_brand_stats
+            WITH g AS ({base}),
+            ranked AS (
+                SELECT {key}, g.brand, g.current_price, g.rating,
+                       ROW_NUMBER() OVER w AS rn, COUNT(g.current_price) OVER p AS n
+                FROM g
+                WINDOW p AS (PARTITION BY {key}, g.brand),
+                       w AS (PARTITION BY {key}, g.brand ORDER BY g.current_price IS NULL, g.current_price)
+            )
+            SELECT country, category, crawl_date, brand, COUNT(*), AVG(current_price), AVG(rating),
+                   MIN(current_price),
+                   MAX(CASE WHEN rn = CAST(0.25 * (n - 1) AS INTEGER) + 1 THEN current_price END),
+                   MAX(CASE WHEN rn = CAST(0.50 * (n - 1) AS INTEGER) + 1 THEN current_price END),
+                   MAX(CASE WHEN rn = CAST(0.75 * (n - 1) AS INTEGER) + 1 THEN current_price END),
+                   MAX(current_price)
+            FROM ranked GROUP BY country, category, crawl_date, brand
+        """)
+
+        conn.execute(f"""
+            INSERT INTO agg_top_reviewed
+            SELECT country, category, crawl_date, rk, product_id, name, brand, review_count, rating, current_price, url
+            FROM (
+                SELECT g.*, ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY g.review_count DESC) AS rk
+                FROM ({base}) g WHERE g.review_count IS NOT NULL
+            ) WHERE rk <= {TOP_REVIEWED}
+        """)
+
+        conn.execute(f"""
+            INSERT INTO agg_discount_sample
+            SELECT country, category, crawl_date, name, brand, old_price, current_price, discount_percentage
+            FROM (
+                SELECT g.*, ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY g.discount_percentage DESC) AS rk
+                FROM ({base}) g WHERE g.old_price IS NOT NULL
+            ) WHERE rk <= {DISCOUNT_SAMPLE}
+        """)
+
+    # ---------- Readers used by the dashboard ----------
+
+    def dimension_values(self) -> Dict[str, List[str]]:
+        """Distinct countries, categories and crawl dates available in the summaries"""
+        values = {}
+        with self._connect() as conn:
+            for dim in DIMENSIONS:
+                rows = conn.execute(
+                    f"SELECT DISTINCT {dim} FROM agg_summary WHERE {dim} != ? ORDER BY {dim}", (ALL,)
+                ).fetchall()
+                values[dim] = [row[0] for row in rows]
+        return values
+
+    def _read(self, table: str, country: str, category: str, crawl_date: str, order: str = "") -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM {table} WHERE country = ? AND category = ? AND crawl_date = ? {order}",
+                (country, category, crawl_date),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def summary(self, country: str = ALL, category: str = ALL, crawl_date: str = ALL) -> Optional[Dict[str, Any]]:
+        rows = self._read('agg_summary', country, category, crawl_date)
+        return rows[0] if rows else None
+
+    def price_histogram(self, country: str = ALL, category: str = ALL, crawl_date: str = ALL) -> List[Dict[str, Any]]:
+        return self._read('agg_price_histogram', country, category, crawl_date, "ORDER BY bin")
+
+    def brand_stats(self, country: str = ALL, category: str = ALL, crawl_date: str = ALL) -> List[Dict[str, Any]]:
+        return self._read('agg_brand_stats', country, category, crawl_date, "ORDER BY product_count DESC")
+
+    def top_reviewed(self, country: str = ALL, category: str = ALL, crawl_date: str = ALL) -> List[Dict[str, Any]]:
+        return self._read('agg_top_reviewed', country, category, crawl_date, "ORDER BY rank")
+
+    def discount_sample(self, country: str = ALL, category: str = ALL, crawl_date: str = ALL) -> List[Dict[str, Any]]:
+        return self._read('agg_discount_sample', country, category, crawl_date)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild analytics summary tables")
+    parser.add_argument("db", help="SQLite product database")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    AnalyticsStore(args.db).refresh()
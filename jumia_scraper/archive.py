@@ -0,0 +1,239 @@
+import argparse
+import gzip
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urldefrag
+import logging
+
+logger = logging.getLogger("jumia_scraper.archive")
+
+ARCHIVE_MODES = ("off", "record", "replay")
+
+
+def normalize_url(url: str) -> str:
+    """Archive key for a URL: fragments (#catalog-listing) never reach the server"""
+    return urldefrag(url)[0]
+
+
+class SnapshotArchive:
+    """
+    Content-addressed, gzip-compressed store of fetched pages.
+
+    Bodies live under objects/<sha[:2]>/<sha>.html.gz, keyed by the SHA-256
+    of the raw bytes, so a page fetched unchanged on many days is stored
+    once. index.db records every fetch (url, country, time, status, hash),
+    which is what replay and re-extraction read.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index_path = os.path.join(root, "index.db")
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL,
+                    country TEXT,
+                    fetched_at REAL NOT NULL,
+                    status INTEGER,
+                    sha256 TEXT NOT NULL,
+                    size INTEGER
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_url ON snapshots (url, fetched_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_time ON snapshots (fetched_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _object_path(self, sha: str) -> str:
+        return os.path.join(self.objects_dir, sha[:2], sha + ".html.gz")
+
+    # ---------- Record ----------
+
+    def put(self, url: str, body: bytes, status: int = 200, country: Optional[str] = None,
+            fetched_at: Optional[float] = None) -> str:
+        """Store a fetched page; identical bodies share one object. Returns its hash."""
+        sha = hashlib.sha256(body).hexdigest()
+        path = self._object_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write-then-rename so a crash never leaves a truncated object behind
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(body, compresslevel=6))
+            os.replace(tmp, path)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO snapshots (url, country, fetched_at, status, sha256, size) VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), country, fetched_at or time.time(), status, sha, len(body)),
+            )
+        return sha
+
+    # ---------- Read ----------
+
+    def get(self, sha: str) -> bytes:
+        with open(self._object_path(sha), "rb") as f:
+            return gzip.decompress(f.read())
+
+    def latest(self, url: str, before: Optional[float] = None) -> Optional[Dict[str, object]]:
+        """Newest snapshot of url (optionally fetched before a timestamp)"""
+        sql = "SELECT * FROM snapshots WHERE url = ?"
+        params: List[object] = [normalize_url(url)]
+        if before is not None:
+            sql += " AND fetched_at <= ?"
+            params.append(before)
+        with self._connect() as conn:
+            row = conn.execute(sql + " ORDER BY fetched_at DESC LIMIT 1", params).fetchone()
+        return dict(row) if row else None
+
+    def snapshots(self, since: Optional[float] = None, until: Optional[float] = None,
+                  url_like: Optional[str] = None, country: Optional[str] = None) -> List[Dict[str, object]]:
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("fetched_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("fetched_at <= ?")
+            params.append(until)
+        if url_like:
+            clauses.append("url LIKE ?")
+            params.append(f"%{url_like}%")
+        if country:
+            clauses.append("country = ?")
+            params.append(country)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT * FROM snapshots {where} ORDER BY fetched_at", params).fetchall()
+        return [dict(r) for r in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS fetches, COUNT(DISTINCT sha256) AS objects, COUNT(DISTINCT url) AS urls, "
+                "COALESCE(SUM(size), 0) AS raw_bytes FROM snapshots"
+            ).fetchone()
+        stored = 0
+        for dirpath, _, files in os.walk(self.objects_dir):
+            stored += sum(os.path.getsize(os.path.join(dirpath, f)) for f in files)
+        return {**dict(row), "stored_bytes": stored}
+
+    # ---------- Replay ----------
+
+    def route_handler(self, before: Optional[float] = None, on_miss=None):
+        """
+        Playwright route handler serving navigations from the archive. Page
+        documents are fulfilled from their newest snapshot (404 when missing);
+        every other request is aborted, so replay never touches the network.
+        """
+
+        def handle(route):
+            request = route.request
+            if request.resource_type != "document":
+                route.abort()
+                return
+            snapshot = self.latest(request.url, before)
+            if snapshot is None:
+                if on_miss:
+                    on_miss(request.url)
+                route.fulfill(status=404, content_type="text/html", body="<html><title>Not archived</title></html>")
+                return
+            route.fulfill(
+                status=snapshot["status"] or 200,
+                content_type="text/html; charset=utf-8",
+                body=self.get(snapshot["sha256"]),
+            )
+
+        return handle
+
+
+def reextract(archive: SnapshotArchive, output_file: str, output_format: str = "jsonl",
+              since: Optional[float] = None, until: Optional[float] = None,
+              url_like: Optional[str] = None, country: Optional[str] = None) -> int:
+    """
+    Re-runs extraction over archived listing pages without any network: each
+    snapshot is loaded into one offline browser page, cards are pulled with
+    EXTRACT_CARDS_JS and normalized exactly like a live crawl, and products
+    are stamped with the snapshot's fetch time. Returns the product count.
+    """
+    from playwright.sync_api import sync_playwright
+
+    from .batch import ProductBatch
+    from .config import ScraperConfig
+    from .models import ProductItem
+    from .normalize import EXTRACT_CARDS_JS, normalize_cards
+    from .scraper import PRODUCT_CARD_SELECTOR
+    from .storage import StorageHandler
+
+    base_urls = ScraperConfig.model_fields['BASE_URL_MAP'].default
+    rows = archive.snapshots(since, until, url_like, country)
+    products = ProductBatch()
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.route("**/*", lambda route: route.abort())
+        for row in rows:
+            if row["status"] and row["status"] >= 400:
+                continue
+            html = archive.get(row["sha256"]).decode("utf-8", errors="replace")
+            page.set_content(html, wait_until="domcontentloaded")
+            raw_cards = page.locator(PRODUCT_CARD_SELECTOR).evaluate_all(EXTRACT_CARDS_JS)
+            code = (row["country"] or "ke").lower()
+            crawled_at = datetime.utcfromtimestamp(row["fetched_at"])
+            for fields in normalize_cards(raw_cards, base_urls.get(code, "https://www.jumia.co.ke"), code):
+                products.append(ProductItem.trusted(crawled_at=crawled_at, **fields))
+            logger.info(f"{row['url']} @ {crawled_at:%Y-%m-%d %H:%M}: {len(raw_cards)} cards")
+        browser.close()
+
+    if products:
+        StorageHandler(output_file, output_format).save(products)
+    return len(products)
+
+
+def _parse_date(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and re-extract the HTML snapshot archive")
+    parser.add_argument("archive", help="Archive directory (ARCHIVE_DIR)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Fetch / object / size totals")
+    ls = sub.add_parser("list", help="List snapshots")
+    re_ = sub.add_parser("reextract", help="Re-run extraction over archived pages")
+    re_.add_argument("--output", required=True)
+    re_.add_argument("--format", default="jsonl", help="jsonl, csv or sqlite")
+    for p in (ls, re_):
+        p.add_argument("--since", help="ISO date/time")
+        p.add_argument("--until", help="ISO date/time")
+        p.add_argument("--url", help="Substring of the page URL")
+        p.add_argument("--country")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    store = SnapshotArchive(args.archive)
+    if args.command == "stats":
+        print(store.stats())
+    elif args.command == "list":
+        for row in store.snapshots(_parse_date(args.since), _parse_date(args.until), args.url, args.country):
+            fetched = datetime.fromtimestamp(row["fetched_at"]).isoformat(timespec="seconds")
+            print(f"{fetched}  {row['status']}  {row['sha256'][:12]}  {row['size']:>9}  {row['url']}")
+    else:
+        count = reextract(store, args.output, args.format, _parse_date(args.since), _parse_date(args.until),
+                          args.url, args.country)
+        print(f"Re-extracted {count} products into {args.output}")
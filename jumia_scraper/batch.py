@@ -0,0 +1,244 @@
+import json
+import sys
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+from itertools import repeat
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .models import ProductItem
+
+# Column kinds for ProductItem fields; anything not listed is kept as a plain object list
+FLOAT_FIELDS = {'current_price', 'price_max', 'rating', 'old_price', 'discount_percentage', 'rating_ratio', 'ga4_price'}
+INT_FIELDS = {'review_count', 'list_position'}
+BOOL_FIELDS = {'is_express', 'is_second_chance', 'is_shipped_from_abroad'}
+LIST_FIELDS = {'category_path', 'gtm_tags'}
+# Low-cardinality strings repeated across thousands of rows
+INTERNED_FIELDS = {'currency', 'brand', 'seller_id', 'promo_tag', 'ga4_category_1', 'ga4_category_2'}
+
+TYPECODES = {**{f: 'd' for f in FLOAT_FIELDS}, **{f: 'q' for f in INT_FIELDS}, **{f: 'b' for f in BOOL_FIELDS}}
+# Kept in every projection: the key outputs are merged/diffed on and the crawl timestamp
+REQUIRED_FIELDS = ('product_id', 'crawled_at')
+
+# A row_type() namedtuple: only the projected fields, as attributes and in field order
+ProductRow = Tuple[Any, ...]
+# What parsing a page or iterating a batch yields: ProductItem, or ProductRow on projected runs
+Product = Union[ProductItem, ProductRow]
+
+
+def select_fields(requested: Optional[Iterable[str]]) -> List[str]:
+    """
+    Validated projection of ProductItem fields, in model order, always
+    including REQUIRED_FIELDS; None selects every field.
+    """
+    all_fields = list(ProductItem.model_fields.keys())
+    if requested is None:
+        return all_fields
+    requested = {name.strip() for name in requested if name.strip()}
+    unknown = requested - set(all_fields)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.update(REQUIRED_FIELDS)
+    return [name for name in all_fields if name in requested]
+
+
+@lru_cache(maxsize=None)
+def row_type(fields: Tuple[str, ...]):
+    """
+    Row class of a projection: a namedtuple with only the selected fields, so
+    unselected ones raise AttributeError instead of showing model defaults.
+    """
+    return namedtuple("ProductRow", fields)
+
+
+class _NullableArray:
+    """Typed array plus a validity mask, so None survives without boxing every value"""
+
+    __slots__ = ('data', 'mask', 'cast')
+
+    def __init__(self, typecode: str):
+        self.data = array(typecode)
+        self.mask = bytearray()
+        self.cast = {'d': float, 'q': int, 'b': bool}[typecode]
+
+    def append(self, value):
+        if value is None:
+            self.data.append(0)
+            self.mask.append(0)
+        else:
+            self.data.append(value)
+            self.mask.append(1)
+
+    def __getitem__(self, i):
+        return self.cast(self.data[i]) if self.mask[i] else None
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        cast = self.cast
+        return (cast(v) if m else None for v, m in zip(self.data, self.mask))
+
+
+class ProductBatch:
+    """
+    Columnar, memory-compact container for scraped products.
+
+    Numeric and boolean fields live in typed arrays, repeated strings
+    (currency, brand, seller_id, ...) are interned, and identical category
+    paths / tag lists share one tuple. Storage writes straight from the
+    columns; iterating yields ProductItem objects for existing callers, or
+    row_type() rows when the batch holds a projection (ScraperConfig.FIELDS).
+    """
+
+    def __init__(self, fields: Optional[Sequence[str]] = None):
+        self.fields: List[str] = list(fields or ProductItem.model_fields.keys())
+        self.projected = set(self.fields) != set(ProductItem.model_fields)
+        self._columns: Dict[str, Any] = {}
+        for name in self.fields:
+            self._columns[name] = _NullableArray(TYPECODES[name]) if name in TYPECODES else []
+        self._tuple_cache: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._length = 0
+
+    @classmethod
+    def from_items(cls, items: Iterable[Product], fields: Optional[Sequence[str]] = None) -> "ProductBatch":
+        """Batch of items; rows of a projection keep their own fields unless fields is given"""
+        if fields is None:
+            items = list(items)
+            if items and hasattr(items[0], "_fields"):
+                fields = items[0]._fields
+        batch = cls(fields)
+        batch.extend(items)
+        return batch
+
+    # ---------- Building ----------
+
+    def _share(self, values) -> Tuple[str, ...]:
+        key = tuple(sys.intern(v) for v in (values or ()))
+        return self._tuple_cache.setdefault(key, key)
+
+    def append_values(self, **values):
+        """Append one product from field values (missing fields become None/empty)"""
+        for name in self.fields:
+            value = values.get(name)
+            if name in LIST_FIELDS:
+                value = self._share(value)
+            elif name in INTERNED_FIELDS and value is not None:
+                value = sys.intern(value)
+            self._columns[name].append(value)
+        self._length += 1
+
+    def append(self, item: Product):
+        self.append_values(**{name: getattr(item, name, None) for name in self.fields})
+
+    def extend(self, items: Union["ProductBatch", Iterable[Product]]):
+        if isinstance(items, ProductBatch):
+            for row in items.rows():
+                self.append_values(**dict(zip(items.fields, row)))
+            return
+        for item in items:
+            self.append(item)
+
+    # ---------- Access ----------
+
+    def __len__(self) -> int:
+        return self._length
+
+    def column(self, name: str) -> Iterable[Any]:
+        """A column's values; list fields come back as shared tuples, absent fields as None"""
+        if name not in self._columns:
+            return repeat(None, self._length)
+        return self._columns[name]
+
+    def rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Row tuples in self.fields order, read straight from the columns"""
+        return zip(*(iter(self._columns[name]) for name in self.fields))
+
+    def _item(self, i: int):
+        values = {}
+        for name in self.fields:
+            value = self._columns[name][i]
+            values[name] = list(value) if name in LIST_FIELDS else value
+        if self.projected:
+            return row_type(tuple(self.fields))(**values)
+        return ProductItem.trusted(**values)
+
+    def __iter__(self) -> Iterator[Product]:
+        return (self._item(i) for i in range(self._length))
+
+    def __getitem__(self, key) -> Union[Product, List[Product]]:
+        if isinstance(key, slice):
+            return [self._item(i) for i in range(*key.indices(self._length))]
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("ProductBatch index out of range")
+        return self._item(key)
+
+    def take(self, indices: Iterable[int]) -> "ProductBatch":
+        """New batch with the rows at indices"""
+        batch = ProductBatch(self.fields)
+        for i in indices:
+            batch.append_values(**{name: self._columns[name][i] for name in self.fields})
+        return batch
+
+    # ---------- Export ----------
+
+    @staticmethod
+    def _json_value(value):
+        if isinstance(value, tuple):
+            return list(value)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    def to_dicts(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """JSON-ready dicts (lists as lists, datetimes as ISO strings)"""
+        out = []
+        for n, row in enumerate(self.rows()):
+            if limit is not None and n >= limit:
+                break
+            out.append({name: self._json_value(v) for name, v in zip(self.fields, row)})
+        return out
+
+    def iter_json(self) -> Iterator[str]:
+        """One compact JSON document per row, matching ProductItem.model_dump_json()"""
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=self._json_value).encode
+        fields = self.fields
+        for row in self.rows():
+            yield dumps(dict(zip(fields, row)))
+
+    def to_pandas(self):
+        import pandas as pd
+
+        data = {}
+        for name in self.fields:
+            column = self._columns[name]
+            if name in LIST_FIELDS:
+                data[name] = [list(v) for v in column]
+            elif name in INTERNED_FIELDS:
+                data[name] = pd.Categorical(column)
+            else:
+                data[name] = list(column)
+        return pd.DataFrame(data, columns=self.fields)
+
+    def to_arrow(self):
+        """pyarrow.Table with dictionary-encoded string columns (requires pyarrow)"""
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("ProductBatch.to_arrow() requires pyarrow: pip install pyarrow") from e
+
+        arrays = {}
+        for name in self.fields:
+            column = self._columns[name]
+            if isinstance(column, _NullableArray):
+                arrays[name] = pa.array(list(column))
+            elif name in LIST_FIELDS:
+                arrays[name] = pa.array([list(v) for v in column], type=pa.list_(pa.string()))
+            elif name in INTERNED_FIELDS:
+                arrays[name] = pa.array(column, type=pa.string()).dictionary_encode()
+            else:
+                arrays[name] = pa.array(column)
+        return pa.table(arrays)
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+from urllib.parse import quote_plus
 
 class ScraperConfig(BaseSettings):
     BASE_URL_MAP: Dict[str, str] = {
@@ -15,15 +16,59 @@ class ScraperConfig(BaseSettings):
     }
     
     COUNTRY_CODE: str = "ke"
+    BASE_URL: Optional[str] = None # overrides BASE_URL_MAP, e.g. a local fixture server for benchmarks
     CATEGORY_URL: str
     MAX_PAGES: int = 5
+    KEYWORD: Optional[str] = None # keep only products whose name contains every term, checked in the browser before extraction
     HEADLESS: bool = True
     PROXY_URL: Optional[str] = None
+    PROXY_LIST: Optional[str] = None # comma separated proxies or a file with one per line; overrides PROXY_URL
     TIMEOUT: int = 30000 # ms
+    MAX_RETRIES: int = 4 # navigation attempts per page
+    RETRY_BACKOFF_BASE: float = 1.0 # seconds
+    RETRY_BACKOFF_CAP: float = 60.0 # seconds
+    RATE_LIMIT: float = 0.5 # initial requests/s per Jumia host, tuned at runtime (AIMD)
+    RATE_LIMIT_MAX: float = 4.0 # requests/s ceiling per host
+    RATE_LIMIT_DB: Optional[str] = None # SQLite file (or crawl queue server URL) holding the limiter state, shared by every process using it
+    MAX_FAILED_PAGES: int = 3 # consecutive failed pages before a category is abandoned
+    USER_AGENT_FILE: Optional[str] = None # JSON list of UA profiles; defaults to the bundled list
+    STORAGE_STATE_DIR: Optional[str] = None # opt-in: directory of per-country cookies/localStorage reused across runs
+    ARCHIVE_DIR: Optional[str] = None # HTML snapshot archive (see archive.py)
+    ARCHIVE_MODE: str = "off" # off, record (save every fetched page), replay (serve pages from the archive)
     
+    IMAGES_DIR: Optional[str] = None # download product images into this content-addressed store (see images.py)
+    IMAGE_WORKERS: int = 16 # concurrent image downloads
+    IMAGE_PER_HOST: int = 4 # concurrent image downloads per host
+    THUMBNAIL_SIZE: int = 256 # px, bounding box of thumbnails (needs Pillow); 0 disables
+
     OUTPUT_FILE: str = "jumia_products.jsonl"
     OUTPUT_FORMAT: str = "jsonl" # jsonl, csv, sqlite
+    FIELDS: Optional[List[str]] = None # extract and store only these ProductItem fields (plus product_id, crawled_at); None = all
+
+    METRICS_FILE: Optional[str] = None # JSON run report (per-stage timings, retries, bytes)
+    METRICS_PORT: Optional[int] = None # serve Prometheus text at :PORT/metrics while running
 
     @property
     def base_url(self) -> str:
+        if self.BASE_URL:
+            return self.BASE_URL.rstrip("/")
         return self.BASE_URL_MAP.get(self.COUNTRY_CODE.lower(), "https://www.jumia.co.ke")
+
+    @classmethod
+    def build_category_url(cls, country: str, category: str, base_url: Optional[str] = None) -> str:
+        """Construct full URL if only a path (e.g. /phones-tablets/) is given"""
+        if category.startswith("http"):
+            return category
+        if base_url:
+            base_url = base_url.rstrip("/")
+        else:
+            base_url_map = cls.model_fields['BASE_URL_MAP'].default
+            base_url = base_url_map.get(country.lower(), "https://www.jumia.co.ke")
+        if not category.startswith("/"):
+            category = "/" + category
+        return base_url + category
+
+    @classmethod
+    def build_search_url(cls, country: str, keyword: str, base_url: Optional[str] = None) -> str:
+        """Jumia's own search listing (catalog/?q=), used when a keyword is given without a category"""
+        return cls.build_category_url(country, f"/catalog/?q={quote_plus(keyword.strip())}", base_url)
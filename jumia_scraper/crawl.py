@@ -0,0 +1,325 @@
+"""
+Sharded crawling: a coordinator fills a TaskQueue with (country, category,
+page) tasks, worker processes each drive one browser and lease pages from
+it, and the coordinator merges finished pages into the StorageHandler
+output. The queue is a SQLite file in WAL mode, which needs shared memory
+between its users: keep it on a local disk (not NFS/SMB). Workers on the
+same host open the file; workers on other hosts reach it through `serve`
+(see queueserver.py) by passing its URL instead of a path.
+
+    python -m jumia_scraper.crawl enqueue crawl.db --country ng ke --category /phones-tablets/ --pages 50
+    python -m jumia_scraper.crawl work crawl.db --workers 8
+    python -m jumia_scraper.crawl merge crawl.db --output products.db --format sqlite
+    python -m jumia_scraper.crawl run crawl.db --workers 8 ... --output products.db --format sqlite
+
+    python -m jumia_scraper.crawl serve crawl.db --host 0.0.0.0 --port 8765   # coordinator
+    python -m jumia_scraper.crawl work http://coordinator:8765 --workers 8    # other hosts
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+import logging
+
+from .taskqueue import Task, TaskQueue, open_queue
+
+logger = logging.getLogger("jumia_scraper.crawl")
+
+TASK_KEY = ("country", "category", "page")
+
+
+def enqueue(queue: TaskQueue, countries: Iterable[str], categories: Iterable[str], pages: int) -> int:
+    """One task per listing page; already queued pages are skipped"""
+    categories = list(categories)
+    tasks = [
+        {"country": country.lower(), "category": category, "page": page}
+        for country in countries
+        for category in categories
+        for page in range(1, pages + 1)
+    ]
+    added = queue.put(tasks, TASK_KEY)
+    logger.info(f"Queued {added} new tasks ({len(tasks) - added} already present)")
+    return added
+
+
+class _Heartbeat:
+    """Keeps a task's lease alive while a slow page (retries, backoff) is being scraped"""
+
+    def __init__(self, queue: TaskQueue, task: Task, visibility: float):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(queue, task, visibility), daemon=True)
+
+    def _run(self, queue, task, visibility):
+        while not self._stop.wait(visibility / 3):
+            try:
+                if not queue.heartbeat(task, visibility):
+                    return
+            except Exception as e:
+                # A remote queue may be briefly unreachable; the next beat can still save the lease
+                logger.warning(f"Heartbeat for {task.key} failed: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        # A heartbeat already in flight must not extend the lease after complete()/fail()
+        self._thread.join()
+
+
+class CrawlWorker:
+    """
+    Leases tasks until the queue is drained. One browser per worker; it is
+    reused across tasks and only restarted when the country changes or the
+    browser breaks. Each page's products are stored with the task as JSONL.
+    """
+
+    def __init__(self, queue: TaskQueue, headless: bool = True, visibility: float = 300.0,
+                 max_attempts: int = 3, idle_timeout: float = 5.0):
+        self.queue = queue
+        self.headless = headless
+        self.visibility = visibility
+        self.max_attempts = max_attempts
+        self.idle_timeout = idle_timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.scraper = None
+        self.country: Optional[str] = None
+        self.stats = {"pages": 0, "items": 0, "failed": 0}
+
+    def _scraper_for(self, task: Dict):
+        from .config import ScraperConfig
+        from .scraper import JumiaScraper
+
+        country = task["country"]
+        if self.scraper is None or self.country != country:
+            self._stop_scraper()
+            config = ScraperConfig(
+                COUNTRY_CODE=country,
+                CATEGORY_URL=ScraperConfig.build_category_url(country, task["category"]),
+                MAX_PAGES=1,
+                HEADLESS=self.headless,
+                # Workers are separate processes: pace each host through the queue database (or its server)
+                RATE_LIMIT_DB=self.queue.rate_limit_db,
+            )
+            self.scraper = JumiaScraper(config)
+            self.scraper.start()
+            self.country = country
+        return self.scraper
+
+    def _stop_scraper(self):
+        if self.scraper is not None:
+            try:
+                self.scraper.stop()
+            except Exception as e:
+                logger.warning(f"Closing browser failed: {e}")
+        self.scraper = None
+
+    def process(self, task: Task):
+        from .batch import ProductBatch
+        from .config import ScraperConfig
+        from .retry import CircuitOpen, DomNotFound, HTTPStatusError, ScrapeError
+        from .scraper import page_url
+
+        payload = task.payload
+        url = page_url(ScraperConfig.build_category_url(payload["country"], payload["category"]), payload["page"])
+        error = None
+        with _Heartbeat(self.queue, task, self.visibility):
+            try:
+                scraper = self._scraper_for(payload)
+                products = scraper.scrape_page(url, payload["page"])
+            except Exception as e:
+                error = e
+
+        # The heartbeat thread has stopped, so the lease is settled without racing it
+        if isinstance(error, (DomNotFound, HTTPStatusError)) and (isinstance(error, DomNotFound) or error.status == 404):
+            # Past the last page of the listing: nothing to retry
+            self.queue.complete(task, "")
+            logger.info(f"{task.key}: no listing ({error.kind})")
+            return
+        if isinstance(error, CircuitOpen):
+            self._failed(task, error)
+            time.sleep(error.retry_after or 30)
+            return
+        if isinstance(error, ScrapeError):
+            self._failed(task, error)
+            return
+        if error is not None:
+            # Browser crashed or hung: start a fresh one for the next task
+            self._failed(task, error)
+            self._stop_scraper()
+            return
+
+        batch = ProductBatch.from_items(products)
+        self.queue.complete(task, "\n".join(batch.iter_json()))
+        self.stats["pages"] += 1
+        self.stats["items"] += len(batch)
+        logger.info(f"{task.key}: {len(batch)} products")
+
+    def _failed(self, task: Task, error: Exception):
+        self.stats["failed"] += 1
+        logger.error(f"{task.key} failed (attempt {task.attempts}): {error}")
+        self.queue.fail(task, f"{type(error).__name__}: {error}", self.max_attempts)
+
+    def run(self) -> Dict[str, int]:
+        idle_since = None
+        try:
+            while True:
+                task = self.queue.lease(self.owner, self.visibility, self.max_attempts)
+                if task is None:
+                    # Leased tasks may still come back if their worker dies
+                    if self.queue.remaining() == 0:
+                        break
+                    idle_since = idle_since or time.monotonic()
+                    if time.monotonic() - idle_since > max(self.idle_timeout, self.visibility):
+                        break
+                    time.sleep(1.0)
+                    continue
+                idle_since = None
+                self.process(task)
+        finally:
+            self._stop_scraper()
+        logger.info(f"Worker {self.owner} done: {self.stats}")
+        return self.stats
+
+
+def _worker_main(queue_path: str, headless: bool, visibility: float, max_attempts: int):
+    from .utils import setup_logging
+
+    setup_logging()
+    CrawlWorker(open_queue(queue_path), headless=headless, visibility=visibility, max_attempts=max_attempts).run()
+
+
+def start_workers(queue_path: str, workers: int, headless: bool = True, visibility: float = 300.0,
+                  max_attempts: int = 3):
+    """N worker processes, one browser each"""
+    ctx = multiprocessing.get_context("spawn")
+    processes = []
+    for _ in range(workers):
+        process = ctx.Process(target=_worker_main, args=(queue_path, headless, visibility, max_attempts))
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def _decode(line: str) -> Dict:
+    values = json.loads(line)
+    if values.get("crawled_at"):
+        values["crawled_at"] = datetime.fromisoformat(values["crawled_at"])
+    return values
+
+
+def refresh_aggregates(output_file: str, output_format: str):
+    """Rebuild the dashboard analytics tables once, after merging (SQLite outputs only)"""
+    if output_format.lower() == 'sqlite':
+        from .analytics import AnalyticsStore
+
+        AnalyticsStore(output_file).refresh()
+
+
+def merge(queue: TaskQueue, output_file: str, output_format: str, chunk: int = 200,
+          aggregates: bool = False) -> int:
+    """
+    Appends finished pages to the output through StorageHandler, the only
+    writer of the output file. A page is marked merged after it is saved, so
+    a crash in between re-merges it on the next run rather than losing it.
+    Saves skip the full analytics rebuild; with aggregates it runs once at
+    the end when anything was merged.
+    """
+    from .models import validate_batch
+    from .storage import StorageHandler
+
+    storage = StorageHandler(output_file, output_format, refresh_aggregates=False)
+    merged = 0
+    while True:
+        rows = queue.unmerged(chunk)
+        if not rows:
+            if aggregates and merged:
+                refresh_aggregates(output_file, output_format)
+            return merged
+        # Results come from other processes: validate them as one batch, dropping bad rows only
+        items, errors = validate_batch(_decode(line) for row in rows for line in (row["result"] or "").splitlines())
+        for index, error in errors:
+            logger.warning(f"Dropped invalid product #{index} from merged pages: {error}")
+        if items:
+            storage.save(items)
+        queue.mark_merged(row["id"] for row in rows)
+        merged += len(items)
+        logger.info(f"Merged {len(rows)} pages ({len(items)} products) into {output_file}")
+
+
+def run(queue_path: str, workers: int, output_file: str, output_format: str, headless: bool = True,
+        visibility: float = 300.0, max_attempts: int = 3, merge_interval: float = 10.0) -> int:
+    """Local coordinator: starts workers and merges their pages as they finish"""
+    queue = open_queue(queue_path)
+    started = time.time()
+    processes = start_workers(queue_path, workers, headless, visibility, max_attempts)
+    merged = 0
+    try:
+        while any(p.is_alive() for p in processes):
+            time.sleep(merge_interval)
+            merged += merge(queue, output_file, output_format)
+    finally:
+        for p in processes:
+            p.join()
+    merged += merge(queue, output_file, output_format)
+    if merged:
+        refresh_aggregates(output_file, output_format)
+    elapsed = time.time() - started
+    logger.info(f"Crawl finished: {merged} products in {elapsed:.1f}s with {workers} workers; queue {queue.counts()}")
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded crawl over a SQLite task queue, served to other hosts by `serve`")
+    sub = parser.add_subparsers(dest="command", required=True)
+    commands = {name: sub.add_parser(name) for name in ("enqueue", "work", "merge", "run", "status", "retry", "serve")}
+    for p in commands.values():
+        p.add_argument("queue", help="Task queue database on a local disk (e.g. crawl.db), or the URL of a `serve` process")
+    commands["serve"].add_argument("--host", default="127.0.0.1", help="Interface to listen on (0.0.0.0 for other hosts)")
+    commands["serve"].add_argument("--port", type=int, default=8765)
+    for name in ("enqueue", "run"):
+        commands[name].add_argument("--country", nargs="+", default=["ke"])
+        commands[name].add_argument("--category", nargs="+", required=name == "enqueue")
+        commands[name].add_argument("--pages", type=int, default=5)
+    for name in ("work", "run"):
+        commands[name].add_argument("--workers", type=int, default=os.cpu_count() or 2)
+        commands[name].add_argument("--visibility", type=float, default=300.0, help="Lease seconds")
+        commands[name].add_argument("--max-attempts", type=int, default=3)
+        commands[name].add_argument("--no-headless", action="store_false", dest="headless")
+    for name in ("merge", "run"):
+        commands[name].add_argument("--output", default="jumia_products.jsonl")
+        commands[name].add_argument("--format", default="jsonl", help="jsonl, csv or sqlite")
+    args = parser.parse_args()
+
+    from .queueserver import serve_queue
+    from .utils import setup_logging
+
+    setup_logging()
+    if args.command == "serve":
+        server = serve_queue(TaskQueue(args.queue), args.host, args.port, os.environ.get("CRAWL_QUEUE_TOKEN"))
+        logger.info(f"Serving {args.queue} on http://{args.host}:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        raise SystemExit(0)
+    queue = open_queue(args.queue)
+    if args.command == "enqueue" or (args.command == "run" and args.category):
+        enqueue(queue, args.country, args.category, args.pages)
+    if args.command == "work":
+        for p in start_workers(args.queue, args.workers, args.headless, args.visibility, args.max_attempts):
+            p.join()
+    elif args.command == "merge":
+        print(f"Merged {merge(queue, args.output, args.format, aggregates=True)} products")
+    elif args.command == "run":
+        run(args.queue, args.workers, args.output, args.format, args.headless, args.visibility, args.max_attempts)
+    elif args.command == "retry":
+        print(f"Re-queued {queue.retry_failed()} failed tasks")
+    if args.command in ("enqueue", "status", "retry"):
+        print(queue.counts())
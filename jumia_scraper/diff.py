@@ -0,0 +1,316 @@
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import sqlite3
+import tempfile
+from contextlib import ExitStack
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger("jumia_scraper.diff")
+
+# Fields whose change is worth an event, and which fields feed each event type
+TRACKED_FIELDS = ["current_price", "old_price", "discount_percentage", "rating", "review_count"]
+CHANGE_EVENTS = {
+    "price_changed": ("current_price",),
+    "discount_changed": ("discount_percentage", "old_price"),
+    "rating_changed": ("rating", "review_count"),
+}
+# Value shown in an event's old/new columns
+EVENT_VALUE_FIELD = {"new": "current_price", "removed": "current_price", "price_changed": "current_price",
+                     "discount_changed": "discount_percentage", "rating_changed": "rating"}
+STATE_SUFFIX = ".state"
+DEFAULT_CHUNK = 200_000
+# Bit per TRACKED_FIELDS entry: which fields a snapshot actually has (projected runs, see ScraperConfig.FIELDS)
+FIELD_BITS = {f: 1 << i for i, f in enumerate(TRACKED_FIELDS)}
+ALL_FIELDS_MASK = (1 << len(TRACKED_FIELDS)) - 1
+
+# One product in a snapshot: (key, crawled_at, hash, name, currency, tracked values, present-fields mask)
+Record = Tuple[str, str, str, Optional[str], Optional[str], List[Any], int]
+
+
+def fingerprint(values: List[Any]) -> str:
+    return hashlib.blake2b(json.dumps(values, separators=(",", ":")).encode(), digest_size=8).hexdigest()
+
+
+def _record(row: Dict[str, Any], mask: Optional[int] = None) -> Optional[Record]:
+    key = row.get("product_id") or row.get("url")
+    if not key:
+        return None
+    values = [row.get(f) for f in TRACKED_FIELDS]
+    if mask is None:
+        mask = sum(bit for f, bit in FIELD_BITS.items() if f in row)
+    return key, row.get("crawled_at") or "", fingerprint(values), row.get("name"), row.get("currency"), values, mask
+
+
+def _mask(record: Record) -> int:
+    # .state files written before the mask existed hold full snapshots
+    return record[6] if len(record) > 6 else ALL_FIELDS_MASK
+
+
+# ---------- Sorted snapshot streams ----------
+
+def _sorted_sqlite(path: str) -> Iterator[Record]:
+    """SQLite sorts on disk itself; products already holds one row per product_id"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(products)")}
+        select = ", ".join(c if c in columns else f"NULL AS {c}"
+                           for c in ["product_id", "url", "name", "currency", "crawled_at", *TRACKED_FIELDS])
+        mask = sum(bit for f, bit in FIELD_BITS.items() if f in columns)
+        cursor = conn.execute(
+            f"SELECT {select} FROM products ORDER BY COALESCE(product_id, url), crawled_at"
+        )
+        for row in cursor:
+            record = _record(dict(row), mask)
+            if record:
+                yield record
+    finally:
+        conn.close()
+
+
+def _read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    if path.endswith(".csv"):
+        import csv
+
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                for field in TRACKED_FIELDS:
+                    if field in row:
+                        row[field] = float(row[field]) if row[field] not in (None, "") else None
+                yield row
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _write_run(records: List[Record], directory: str) -> str:
+    records.sort(key=lambda r: (r[0], r[1]))
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return path
+
+
+def _read_run(f) -> Iterator[Record]:
+    for line in f:
+        yield tuple(json.loads(line))
+
+
+def _external_sort(records: Iterable[Record], stack: ExitStack, tmpdir: str, chunk: int) -> Iterator[Record]:
+    """
+    Sorts records by (key, crawled_at) holding at most `chunk` in memory:
+    full chunks are sorted and spilled to run files, then k-way merged.
+    """
+    buffer: List[Record] = []
+    runs = []
+    for record in records:
+        buffer.append(record)
+        if len(buffer) >= chunk:
+            runs.append(_write_run(buffer, tmpdir))
+            buffer = []
+    if not runs:
+        buffer.sort(key=lambda r: (r[0], r[1]))
+        return iter(buffer)
+    if buffer:
+        runs.append(_write_run(buffer, tmpdir))
+    files = [stack.enter_context(open(path, "r", encoding="utf-8")) for path in runs]
+    logger.info(f"Merging {len(runs)} sorted runs")
+    return heapq.merge(*(_read_run(f) for f in files), key=lambda r: (r[0], r[1]))
+
+
+def _latest(records: Iterator[Record]) -> Iterator[Record]:
+    """Last crawl of each product (JSONL outputs accumulate every run)"""
+    for _, group in groupby(records, key=lambda r: r[0]):
+        record = None
+        for record in group:
+            pass
+        yield record
+
+
+def sorted_snapshot(path: str, stack: ExitStack, tmpdir: str, chunk: int = DEFAULT_CHUNK) -> Iterator[Record]:
+    """One record per product, ascending by key, from a products file or a saved state"""
+    if path.endswith(STATE_SUFFIX):
+        return _read_run(stack.enter_context(open(path, "r", encoding="utf-8")))
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        return _latest(_sorted_sqlite(path))
+    records = (r for r in map(_record, _read_rows(path)) if r)
+    return _latest(_external_sort(records, stack, tmpdir, chunk))
+
+
+# ---------- Event sinks ----------
+
+class JsonlEventSink:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, event: Dict[str, Any]):
+        self._file.write(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class SqliteEventSink:
+    """product_events table; rows are buffered and inserted with executemany"""
+
+    def __init__(self, path: str, batch_size: int = 5000):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS product_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL,
+                product_id TEXT NOT NULL,
+                name TEXT,
+                currency TEXT,
+                old_value REAL,
+                new_value REAL,
+                change_pct REAL,
+                detected_at TEXT,
+                details TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_product_events_product ON product_events (product_id, detected_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_product_events_type ON product_events (type, detected_at)")
+        self.batch_size = batch_size
+        self._rows = []
+
+    def write(self, event: Dict[str, Any]):
+        self._rows.append((
+            event["type"], event["product_id"], event.get("name"), event.get("currency"),
+            event.get("old_value"), event.get("new_value"), event.get("change_pct"), event.get("at"),
+            json.dumps({"old": event.get("old"), "new": event.get("new")}),
+        ))
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self.conn.executemany(
+                "INSERT INTO product_events (type, product_id, name, currency, old_value, new_value, change_pct, "
+                "detected_at, details) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._rows,
+            )
+            self.conn.commit()
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self.conn.close()
+
+
+def open_sink(path: str):
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        return SqliteEventSink(path)
+    return JsonlEventSink(path)
+
+
+# ---------- Diff ----------
+
+def _event(kind: str, old: Optional[Record], new: Optional[Record],
+           fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    ref = new or old
+    old_values = dict(zip(TRACKED_FIELDS, old[5])) if old else None
+    new_values = dict(zip(TRACKED_FIELDS, new[5])) if new else None
+    field = EVENT_VALUE_FIELD[kind]
+    old_value = old_values.get(field) if old_values else None
+    new_value = new_values.get(field) if new_values else None
+    event = {"type": kind, "product_id": ref[0], "name": ref[3], "currency": ref[4], "at": ref[1],
+             "old_value": old_value, "new_value": new_value}
+    if old_value and new_value is not None:
+        event["change_pct"] = round((new_value - old_value) / old_value * 100, 2)
+    if kind not in ("new", "removed"):
+        fields = fields or CHANGE_EVENTS[kind]
+        event["old"] = {f: old_values[f] for f in fields}
+        event["new"] = {f: new_values[f] for f in fields}
+    return event
+
+
+def diff_records(old: Iterator[Record], new: Iterator[Record]) -> Iterator[Dict[str, Any]]:
+    """
+    Sorted merge-join of two snapshots by key; only products whose hash
+    differs are compared field by field, and only on fields both snapshots
+    have (a price-only run says nothing about ratings).
+    """
+    sentinel = None
+    o = next(old, sentinel)
+    n = next(new, sentinel)
+    while o is not None or n is not None:
+        if n is None or (o is not None and o[0] < n[0]):
+            yield _event("removed", o, None)
+            o = next(old, sentinel)
+        elif o is None or n[0] < o[0]:
+            yield _event("new", None, n)
+            n = next(new, sentinel)
+        else:
+            if o[2] != n[2]:
+                old_values = dict(zip(TRACKED_FIELDS, o[5]))
+                new_values = dict(zip(TRACKED_FIELDS, n[5]))
+                shared = _mask(o) & _mask(n)
+                for kind, fields in CHANGE_EVENTS.items():
+                    compared = [f for f in fields if shared & FIELD_BITS[f]]
+                    if any(old_values[f] != new_values[f] for f in compared):
+                        yield _event(kind, o, n, compared)
+            o = next(old, sentinel)
+            n = next(new, sentinel)
+
+
+def diff_snapshots(old_path: str, new_path: str, events_path: str, state_out: Optional[str] = None,
+                   chunk: int = DEFAULT_CHUNK, include_removed: bool = True) -> Dict[str, int]:
+    """
+    Compares new_path against old_path (a products file or a .state file
+    saved by an earlier diff) and appends events to events_path (JSONL, or
+    SQLite for .db). With state_out, the new snapshot is also saved sorted,
+    so the next diff starts from it without re-reading the full history.
+    """
+    counts = {kind: 0 for kind in EVENT_VALUE_FIELD}
+    sink = open_sink(events_path)
+    with tempfile.TemporaryDirectory() as tmpdir, ExitStack() as stack:
+        old = sorted_snapshot(old_path, stack, tmpdir, chunk)
+        new = sorted_snapshot(new_path, stack, tmpdir, chunk)
+        if state_out:
+            state_file = stack.enter_context(open(state_out + ".tmp", "w", encoding="utf-8"))
+
+            def saving(records):
+                for record in records:
+                    state_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    yield record
+
+            new = saving(new)
+        try:
+            for event in diff_records(old, new):
+                if event["type"] == "removed" and not include_removed:
+                    counts["removed"] += 1
+                    continue
+                sink.write(event)
+                counts[event["type"]] += 1
+        finally:
+            sink.close()
+    if state_out:
+        os.replace(state_out + ".tmp", state_out)
+    logger.info(f"Diff {old_path} -> {new_path}: {counts}")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Diff two crawls by product_id and emit change events")
+    parser.add_argument("old", help=f"Previous products file (jsonl, csv, sqlite) or {STATE_SUFFIX} file")
+    parser.add_argument("new", help="New products file (jsonl, csv, sqlite)")
+    parser.add_argument("--events", required=True, help="Event output: .jsonl, or .db for a product_events table")
+    parser.add_argument("--state-out", default=None, help=f"Save the new snapshot as a sorted {STATE_SUFFIX} file")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="Records sorted in memory at once")
+    parser.add_argument("--no-removed", action="store_true", help="Do not write 'removed' events")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.state_out and not args.state_out.endswith(STATE_SUFFIX):
+        parser.error(f"--state-out must end with {STATE_SUFFIX}")
+    print(diff_snapshots(args.old, args.new, args.events, args.state_out, args.chunk, not args.no_removed))
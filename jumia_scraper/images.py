@@ -0,0 +1,353 @@
+import argparse
+import hashlib
+import http.client
+import importlib.util
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+import logging
+
+logger = logging.getLogger("jumia_scraper.images")
+
+# Extension per Content-Type; anything else image/* is stored as .img
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+    "image/avif": ".avif",
+}
+MAX_REDIRECTS = 3
+DEFAULT_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+
+def pillow_available() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+def make_thumbnail(source: str, target: str, size: Tuple[int, int]) -> str:
+    """Runs in a worker process: writes a JPEG thumbnail of source fitting inside size"""
+    from PIL import Image
+
+    with Image.open(source) as img:
+        img.thumbnail(size)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            img.save(f, "JPEG", quality=85)
+    os.replace(tmp, target)
+    return target
+
+
+class ImageStore:
+    """
+    Content-addressed image files plus a url -> hash index.
+
+    Files live at objects/<sha[:2]>/<sha><ext>, thumbnails at
+    thumbs/<W>x<H>/<sha[:2]>/<sha>.jpg. index.db maps every downloaded URL to
+    its hash, so an image seen in an earlier run (or another country) is
+    never fetched again, and two URLs serving the same bytes share one file.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index_path = os.path.join(root, "index.db")
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS images (
+                    url TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    content_type TEXT,
+                    size INTEGER,
+                    fetched_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_images_sha ON images (sha256)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def object_path(self, sha: str, content_type: Optional[str]) -> str:
+        ext = EXTENSIONS.get((content_type or "").split(";")[0].strip().lower(), ".img")
+        return os.path.join(self.objects_dir, sha[:2], sha + ext)
+
+    def thumb_path(self, sha: str, size: Tuple[int, int]) -> str:
+        return os.path.join(self.root, "thumbs", f"{size[0]}x{size[1]}", sha[:2], sha + ".jpg")
+
+    def known(self, urls: Iterable[str]) -> Dict[str, str]:
+        """url -> sha256 for the urls already downloaded"""
+        urls = list(urls)
+        found = {}
+        with self._connect() as conn:
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT url, sha256 FROM images WHERE url IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def path_for(self, url: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT sha256, content_type FROM images WHERE url = ?", (url,)).fetchone()
+        return self.object_path(*row) if row else None
+
+    def put(self, body: bytes, content_type: Optional[str]) -> Tuple[str, str, bool]:
+        """Stores body unless identical bytes exist; returns (sha, path, created)"""
+        sha = hashlib.sha256(body).hexdigest()
+        path = self.object_path(sha, content_type)
+        if os.path.exists(path):
+            return sha, path, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        return sha, path, True
+
+    def index(self, rows: List[Tuple[str, str, str, int, float]]):
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO images (url, sha256, content_type, size, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+
+class ConnectionPool:
+    """
+    Keep-alive http.client connections per (scheme, host, port), with at
+    most `per_host` requests in flight to any one host. Connections are
+    returned to the pool after a fully read response and dropped on errors.
+    """
+
+    def __init__(self, per_host: int = 4, timeout: float = 20.0):
+        self.per_host = per_host
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str, int], queue.LifoQueue] = {}
+        self._slots: Dict[Tuple[str, str, int], threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, url: str) -> Tuple[str, str, int]:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        return scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80)
+
+    def _slot(self, key) -> threading.BoundedSemaphore:
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self.per_host)
+                self._idle[key] = queue.LifoQueue()
+            return self._slots[key]
+
+    def _checkout(self, key) -> http.client.HTTPConnection:
+        try:
+            return self._idle[key].get_nowait()
+        except queue.Empty:
+            scheme, host, port = key
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            return cls(host, port, timeout=self.timeout)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """GET following redirects; returns (status, lower-cased headers, body)"""
+        for _ in range(MAX_REDIRECTS + 1):
+            key = self._key(url)
+            parts = urlsplit(url)
+            path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            with self._slot(key):
+                conn = self._checkout(key)
+                try:
+                    conn.request("GET", path, headers=headers or {})
+                    response = conn.getresponse()
+                    body = response.read()
+                except Exception:
+                    conn.close()
+                    raise
+                response_headers = {k.lower(): v for k, v in response.getheaders()}
+                if response.will_close:
+                    conn.close()
+                else:
+                    self._idle[key].put(conn)
+            if response.status in (301, 302, 303, 307, 308) and "location" in response_headers:
+                url = urljoin(url, response_headers["location"])
+                continue
+            return response.status, response_headers, body
+        raise http.client.HTTPException(f"Too many redirects for {url}")
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                while not idle.empty():
+                    idle.get_nowait().close()
+
+
+class ImageDownloader:
+    """
+    Pipeline stage that downloads the images of scraped products.
+
+    URLs already in the store's index are skipped, the rest are fetched by
+    `workers` threads over a shared ConnectionPool (at most `per_host`
+    concurrent requests per host) and stored content-addressed. Thumbnails
+    are rendered in a process pool when Pillow is installed.
+    """
+
+    def __init__(
+        self,
+        store: ImageStore,
+        workers: int = 16,
+        per_host: int = 4,
+        timeout: float = 20.0,
+        thumbnail_size: Optional[Tuple[int, int]] = (256, 256),
+        thumbnail_workers: Optional[int] = None,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self.store = store
+        self.workers = workers
+        self.pool = ConnectionPool(per_host=per_host, timeout=timeout)
+        self.thumbnail_size = thumbnail_size
+        self.thumbnail_workers = thumbnail_workers
+        self.headers = {"User-Agent": user_agent, "Accept": "image/avif,image/webp,image/*,*/*;q=0.8"}
+
+    def _fetch(self, url: str) -> Tuple[str, bytes, str]:
+        status, headers, body = self.pool.get(url, self.headers)
+        content_type = headers.get("content-type", "")
+        if status != 200:
+            raise http.client.HTTPException(f"HTTP {status}")
+        if not content_type.startswith("image/") or not body:
+            raise http.client.HTTPException(f"Not an image ({content_type or 'no content type'})")
+        return url, body, content_type
+
+    def download(self, urls: Iterable[Optional[str]]) -> Dict[str, object]:
+        started = time.perf_counter()
+        wanted = list(dict.fromkeys(u for u in urls if u and u.startswith("http")))
+        known = self.store.known(wanted)
+        todo = [u for u in wanted if u not in known]
+        stats = {"urls": len(wanted), "cached": len(known), "downloaded": 0, "deduplicated": 0,
+                 "failed": 0, "bytes": 0, "thumbnails": 0}
+        logger.info(f"{len(wanted)} image URLs, {len(known)} already stored, fetching {len(todo)}")
+
+        rows, new_files = [], []
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(self._fetch, url): url for url in todo}
+                for future in as_completed(futures):
+                    url = futures[future]
+                    try:
+                        _, body, content_type = future.result()
+                    except Exception as e:
+                        stats["failed"] += 1
+                        logger.warning(f"Image {url} failed: {e}")
+                        continue
+                    sha, path, created = self.store.put(body, content_type)
+                    rows.append((url, sha, content_type, len(body), time.time()))
+                    stats["downloaded"] += 1
+                    stats["bytes"] += len(body)
+                    if created:
+                        new_files.append((sha, path))
+                    else:
+                        stats["deduplicated"] += 1
+        finally:
+            self.pool.close()
+            # Index whatever made it to disk, even if the run was interrupted
+            if rows:
+                self.store.index(rows)
+
+        stats["thumbnails"] = self.thumbnails(new_files)
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(f"Image download stats: {stats}")
+        return stats
+
+    def thumbnails(self, files: List[Tuple[str, str]]) -> int:
+        """Renders missing thumbnails for (sha, path) pairs; returns how many were written"""
+        if not self.thumbnail_size or not files:
+            return 0
+        if not pillow_available():
+            logger.warning("Pillow is not installed, skipping thumbnails (pip install Pillow)")
+            return 0
+        jobs = [(path, self.store.thumb_path(sha, self.thumbnail_size)) for sha, path in files]
+        jobs = [(src, dst) for src, dst in jobs if not os.path.exists(dst)]
+        done = 0
+        # Decoding and resizing is CPU bound: a process pool sidesteps the GIL
+        with ProcessPoolExecutor(max_workers=self.thumbnail_workers) as executor:
+            futures = [executor.submit(make_thumbnail, src, dst, self.thumbnail_size) for src, dst in jobs]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    done += 1
+                except Exception as e:
+                    logger.warning(f"Thumbnail failed: {e}")
+        return done
+
+
+def image_urls(products) -> List[Optional[str]]:
+    """image_url of every product in a ProductBatch or any iterable of ProductItem / ProductRow"""
+    column = getattr(products, "column", None)
+    if column is not None:
+        return list(column("image_url"))
+    # Projected rows without image_url have none to download
+    return [getattr(item, "image_url", None) for item in products]
+
+
+def read_image_urls(path: str) -> List[str]:
+    """image_url values from a saved products file (jsonl, csv or sqlite)"""
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        conn = sqlite3.connect(path)
+        try:
+            return [r[0] for r in conn.execute("SELECT image_url FROM products WHERE image_url IS NOT NULL")]
+        finally:
+            conn.close()
+    if path.endswith(".csv"):
+        import csv
+
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            return [row["image_url"] for row in csv.DictReader(f) if row.get("image_url")]
+    urls = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                url = json.loads(line).get("image_url")
+                if url:
+                    urls.append(url)
+    return urls
+
+
+def _parse_size(value: str) -> Optional[Tuple[int, int]]:
+    if value.lower() in ("0", "none", "off"):
+        return None
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height or width)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download product images into a content-addressed store")
+    parser.add_argument("products", help="Products file (jsonl, csv or sqlite)")
+    parser.add_argument("--out", required=True, help="Image store directory")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=4, help="Concurrent requests per image host")
+    parser.add_argument("--thumbnail", default="256x256", help="Thumbnail box, e.g. 256x256 (0 disables)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    downloader = ImageDownloader(
+        ImageStore(args.out), workers=args.workers, per_host=args.per_host, thumbnail_size=_parse_size(args.thumbnail)
+    )
+    print(downloader.download(read_image_urls(args.products)))
@@ -0,0 +1,202 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import logging
+
+from .config import ScraperConfig
+from .storage import StorageHandler
+
+logger = logging.getLogger("jumia_scraper.jobs")
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobRunner:
+    """
+    Runs scrape jobs in background threads and records them in a local SQLite job table.
+
+    Each job gets its own JumiaScraper (and therefore its own Playwright
+    instance), so several jobs can run concurrently. Progress events emitted
+    by the scraper are appended to job_events and folded into the jobs row,
+    which lets any page load (or another process) follow a job by id.
+    """
+
+    def __init__(self, db_path: str = "jobs.db", max_workers: int = 2):
+        self.db_path = db_path
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape-job")
+        self._scrapers: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    created_at REAL,
+                    started_at REAL,
+                    finished_at REAL,
+                    pages_done INTEGER DEFAULT 0,
+                    max_pages INTEGER,
+                    items INTEGER DEFAULT 0,
+                    items_per_sec REAL,
+                    matched_items INTEGER,
+                    preview TEXT,
+                    error TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    ts REAL,
+                    event TEXT NOT NULL,
+                    data TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id, id)")
+            # Jobs left active by a previous process cannot be resumed
+            conn.execute(
+                f"UPDATE jobs SET status = 'interrupted', finished_at = ? "
+                f"WHERE status IN ({', '.join('?' * len(ACTIVE_STATUSES))})",
+                (time.time(), *ACTIVE_STATUSES),
+            )
+
+    # ---------- Public API ----------
+
+    def submit(self, params: Dict[str, Any]) -> str:
+        """
+        Queue a scrape. params: country, category, pages, output_file,
+        output_format, headless and optional keyword. The keyword is applied
+        while crawling; without a category it searches the whole site.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, params, created_at, max_pages) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(params, ensure_ascii=False), time.time(), params.get('pages')),
+            )
+        self._executor.submit(self._run, job_id, params)
+        logger.info(f"Submitted job {job_id}")
+        return job_id
+
+    def cancel(self, job_id: str):
+        with self._lock:
+            scraper = self._scrapers.get(job_id)
+        if scraper:
+            scraper.cancel()
+
+    def list_jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._decode(row) if row else None
+
+    def events(self, job_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM job_events WHERE job_id = ? AND id > ? ORDER BY id", (job_id, after_id)
+            ).fetchall()
+        return [{**dict(row), 'data': json.loads(row['data'] or '{}')} for row in rows]
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['preview'] = json.loads(job['preview']) if job['preview'] else []
+        return job
+
+    # ---------- Worker side ----------
+
+    def _update(self, job_id: str, **fields):
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _record_event(self, job_id: str, event: Dict[str, Any]):
+        data = {k: v for k, v in event.items() if k not in ('event', 'ts')}
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO job_events (job_id, ts, event, data) VALUES (?, ?, ?, ?)",
+                (job_id, event.get('ts', time.time()), event['event'], json.dumps(data)),
+            )
+            if event['event'] == 'page_done':
+                conn.execute(
+                    "UPDATE jobs SET pages_done = ?, items = ?, items_per_sec = ? WHERE id = ?",
+                    (data['page'], data['items'], data['items_per_sec'], job_id),
+                )
+            elif event['event'] == 'error':
+                conn.execute("UPDATE jobs SET error = ? WHERE id = ?", (data.get('message'), job_id))
+
+    def _run(self, job_id: str, params: Dict[str, Any]):
+        # Imported here so the dashboard does not load Playwright until a job actually runs
+        from .scraper import JumiaScraper
+
+        self._update(job_id, status='running', started_at=time.time())
+        try:
+            keyword = params.get('keyword')
+            if params.get('category'):
+                category_url = ScraperConfig.build_category_url(params['country'], params['category'])
+            else:
+                category_url = ScraperConfig.build_search_url(params['country'], keyword)
+            config = ScraperConfig(
+                COUNTRY_CODE=params['country'],
+                CATEGORY_URL=category_url,
+                KEYWORD=keyword,
+                MAX_PAGES=params['pages'],
+                OUTPUT_FILE=params['output_file'],
+                OUTPUT_FORMAT=params['output_format'],
+                HEADLESS=params.get('headless', True),
+            )
+            scraper = JumiaScraper(config, on_progress=lambda event: self._record_event(job_id, event))
+            with self._lock:
+                self._scrapers[job_id] = scraper
+            products = scraper.run()
+
+            storage = StorageHandler(config.OUTPUT_FILE, config.OUTPUT_FORMAT)
+            with scraper.metrics.stage("storage"):
+                storage.save(products)
+            scraper.metrics.finish()
+            report = scraper.metrics.to_dict()
+            report.pop("pages", None)
+            self._record_event(job_id, {"event": "metrics", **report})
+
+            # Only matching products were extracted, so everything saved is a match
+            matched = len(products) if keyword else None
+
+            status = 'cancelled' if scraper.cancelled else 'completed'
+            self._update(
+                job_id,
+                status=status,
+                finished_at=time.time(),
+                matched_items=matched,
+                preview=json.dumps(products.to_dicts(limit=5), ensure_ascii=False),
+            )
+            logger.info(f"Job {job_id} {status}")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            self._update(job_id, status='failed', finished_at=time.time(), error=str(e))
+        finally:
+            with self._lock:
+                self._scrapers.pop(job_id, None)
@@ -0,0 +1,233 @@
+import argparse
+import json
+import mmap
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from .search import sidecar_path
+
+logger = logging.getLogger("jumia_scraper.jsonl_index")
+
+# (byte offset, length without the newline, product key, crawled_at)
+OffsetRow = Tuple[int, int, str, Optional[str]]
+
+
+def iso_crawled_at(value) -> Optional[str]:
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+class JsonlOffsetIndex:
+    """
+    Byte offsets of every record in a JSONL output, kept in the output's
+    sidecar database (next to the search index, see search.sidecar_path).
+
+    jsonl_records holds (offset, length, product key, crawled_at) per line,
+    indexed by key and by crawl date; jsonl_meta remembers how many bytes of
+    the file are indexed, so lines appended by anything other than
+    StorageHandler are picked up by catch_up() without rescanning the file.
+    """
+
+    def __init__(self, jsonl_path: str):
+        self.jsonl_path = jsonl_path
+        self.db_path = sidecar_path(jsonl_path)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def ensure_schema(conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jsonl_records (
+                offset INTEGER PRIMARY KEY,
+                length INTEGER NOT NULL,
+                product_id TEXT,
+                crawled_at TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jsonl_records_product ON jsonl_records (product_id, offset)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jsonl_records_crawled ON jsonl_records (crawled_at, offset)")
+        conn.execute("CREATE TABLE IF NOT EXISTS jsonl_meta (key TEXT PRIMARY KEY, value INTEGER)")
+
+    @staticmethod
+    def _indexed_bytes(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM jsonl_meta WHERE key = 'indexed_bytes'").fetchone()
+        return row[0] if row else 0
+
+    def add(self, rows: Iterable[OffsetRow], end: int, conn: Optional[sqlite3.Connection] = None):
+        """Record lines just appended; end is the file size after the append"""
+        if conn is None:
+            with self._connect() as own_conn:
+                return self.add(rows, end, own_conn)
+        self.ensure_schema(conn)
+        conn.executemany(
+            "INSERT OR REPLACE INTO jsonl_records (offset, length, product_id, crawled_at) VALUES (?, ?, ?, ?)", rows
+        )
+        conn.execute("INSERT OR REPLACE INTO jsonl_meta (key, value) VALUES ('indexed_bytes', ?)", (end,))
+
+    def catch_up(self) -> int:
+        """Index lines past the indexed prefix (or everything after a truncation); returns lines added"""
+        if not os.path.exists(self.jsonl_path):
+            return 0
+        size = os.path.getsize(self.jsonl_path)
+        with self._connect() as conn:
+            self.ensure_schema(conn)
+            start = self._indexed_bytes(conn)
+            if start > size:
+                logger.warning(f"{self.jsonl_path} shrank below its index; rebuilding")
+                conn.execute("DELETE FROM jsonl_records")
+                start = 0
+            if start == size:
+                return 0
+            rows = []
+            with open(self.jsonl_path, "rb") as f:
+                f.seek(start)
+                offset = start
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # a writer is mid-line; index it next time
+                    stripped = line.rstrip(b"\r\n")
+                    if stripped.strip():
+                        try:
+                            record = json.loads(stripped)
+                            rows.append((offset, len(stripped), record.get('product_id') or record.get('url'),
+                                         record.get('crawled_at')))
+                        except ValueError:
+                            logger.warning(f"Unparseable line at byte {offset} of {self.jsonl_path}")
+                    offset += len(line)
+            self.add(rows, offset, conn)
+        if rows:
+            logger.info(f"Indexed {len(rows)} lines of {self.jsonl_path}")
+        return len(rows)
+
+    def rebuild(self) -> int:
+        with self._connect() as conn:
+            self.ensure_schema(conn)
+            conn.execute("DELETE FROM jsonl_records")
+            conn.execute("DELETE FROM jsonl_meta WHERE key = 'indexed_bytes'")
+        return self.catch_up()
+
+    # ---------- Lookups ----------
+
+    def latest(self, product_id: str) -> Optional[Tuple[int, int]]:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT offset, length FROM jsonl_records WHERE product_id = ? ORDER BY offset DESC LIMIT 1",
+                (product_id,),
+            ).fetchone()
+
+    def all_for(self, product_id: str) -> List[Tuple[int, int]]:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT offset, length FROM jsonl_records WHERE product_id = ? ORDER BY offset", (product_id,)
+            ).fetchall()
+
+    def between(self, since: Optional[str] = None, until: Optional[str] = None) -> List[Tuple[int, int]]:
+        """Offsets of records crawled in [since, until) (ISO strings), in file order"""
+        clauses, params = [], []
+        if since:
+            clauses.append("crawled_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("crawled_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            return conn.execute(f"SELECT offset, length FROM jsonl_records {where} ORDER BY offset", params).fetchall()
+
+
+class JsonlReader:
+    """
+    Random access into a JSONL output through its offset index: the file is
+    memory-mapped and only the requested lines are sliced out and parsed.
+
+        with JsonlReader("jumia_products.jsonl") as reader:
+            reader.get("GE779EA1ABCDNAFAMZ")
+            for record in reader.crawled_between("2026-10-01", "2026-10-02"): ...
+    """
+
+    def __init__(self, path: str, catch_up: bool = True):
+        self.path = path
+        self.index = JsonlOffsetIndex(path)
+        if catch_up:
+            self.index.catch_up()
+        self._file = open(path, "rb")
+        self._map: Optional[mmap.mmap] = None
+        self._mapped_size = 0
+
+    def _view(self, end: int) -> mmap.mmap:
+        # The file only grows; remap when a record lies past the current mapping
+        if self._map is None or end > self._mapped_size:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_size = len(self._map)
+        return self._map
+
+    def raw(self, offset: int, length: int) -> bytes:
+        return self._view(offset + length)[offset:offset + length]
+
+    def read(self, offset: int, length: int) -> Dict[str, Any]:
+        return json.loads(self.raw(offset, length))
+
+    def get(self, product_id: str) -> Optional[Dict[str, Any]]:
+        """Most recent record of a product"""
+        location = self.index.latest(product_id)
+        return self.read(*location) if location else None
+
+    def history(self, product_id: str) -> List[Dict[str, Any]]:
+        """Every record of a product, oldest first"""
+        return [self.read(offset, length) for offset, length in self.index.all_for(product_id)]
+
+    def crawled_between(self, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        for offset, length in self.index.between(since, until):
+            yield self.read(offset, length)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Random access into a JSONL product output")
+    parser.add_argument("jsonl", help="JSONL output file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="Re-index the whole file")
+    get = sub.add_parser("get", help="Latest record of a product")
+    get.add_argument("product_id")
+    history = sub.add_parser("history", help="Every record of a product")
+    history.add_argument("product_id")
+    between = sub.add_parser("range", help="Records crawled in [since, until)")
+    between.add_argument("--since")
+    between.add_argument("--until")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.command == "rebuild":
+        print(f"Indexed {JsonlOffsetIndex(args.jsonl).rebuild()} lines")
+    else:
+        with JsonlReader(args.jsonl) as reader:
+            if args.command == "get":
+                print(json.dumps(reader.get(args.product_id), ensure_ascii=False, indent=2))
+            elif args.command == "history":
+                for record in reader.history(args.product_id):
+                    print(json.dumps(record, ensure_ascii=False))
+            else:
+                for record in reader.crawled_between(args.since, args.until):
+                    print(json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger("jumia_scraper.loader")
+
+
+@dataclass
+class _CacheEntry:
+    frame: pd.DataFrame
+    size: int
+    mtime_ns: int
+    inode: int
+    offset: int = 0  # byte offset just past the last parsed line
+
+
+class IncrementalLoader:
+    """
+    Caches parsed JSONL product frames keyed by file path and reloads incrementally.
+
+    - Unchanged files (same size and mtime) are served from the cache.
+    - Files that only grew are read from the last parsed byte offset.
+    - Anything else (truncation, rewrite) triggers a full reload.
+
+    SQLite databases are not loaded into frames; the dashboard queries them
+    page by page through query.ProductQuery.
+
+    Callers get a copy of the cached frame, so they can modify it freely
+    without corrupting the cache that later appends build on.
+    """
+
+    def __init__(self):
+        self._cache: Dict[str, _CacheEntry] = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self, path: Optional[str] = None):
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.path.abspath(path), None)
+
+    # ---------- JSONL ----------
+
+    def load_jsonl(self, file_path: str) -> Optional[pd.DataFrame]:
+        if not os.path.exists(file_path):
+            return None
+        key = os.path.abspath(file_path)
+        stat = os.stat(key)
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry.inode == stat.st_ino and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+                return entry.frame.copy()
+
+            if entry and entry.inode == stat.st_ino and stat.st_size >= entry.offset and self._is_line_boundary(key, entry.offset):
+                records, offset = self._read_jsonl(key, entry.offset)
+                if records:
+                    entry.frame = pd.concat([entry.frame, pd.DataFrame(records)], ignore_index=True)
+                logger.info(f"Appended {len(records)} new records from {file_path}")
+            else:
+                records, offset = self._read_jsonl(key, 0)
+                entry = _CacheEntry(frame=pd.DataFrame(records), size=0, mtime_ns=0, inode=stat.st_ino)
+                logger.info(f"Loaded {len(records)} records from {file_path}")
+
+            entry.offset, entry.size, entry.mtime_ns = offset, stat.st_size, stat.st_mtime_ns
+            self._cache[key] = entry
+            return entry.frame.copy()
+
+    @staticmethod
+    def _is_line_boundary(path: str, offset: int) -> bool:
+        """Cheap check that the file was appended to rather than rewritten"""
+        if offset == 0:
+            return True
+        with open(path, 'rb') as f:
+            f.seek(offset - 1)
+            return f.read(1) == b'\n'
+
+    @staticmethod
+    def _read_jsonl(path: str, start: int):
+        """Parse complete lines from start; returns (records, offset past the last complete line)"""
+        records = []
+        with open(path, 'rb') as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partially written line, pick it up next time
+                offset += len(line)
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return records, offset
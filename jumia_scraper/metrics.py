@@ -0,0 +1,195 @@
+import json
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger("jumia_scraper.metrics")
+
+# Stage names in page order; anything else recorded is reported after these
+STAGES = ["navigate", "archive", "popups", "networkidle", "scroll", "extract", "normalize", "build", "storage", "images"]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class RunMetrics:
+    """
+    Timings and counters for one scrape run.
+
+    stage(name) times a block and charges it to the current page (see
+    start_page); counters hold pages, items, requests and response bytes.
+    Retry counters come from the scraper's RetryStats when one is attached.
+    Exported as a JSON report (write_json) or Prometheus text (prometheus_text).
+    """
+
+    def __init__(self, retry_stats=None):
+        self.retry_stats = retry_stats
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.stage_times: Dict[str, List[float]] = defaultdict(list)
+        self.counters: Counter = Counter()
+        self.pages: List[Dict[str, Any]] = []
+        self._current: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    # ---------- Recording ----------
+
+    def start_page(self, page: int, url: str):
+        with self._lock:
+            self._current = {"page": page, "url": url, "stages": {}, "bytes": 0, "items": 0}
+            self.pages.append(self._current)
+
+    def end_page(self, items: int = 0, failed: bool = False):
+        with self._lock:
+            if self._current is not None:
+                self._current["items"] = items
+                self._current["failed"] = failed
+                self._current["seconds"] = round(sum(self._current["stages"].values()), 4)
+            self.counters["pages_failed" if failed else "pages"] += 1
+            self.counters["items"] += items
+            self._current = None
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            self.stage_times[name].append(seconds)
+            if self._current is not None:
+                stages = self._current["stages"]
+                stages[name] = round(stages.get(name, 0.0) + seconds, 4)
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    def on_request_finished(self, request):
+        """
+        Playwright 'requestfinished' event handler: counts requests and the
+        body bytes actually received. request.sizes() covers chunked and
+        compressed responses, which carry no usable Content-Length.
+        """
+        try:
+            size = request.sizes()["responseBodySize"]
+        except Exception:
+            response = request.response()
+            try:
+                size = int(response.headers.get("content-length") or 0) if response else 0
+            except (TypeError, ValueError):
+                size = 0
+        size = max(size, 0)
+        with self._lock:
+            self.counters["requests"] += 1
+            self.counters["bytes"] += size
+            if self._current is not None:
+                self._current["bytes"] += size
+
+    def finish(self):
+        self.finished = time.time()
+
+    # ---------- Export ----------
+
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            times = {name: list(values) for name, values in self.stage_times.items()}
+        ordered = [s for s in STAGES if s in times] + sorted(s for s in times if s not in STAGES)
+        summary = {}
+        for name in ordered:
+            values = times[name]
+            summary[name] = {
+                "count": len(values),
+                "total": round(sum(values), 4),
+                "mean": round(sum(values) / len(values), 4),
+                "p50": round(percentile(values, 50), 4),
+                "p95": round(percentile(values, 95), 4),
+                "max": round(max(values), 4),
+            }
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.time()) - self.started
+        with self._lock:
+            counters = dict(self.counters)
+            pages = [dict(p, stages=dict(p["stages"])) for p in self.pages]
+        return {
+            "started": self.started,
+            "elapsed": round(elapsed, 3),
+            "counters": counters,
+            "pages_per_sec": round(counters.get("pages", 0) / elapsed, 4) if elapsed > 0 else 0.0,
+            "items_per_sec": round(counters.get("items", 0) / elapsed, 4) if elapsed > 0 else 0.0,
+            "stages": self.stage_summary(),
+            "retries": self.retry_stats.as_dict() if self.retry_stats else {},
+            "pages": pages,
+        }
+
+    def write_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        logger.info(f"Wrote run metrics to {path}")
+
+    def prometheus_text(self) -> str:
+        data = self.to_dict()
+        lines = [
+            "# HELP jumia_stage_seconds Time spent per scrape stage",
+            "# TYPE jumia_stage_seconds summary",
+        ]
+        for name, s in data["stages"].items():
+            lines.append(f'jumia_stage_seconds{{stage="{name}",quantile="0.5"}} {s["p50"]}')
+            lines.append(f'jumia_stage_seconds{{stage="{name}",quantile="0.95"}} {s["p95"]}')
+            lines.append(f'jumia_stage_seconds_sum{{stage="{name}"}} {s["total"]}')
+            lines.append(f'jumia_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+        for name in ("pages", "pages_failed", "items", "requests", "bytes"):
+            lines.append(f"# TYPE jumia_{name}_total counter")
+            lines.append(f"jumia_{name}_total {data['counters'].get(name, 0)}")
+        retries = data["retries"]
+        if retries:
+            lines.append("# TYPE jumia_retries_total counter")
+            for kind, n in retries.get("retries", {}).items():
+                lines.append(f'jumia_retries_total{{kind="{kind}"}} {n}')
+            lines.append("# TYPE jumia_failures_total counter")
+            for kind, n in retries.get("failures", {}).items():
+                lines.append(f'jumia_failures_total{{kind="{kind}"}} {n}')
+        lines.append("# TYPE jumia_run_elapsed_seconds gauge")
+        lines.append(f"jumia_run_elapsed_seconds {data['elapsed']}")
+        return "\n".join(lines) + "\n"
+
+
+def serve_prometheus(metrics: RunMetrics, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serves metrics.prometheus_text() at /metrics from a daemon thread; call shutdown() to stop"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving Prometheus metrics on http://{host}:{port}/metrics")
+    return server
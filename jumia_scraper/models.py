@@ -1,5 +1,5 @@
-from pydantic import BaseModel, HttpUrl, Field, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, HttpUrl, Field, field_validator, TypeAdapter, ValidationError
+from typing import Optional, List, Iterable, Tuple, Dict, Any
 from datetime import datetime
 
 class ProductItem(BaseModel):
@@ -10,10 +10,12 @@ class ProductItem(BaseModel):
     brand: Optional[str] = Field(None, description="品牌 (data-gtm-brand)")
     url: str = Field(..., description="商品详情页链接")
     image_url: Optional[str] = Field(None, description="主图链接")
+    country: Optional[str] = Field(None, description="站点国家代码 (COUNTRY_CODE), e.g. ke, ng")
     
     # 价格信息
-    currency: str = Field(..., description="货币符号, e.g. NGN, KSh")
-    current_price: float = Field(..., description="当前售价/现价")
+    currency: str = Field(..., description="ISO 4217 货币代码, e.g. NGN, KES, MAD")
+    current_price: float = Field(..., description="当前售价/现价 (价格区间时为下限)")
+    price_max: Optional[float] = Field(None, description="价格区间上限 (e.g. KSh 1,200 - 1,500)")
     
     # 评价信息
     rating: Optional[float] = Field(None, description="评分 (0-5)")
@@ -63,3 +65,39 @@ class ProductItem(BaseModel):
                 return [x.strip() for x in v.split(' / ') if x.strip()]
             return [v] if v else []
         return v if isinstance(v, list) else []
+
+    @classmethod
+    def trusted(cls, crawled_at: Optional[datetime] = None, **fields) -> "ProductItem":
+        """
+        快速构造 (跳过校验): 仅用于爬虫已清洗过的值
+        Builds an item via model_construct, skipping field validators and
+        the per-item utcnow() default; pass one crawled_at per batch.
+        """
+        if crawled_at is not None:
+            fields['crawled_at'] = crawled_at
+        return cls.model_construct(**fields)
+
+
+_BATCH_ADAPTER = TypeAdapter(List[ProductItem])
+
+
+def validate_batch(rows: Iterable[Dict[str, Any]]) -> Tuple[List[ProductItem], List[Tuple[int, str]]]:
+    """
+    批量校验不可信输入 (e.g. 重新导入的 JSONL)
+    Validates the whole batch in one pass; when it fails, falls back to
+    per-row validation so bad rows are reported as (index, error) instead
+    of rejecting the batch.
+    """
+    rows = list(rows)
+    try:
+        return _BATCH_ADAPTER.validate_python(rows), []
+    except ValidationError:
+        pass
+
+    items, errors = [], []
+    for i, row in enumerate(rows):
+        try:
+            items.append(ProductItem.model_validate(row))
+        except ValidationError as e:
+            errors.append((i, str(e)))
+    return items, errors
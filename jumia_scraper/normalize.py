@@ -0,0 +1,326 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .prices import parse_price
+
+# Patterns compiled once instead of per product card
+PRODUCT_ID_RE = re.compile(r'/products/([^/]+)/')
+REVIEW_COUNT_RE = re.compile(r'\((\d+)\)')
+RATING_RATIO_RE = re.compile(r'width:\s*(\d+)%')
+NON_PRICE_CHARS_RE = re.compile(r'[^\d.]')
+
+
+class _PriceCharTable(dict):
+    """str.translate table keeping digits and '.', filled lazily per code point"""
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        value = char if char.isdigit() or char == '.' else None
+        self[codepoint] = value
+        return value
+
+
+PRICE_CHARS = _PriceCharTable()
+
+# Above this many strings clean_prices() switches to pandas string ops when available
+VECTORIZE_THRESHOLD = 100_000
+
+# JavaScript run once per page via locator.evaluate_all(); collects the raw
+# attributes/texts of every product card so Python never round-trips per field.
+# Optional argument {terms, keys}: terms are lowercase keyword terms (see
+# keyword_terms), cards whose name misses any of them come back as null before
+# anything else is read; keys limits the raw values read per card (see raw_keys_for).
+EXTRACT_CARDS_JS = """
+(cards, options) => {
+    const {terms, keys} = options || {};
+    const attr = (el, name) => el ? el.getAttribute(name) : null;
+    const text = (card, sel) => { const el = card.querySelector(sel); return el ? el.innerText : null; };
+    const RAW = {
+        href: (card, link) => attr(link, 'href'),
+        gtm_id: (card, link) => attr(link, 'data-gtm-id'),
+        link_data_id: (card, link) => attr(link, 'data-id'),
+        card_data_id: (card, link) => attr(card, 'data-id'),
+        form_action: (card, link) => attr(card.querySelector('form'), 'action'),
+        name: (card, link) => text(card, 'h3.name') ?? text(card, '.name'),
+        gtm_brand: (card, link) => attr(link, 'data-gtm-brand'),
+        card_brand: (card, link) => attr(card, 'data-brand'),
+        price: (card, link) => text(card, 'div.prc, p.prc'),
+        img_data_src: (card, link) => attr(card.querySelector('img.img'), 'data-src'),
+        img_src: (card, link) => attr(card.querySelector('img.img'), 'src'),
+        img_srcset: (card, link) => attr(card.querySelector('img.img'), 'srcset'),
+        rating_attr: (card, link) => attr(link, 'data-gtm-dimension27'),
+        stars_text: (card, link) => text(card, 'div.stars._s'),
+        review_attr: (card, link) => attr(link, 'data-gtm-dimension26'),
+        review_text: (card, link) => text(card, 'div.rev, .stars'),
+        seller_id: (card, link) => attr(link, 'data-gtm-dimension23'),
+        category: (card, link) => attr(link, 'data-gtm-category'),
+        old_price: (card, link) => text(card, 'div.old'),
+        discount: (card, link) => text(card, 'div.bdg._dsct'),
+        promo: (card, link) => text(card, 'span.bdg:not(._dsct), div.bdg:not(._dsct)'),
+        is_express: (card, link) => card.querySelector('svg.ic.xprss') !== null,
+        gtm_tags: (card, link) => attr(link, 'data-gtm-dimension43'),
+        position: (card, link) => attr(link, 'data-gtm-position') || attr(link, 'data-ga4-index'),
+        ratio_style: (card, link) => attr(card.querySelector('div.in'), 'style'),
+        ga4_category_1: (card, link) => attr(link, 'data-ga4-item_category'),
+        ga4_category_2: (card, link) => attr(link, 'data-ga4-item_category2'),
+        ga4_price: (card, link) => attr(link, 'data-ga4-price'),
+        is_second_chance: (card, link) => attr(link, 'data-ga4-is_second_chance'),
+    };
+    const wanted = keys && keys.length ? keys : Object.keys(RAW);
+    return cards.map(card => {
+        const link = card.querySelector('a.core');
+        if (!link) return null;
+        const raw = {};
+        if (terms && terms.length) {
+            raw.name = RAW.name(card, link);
+            const lowered = (raw.name || '').toLowerCase();
+            if (!terms.every(term => lowered.includes(term))) return null;
+        }
+        for (const key of wanted) {
+            if (!(key in raw)) raw[key] = RAW[key](card, link);
+        }
+        return raw;
+    });
+}
+"""
+
+# Raw card values (keys of EXTRACT_CARDS_JS) each output field is derived from
+RAW_SOURCES: Dict[str, Tuple[str, ...]] = {
+    'product_id': ('gtm_id', 'link_data_id', 'card_data_id', 'form_action'),
+    'name': ('name',),
+    'brand': ('gtm_brand', 'card_brand', 'name'),
+    'url': ('href',),
+    'image_url': ('img_data_src', 'img_src', 'img_srcset'),
+    'country': (),
+    'currency': ('price',),
+    'current_price': ('price',),
+    'price_max': ('price',),
+    'rating': ('rating_attr', 'stars_text'),
+    'review_count': ('review_attr', 'review_text'),
+    'seller_id': ('seller_id',),
+    'category_path': ('category',),
+    'old_price': ('old_price',),
+    'discount_percentage': ('discount',),
+    'promo_tag': ('promo',),
+    'is_express': ('is_express',),
+    'gtm_tags': ('gtm_tags',),
+    'list_position': ('position',),
+    'rating_ratio': ('ratio_style',),
+    'ga4_category_1': ('ga4_category_1',),
+    'ga4_category_2': ('ga4_category_2',),
+    'ga4_price': ('ga4_price',),
+    'is_second_chance': ('is_second_chance',),
+}
+
+
+def raw_keys_for(fields: Optional[Iterable[str]]) -> Optional[List[str]]:
+    """Raw keys EXTRACT_CARDS_JS must read to produce fields; None reads everything"""
+    if fields is None:
+        return None
+    # href is always read: cards without a link are dropped
+    keys = {'href'}
+    for field in fields:
+        keys.update(RAW_SOURCES.get(field, ()))
+    return sorted(keys)
+
+
+def keyword_terms(keyword: Optional[str]) -> List[str]:
+    """Lowercase whitespace-separated terms of a keyword filter; a product name must contain all of them"""
+    return keyword.lower().split() if keyword else []
+
+
+def clean_price(price_str: Optional[str]) -> float:
+    """
+    Cleans price string like 'KSh 12,345' to float 12345.0
+    """
+    if not price_str:
+        return 0.0
+    try:
+        return float(price_str.translate(PRICE_CHARS))
+    except ValueError:
+        return 0.0
+
+
+def clean_prices(price_strs: Sequence[Optional[str]]) -> List[float]:
+    """clean_price over a whole batch; large batches use pandas string ops when installed"""
+    if len(price_strs) >= VECTORIZE_THRESHOLD:
+        try:
+            import pandas as pd
+        except ImportError:
+            pd = None
+        if pd is not None:
+            cleaned = pd.Series(price_strs, dtype=object).str.replace(NON_PRICE_CHARS_RE, '', regex=True)
+            return pd.to_numeric(cleaned, errors='coerce').fillna(0.0).astype(float).tolist()
+    return [clean_price(s) for s in price_strs]
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _absolute(url: str, base_url: str) -> str:
+    return url if url.startswith("http") else base_url + url
+
+
+def _image_url(raw: Dict[str, Any], base_url: str) -> Optional[str]:
+    # Priority: data-src > src > srcset (Jumia uses data-src for lazy loading)
+    img_url = raw.get('img_data_src')
+    if not img_url or img_url.startswith("data:"):
+        img_url = raw.get('img_src')
+    if not img_url or img_url.startswith("data:"):
+        srcset = raw.get('img_srcset')
+        if srcset:
+            img_url = srcset.split(',')[0].split()[0]
+    if not img_url:
+        return None
+
+    img_url = img_url.strip()
+    # Handle protocol-relative URLs (//example.com)
+    if img_url.startswith("//"):
+        img_url = "https:" + img_url
+    # Handle relative URLs (/product/...)
+    elif not img_url.startswith("http") and not img_url.startswith("data:"):
+        img_url = base_url + img_url
+    # Final check: if it's still a data URI, discard it
+    return None if img_url.startswith("data:") else img_url
+
+
+def normalize_cards(
+    raw_cards: Sequence[Optional[Dict[str, Any]]], base_url: str, country: str = "ke",
+    fields: Optional[Iterable[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Turns the raw per-card dicts from EXTRACT_CARDS_JS into ProductItem field
+    values for a whole page. Cards without a link are dropped. Prices are
+    parsed with the market's conventions (see prices.parse_price). With
+    fields, only those values are computed and returned.
+    """
+    cards = [raw for raw in raw_cards if raw and raw.get('href')]
+    if not cards:
+        return []
+
+    # Decided once per page rather than per card
+    wanted = set(RAW_SOURCES) if fields is None else set(fields)
+    need = {name: name in wanted for name in RAW_SOURCES}
+    need_price = need['currency'] or need['current_price'] or need['price_max']
+    country = (country or "ke").lower()
+    # GA4 prices are plain numbers: cleaned as one column (vectorized for large inputs)
+    ga4_prices = clean_prices([raw.get('ga4_price') for raw in cards]) if need['ga4_price'] else None
+
+    results = []
+    for i, raw in enumerate(cards):
+        row = {}
+        if need['product_id']:
+            # product_id priority: data-gtm-id > data-id > form action
+            product_id = raw.get('gtm_id') or raw.get('link_data_id') or raw.get('card_data_id')
+            if not product_id and raw.get('form_action'):
+                match = PRODUCT_ID_RE.search(raw['form_action'])
+                if match:
+                    product_id = match.group(1)
+            # 必采字段
+            row['product_id'] = product_id
+
+        name = raw['name'].strip() if raw.get('name') is not None else "Unknown"
+        if need['name']:
+            row['name'] = name
+        if need['brand']:
+            brand = raw.get('gtm_brand') or raw.get('card_brand')
+            if not brand:
+                # Try to guess from name
+                brand = name.split()[0] if name != "Unknown" and name.split() else None
+            row['brand'] = brand
+        if need['url']:
+            row['url'] = _absolute(raw['href'], base_url)
+        if need['image_url']:
+            row['image_url'] = _image_url(raw, base_url)
+        if need['country']:
+            row['country'] = country
+
+        if need_price:
+            price, price_max, currency = parse_price(raw.get('price'), country)
+            if need['currency']:
+                row['currency'] = currency
+            if need['current_price']:
+                row['current_price'] = price
+            if need['price_max']:
+                row['price_max'] = price_max if price_max != price else None
+
+        if need['rating']:
+            rating = _to_float(raw.get('rating_attr'))
+            if rating is None and raw.get('stars_text'):
+                try:
+                    rating = float(raw['stars_text'].split()[0])
+                except (ValueError, IndexError):
+                    pass
+            row['rating'] = rating
+
+        if need['review_count']:
+            review_count = _to_int(raw.get('review_attr')) or 0
+            if review_count == 0 and raw.get('review_text'):
+                # Try to extract from text like "(696)"
+                match = REVIEW_COUNT_RE.search(raw['review_text'])
+                if match:
+                    review_count = int(match.group(1))
+            row['review_count'] = review_count
+
+        if need['seller_id']:
+            row['seller_id'] = raw.get('seller_id')
+        if need['category_path']:
+            category_str = raw.get('category')
+            row['category_path'] = [c.strip() for c in category_str.split(" / ") if c.strip()] if category_str else []
+
+        # 建议采集字段
+        if need['old_price']:
+            old_text = raw.get('old_price')
+            row['old_price'] = parse_price(old_text, country)[0] if old_text is not None else None
+        if need['discount_percentage']:
+            discount = None
+            if raw.get('discount'):
+                try:
+                    discount = float(raw['discount'].replace('%', '').replace('-', '').strip())
+                except ValueError:
+                    pass
+            row['discount_percentage'] = discount
+        if need['promo_tag']:
+            row['promo_tag'] = raw['promo'].strip() if raw.get('promo') is not None else None
+        if need['is_express']:
+            row['is_express'] = bool(raw.get('is_express'))
+        if need['gtm_tags']:
+            gtm_tags_str = raw.get('gtm_tags')
+            row['gtm_tags'] = [tag.strip() for tag in gtm_tags_str.split("|") if tag.strip()] if gtm_tags_str else []
+        if need['list_position']:
+            row['list_position'] = _to_int(raw.get('position'))
+
+        # 可选字段
+        if need['rating_ratio']:
+            rating_ratio = None
+            if raw.get('ratio_style'):
+                match = RATING_RATIO_RE.search(raw['ratio_style'])
+                if match:
+                    rating_ratio = float(match.group(1)) / 100
+            row['rating_ratio'] = rating_ratio
+        if need['ga4_category_1']:
+            row['ga4_category_1'] = raw.get('ga4_category_1')
+        if need['ga4_category_2']:
+            row['ga4_category_2'] = raw.get('ga4_category_2')
+        if need['ga4_price']:
+            row['ga4_price'] = ga4_prices[i] if raw.get('ga4_price') else None
+        if need['is_second_chance']:
+            second_chance = raw.get('is_second_chance')
+            row['is_second_chance'] = second_chance.lower() == "true" if second_chance else None
+        results.append(row)
+    return results
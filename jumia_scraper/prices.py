@@ -0,0 +1,148 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+import logging
+
+logger = logging.getLogger("jumia_scraper.prices")
+
+
+class PriceFormat(NamedTuple):
+    currency: str            # ISO 4217
+    thousands: str           # separators the site uses between digit groups
+    decimal: str             # decimal separator the site uses
+    symbols: Tuple[str, ...]  # how the currency appears in listing text
+
+
+# How each Jumia market prints prices, keyed by COUNTRY_CODE
+PRICE_FORMATS = {
+    "ng": PriceFormat("NGN", ",", ".", ("₦", "NGN")),
+    "ke": PriceFormat("KES", ",", ".", ("KSh", "Ksh", "KES")),
+    "eg": PriceFormat("EGP", ",", ".", ("EGP", "ج.م", "جنيه")),
+    "gh": PriceFormat("GHS", ",", ".", ("GH₵", "GHS", "₵")),
+    "ug": PriceFormat("UGX", ",", ".", ("USh", "UGX")),
+    "ma": PriceFormat("MAD", " \u00a0\u202f.", ",", ("Dhs", "DHS", "Dh", "MAD", "درهم")),
+    "dz": PriceFormat("DZD", " \u00a0\u202f.", ",", ("DA", "DZD", "دج")),
+    "ci": PriceFormat("XOF", " \u00a0\u202f.", ",", ("FCFA", "CFA", "XOF")),
+    "sn": PriceFormat("XOF", " \u00a0\u202f.", ",", ("FCFA", "CFA", "XOF")),
+}
+DEFAULT_COUNTRY = "ke"
+
+# Symbols that override the market default (e.g. a USD-priced global listing)
+FOREIGN_SYMBOLS = (("US$", "USD"), ("USD", "USD"), ("€", "EUR"), ("EUR", "EUR"), ("$", "USD"))
+
+# Range separators between two prices, e.g. "KSh 1,200 - 1,500"
+RANGE_SPLIT_RE = re.compile(r"\s*(?:-|–|—|~|\bto\b|\bà\b)\s*")
+
+
+def _number_pattern(fmt: PriceFormat) -> "re.Pattern":
+    """
+    Digit groups of three joined by one of the market's group separators,
+    then an optional 1-2 digit fraction after its decimal separator.
+    """
+    group_seps = re.escape(fmt.thousands)
+    return re.compile(
+        rf"(?P<int>\d{{1,3}}(?:[{group_seps}]\d{{3}})+(?!\d)|\d+)"
+        rf"(?:{re.escape(fmt.decimal)}(?P<frac>\d{{1,2}})(?!\d))?"
+    )
+
+
+NUMBER_PATTERNS = {country: _number_pattern(fmt) for country, fmt in PRICE_FORMATS.items()}
+NON_DIGITS_RE = re.compile(r"\D")
+# A whole amount as printed: digit runs joined by single separators of any market
+NUMBER_RUN_RE = re.compile(r"\d+(?:[.,'\s\u00a0\u202f]\d+)*")
+SEPARATOR_SPLIT_RE = re.compile(r"([.,'\s\u00a0\u202f])")
+LEGACY_CHARS_RE = re.compile(r"[^\d.]")
+
+
+def _to_number(match: "re.Match") -> float:
+    value = float(NON_DIGITS_RE.sub("", match.group("int")))
+    frac = match.group("frac")
+    if frac:
+        value += int(frac) / (10 ** len(frac))
+    return value
+
+
+def _infer_number(run: str) -> Optional[float]:
+    """
+    Reads an amount in another market's format: the last separator followed
+    by 1-2 digits is the decimal one, the others must all be the same and
+    split groups of three. None when the run fits no format.
+    """
+    parts = SEPARATOR_SPLIT_RE.split(run)
+    groups, seps = parts[0::2], parts[1::2]
+    frac = decimal = None
+    if seps and len(groups[-1]) <= 2:
+        frac, decimal = groups.pop(), seps.pop()
+    if seps and (len(groups[0]) > 3 or any(len(g) != 3 for g in groups[1:])
+                 or len(set(seps)) > 1 or decimal in seps):
+        return None
+    value = float("".join(groups))
+    if frac:
+        value += int(frac) / (10 ** len(frac))
+    return value
+
+
+def _legacy_number(run: str) -> Optional[float]:
+    # clean_price() semantics: keep digits and '.'
+    try:
+        return float(LEGACY_CHARS_RE.sub("", run))
+    except ValueError:
+        return None
+
+
+def _parse_amount(part: str, pattern: "re.Pattern", country: str) -> Optional[float]:
+    run = NUMBER_RUN_RE.search(part)
+    if not run:
+        return None
+    match = pattern.fullmatch(run.group())
+    if match:
+        return _to_number(match)
+    # Not in the market's format (e.g. a '1,099.00' price on a ',' decimal market)
+    value = _infer_number(run.group())
+    if value is None:
+        value = _legacy_number(run.group())
+        logger.warning(f"Ambiguous price {part!r} for {country}; read as {value}")
+    return value
+
+
+def _currency(text: str, fmt: PriceFormat) -> str:
+    for symbol in fmt.symbols:
+        if symbol in text:
+            return fmt.currency
+    for symbol, code in FOREIGN_SYMBOLS:
+        if symbol in text:
+            return code
+    return fmt.currency
+
+
+@lru_cache(maxsize=65536)
+def parse_price(text: Optional[str], country: str = DEFAULT_COUNTRY) -> Tuple[float, float, str]:
+    """
+    Parses a listing price for a Jumia market into (min, max, ISO currency).
+
+    'KSh 1,200' -> (1200.0, 1200.0, 'KES'); '1 299,00 Dhs' on ma -> (1299.0, 1299.0, 'MAD');
+    'KSh 1,200 - 1,500' -> (1200.0, 1500.0, 'KES'). Amounts in another market's format are read
+    from their own separators ('1,099.00 Dhs' on ma -> 1099.0). Unparseable text gives (0.0, 0.0, currency),
+    matching clean_price(). Results are memoized: listing prices repeat heavily.
+    """
+    country = (country or DEFAULT_COUNTRY).lower()
+    fmt = PRICE_FORMATS.get(country, PRICE_FORMATS[DEFAULT_COUNTRY])
+    if not text:
+        return 0.0, 0.0, fmt.currency
+
+    pattern = NUMBER_PATTERNS.get(country, NUMBER_PATTERNS[DEFAULT_COUNTRY])
+    values = []
+    for part in RANGE_SPLIT_RE.split(text):
+        value = _parse_amount(part, pattern, country)
+        if value is not None:
+            values.append(value)
+
+    currency = _currency(text, fmt)
+    if not values:
+        return 0.0, 0.0, currency
+    return min(values), max(values), currency
+
+
+def currency_for(country: str) -> str:
+    """ISO currency of a market"""
+    return PRICE_FORMATS.get((country or DEFAULT_COUNTRY).lower(), PRICE_FORMATS[DEFAULT_COUNTRY]).currency
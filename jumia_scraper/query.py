@@ -0,0 +1,268 @@
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from .search import SearchIndex, build_match_query
+from .storage import INDEXED_COLUMNS
+
+logger = logging.getLogger("jumia_scraper.query")
+
+NUMERIC_TYPES = ('REAL', 'INTEGER', 'NUMERIC', 'FLOAT', 'DOUBLE')
+NUMERIC_COLUMNS = {
+    'current_price', 'old_price', 'discount_percentage', 'rating', 'review_count',
+    'list_position', 'rating_ratio', 'ga4_price',
+}
+# Sort keys for keyset pagination; each gets (column, product_id) and (brand, column, product_id) indexes
+KEYSET_COLUMNS = ['current_price', 'discount_percentage', 'rating', 'review_count', 'crawled_at']
+
+
+class ProductQuery:
+    """
+    Read-side query layer over the SQLite product store.
+
+    Filtering, sorting and pagination run as SQL so callers only ever
+    materialize the visible page instead of the whole table.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._column_types: Optional[Dict[str, str]] = None
+        self._has_fts: Optional[bool] = None
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    @property
+    def column_types(self) -> Dict[str, str]:
+        if self._column_types is None:
+            with self._connect() as conn:
+                rows = conn.execute("PRAGMA table_info(products)").fetchall()
+            self._column_types = {row['name']: (row['type'] or 'TEXT').upper() for row in rows}
+        return self._column_types
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.column_types.keys())
+
+    @property
+    def has_fts(self) -> bool:
+        if self._has_fts is None:
+            with self._connect() as conn:
+                self._has_fts = SearchIndex.exists(conn) and 'product_id' in self.column_types
+        return self._has_fts
+
+    def ensure_indexes(self):
+        """Create the filter/sort and full-text indexes on databases written before they existed"""
+        try:
+            with self._connect() as conn:
+                for column in INDEXED_COLUMNS:
+                    if column in self.column_types:
+                        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_products_{column} ON products ({column})")
+                if 'product_id' in self.column_types:
+                    # Keyset pages (see seek) become pure index range scans, with or without a brand filter
+                    for column in KEYSET_COLUMNS:
+                        if column in self.column_types:
+                            conn.execute(
+                                f"CREATE INDEX IF NOT EXISTS idx_products_{column}_key ON products ({column}, product_id)"
+                            )
+                            if 'brand' in self.column_types:
+                                conn.execute(
+                                    f"CREATE INDEX IF NOT EXISTS idx_products_brand_{column}_key "
+                                    f"ON products (brand, {column}, product_id)"
+                                )
+            if not self.has_fts and 'product_id' in self.column_types:
+                SearchIndex(self.db_path).rebuild_from_products()
+                self._has_fts = None
+        except sqlite3.Error as e:
+            logger.warning(f"Could not create indexes on {self.db_path}: {e}")
+
+    def _numeric(self, column: str) -> str:
+        """SQL expression for a column, cast to REAL when legacy tables stored numbers as TEXT"""
+        col_type = self.column_types.get(column, 'TEXT')
+        if column not in NUMERIC_COLUMNS or any(t in col_type for t in NUMERIC_TYPES):
+            return column
+        return f"CAST({column} AS REAL)"
+
+    def _where(self, search: Optional[str], brand: Optional[str],
+               min_price: Optional[float] = None, max_price: Optional[float] = None) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        match = build_match_query(search) if search else None
+        if match and self.has_fts:
+            keys = ("(SELECT k.product_id FROM products_fts f "
+                    "JOIN search_keys k ON k.id = f.rowid WHERE products_fts MATCH ?)")
+            if 'url' in self.column_types:
+                # Rows stored without a product_id are indexed under their url (see SearchIndex.add)
+                clauses.append(f"(product_id IN {keys} OR (product_id IS NULL AND url IN {keys}))")
+                params.extend([match, match])
+            else:
+                clauses.append(f"product_id IN {keys}")
+                params.append(match)
+        elif search:
+            # Legacy databases without an FTS index fall back to a substring scan
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        if brand:
+            if brand == 'Unknown':
+                clauses.append("(brand IS NULL OR brand = 'Unknown')")
+            else:
+                clauses.append("brand = ?")
+                params.append(brand)
+        if min_price is not None:
+            clauses.append(f"{self._numeric('current_price')} >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append(f"{self._numeric('current_price')} <= ?")
+            params.append(max_price)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def count(self, search: Optional[str] = None, brand: Optional[str] = None) -> int:
+        where, params = self._where(search, brand)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM products {where}", params).fetchone()[0]
+
+    def brands(self) -> List[str]:
+        """Distinct brands, served from the brand index"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT COALESCE(brand, 'Unknown') AS brand FROM products ORDER BY brand"
+            ).fetchall()
+        return [row['brand'] for row in rows]
+
+    def metrics(self, search: Optional[str] = None, brand: Optional[str] = None) -> Dict[str, float]:
+        """Headline metrics computed in SQL over the filtered set"""
+        where, params = self._where(search, brand)
+        present = self.column_types
+        avg_price = f"AVG({self._numeric('current_price')})" if 'current_price' in present else "NULL"
+        avg_discount = f"AVG({self._numeric('discount_percentage')})" if 'discount_percentage' in present else "NULL"
+        total_reviews = f"SUM({self._numeric('review_count')})" if 'review_count' in present else "NULL"
+        sql = (
+            f"SELECT COUNT(*) AS total, {avg_price} AS avg_price, "
+            f"{avg_discount} AS avg_discount, {total_reviews} AS total_reviews "
+            f"FROM products {where}"
+        )
+        with self._connect() as conn:
+            row = conn.execute(sql, params).fetchone()
+        return {
+            'total': row['total'] or 0,
+            'avg_price': row['avg_price'] or 0.0,
+            'avg_discount': row['avg_discount'] or 0.0,
+            'total_reviews': row['total_reviews'] or 0,
+        }
+
+    def page(
+        self,
+        search: Optional[str] = None,
+        brand: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        limit: int = 50,
+        offset: int = 0,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return one page of products matching the filters"""
+        present = self.column_types
+        selected = [c for c in (columns or self.columns) if c in present]
+        if not selected:
+            return []
+
+        where, params = self._where(search, brand)
+        order = ""
+        if sort_by and sort_by in present:
+            direction = "DESC" if descending else "ASC"
+            order = f"ORDER BY {self._numeric(sort_by)} {direction}"
+
+        sql = f"SELECT {', '.join(selected)} FROM products {where} {order} LIMIT ? OFFSET ?"
+        with self._connect() as conn:
+            rows = conn.execute(sql, params + [int(limit), int(offset)]).fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, product_id: str, columns: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """One product by its primary key"""
+        selected = [c for c in (columns or self.columns) if c in self.column_types]
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(selected)} FROM products WHERE product_id = ?", (product_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def seek(
+        self,
+        search: Optional[str] = None,
+        brand: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        limit: int = 50,
+        after: Optional[Tuple[Any, str]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, str]]]:
+        """
+        Keyset pagination: rows strictly after `after` (the (sort value,
+        product_id) of the previous page's last row) plus the key to pass
+        for the next page, None on the last page. Unlike OFFSET, every page
+        costs the same index seek however deep it is. Products without a
+        value in the sort column are left out of sorted listings.
+        """
+        present = self.column_types
+        if sort_by not in KEYSET_COLUMNS or sort_by not in present:
+            sort_by = None
+        selected = [c for c in (columns or self.columns) if c in present]
+        if 'product_id' not in selected:
+            selected.append('product_id')
+        if sort_by and sort_by not in selected:
+            selected.append(sort_by)
+
+        where, params = self._where(search, brand, min_price, max_price)
+        clauses = [where[len("WHERE "):]] if where else []
+        op = "<" if descending else ">"
+        direction = "DESC" if descending else "ASC"
+        if sort_by:
+            column = self._numeric(sort_by)
+            clauses.append(f"{column} IS NOT NULL")
+            if after is not None:
+                clauses.append(f"({column}, product_id) {op} (?, ?)")
+                params.extend(after)
+            order = f"ORDER BY {column} {direction}, product_id {direction}"
+        else:
+            if after is not None:
+                clauses.append(f"product_id {op} ?")
+                params.append(after[1])
+            order = f"ORDER BY product_id {direction}"
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        # One extra row tells whether there is a next page
+        sql = f"SELECT {', '.join(selected)} FROM products {where} {order} LIMIT ?"
+        with self._connect() as conn:
+            rows = [dict(row) for row in conn.execute(sql, params + [int(limit) + 1]).fetchall()]
+        next_key = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_key = (last[sort_by] if sort_by else None, last['product_id'])
+        return rows, next_key
+
+    def price_history(self, product_id: str, limit: int = 500) -> List[Dict[str, Any]]:
+        """Price observations of one product, oldest first (empty before any SQLite save wrote history)"""
+        with self._connect() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'price_history'"
+            ).fetchone()
+            if not exists:
+                return []
+            rows = conn.execute(
+                "SELECT * FROM (SELECT crawled_at, current_price, old_price, discount_percentage, currency "
+                "FROM price_history WHERE product_id = ? ORDER BY crawled_at DESC LIMIT ?) ORDER BY crawled_at",
+                (product_id, int(limit)),
+            ).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,184 @@
+"""
+Network front for a TaskQueue, so crawl workers on other hosts can share one
+queue. The SQLite file stays on the coordinator's local disk; a small HTTP
+service owns it and hands out the same leases, and RemoteTaskQueue speaks to
+it with the TaskQueue interface. The service also books rate-limit slots
+(see ratelimit.RemoteRateLimiter), so every host paces Jumia together.
+
+    python -m jumia_scraper.crawl serve crawl.db --host 0.0.0.0 --port 8765   # coordinator
+    python -m jumia_scraper.crawl work http://coordinator:8765 --workers 8    # any host
+
+Set CRAWL_QUEUE_TOKEN on the server and the workers to require a shared
+bearer token.
+"""
+import hmac
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+from .taskqueue import Task, TaskQueue
+
+logger = logging.getLogger("jumia_scraper.queueserver")
+
+CONNECT_ATTEMPTS = 4
+LIMITER_SETTINGS = {"rate", "burst", "min_rate", "max_rate", "increase", "decrease", "target_latency"}
+
+
+def post_json(url: str, payload: Dict[str, Any], token: Optional[str] = None, timeout: float = 30.0) -> Any:
+    """POST payload as JSON and return the decoded reply; connection failures are retried with backoff"""
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(payload).encode()
+    for attempt in range(CONNECT_ATTEMPTS):
+        request = urllib.request.Request(url, data=data, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read())["result"]
+        except urllib.error.HTTPError as e:
+            # The server answered: retrying would not change its mind
+            raise RuntimeError(f"Queue server rejected {url}: {e.code} {e.read().decode(errors='replace')}") from e
+        except OSError as e:
+            if attempt == CONNECT_ATTEMPTS - 1:
+                raise
+            logger.warning(f"Queue server unreachable ({e}); retrying")
+            time.sleep(2 ** attempt)
+
+
+class RemoteTaskQueue:
+    """TaskQueue served by another host (see serve_queue); same methods, same lease semantics"""
+
+    def __init__(self, url: str, token: Optional[str] = None):
+        self.url = url.rstrip("/")
+        self.token = token if token is not None else os.environ.get("CRAWL_QUEUE_TOKEN")
+        # Workers pace Jumia through the server as well (see ratelimit.get_limiter)
+        self.rate_limit_db = self.url
+
+    def _call(self, op: str, **payload):
+        return post_json(f"{self.url}/{op}", payload, self.token)
+
+    def put(self, tasks: Iterable[Dict[str, Any]], key_fields: Iterable[str]) -> int:
+        return self._call("put", tasks=list(tasks), key_fields=list(key_fields))
+
+    def lease(self, owner: str, visibility: float = 300.0, max_attempts: int = 3) -> Optional[Task]:
+        task = self._call("lease", owner=owner, visibility=visibility, max_attempts=max_attempts)
+        return Task(**task) if task else None
+
+    def heartbeat(self, task: Task, visibility: float = 300.0) -> bool:
+        return self._call("heartbeat", task=asdict(task), visibility=visibility)
+
+    def complete(self, task: Task, result: Optional[str] = None) -> bool:
+        return self._call("complete", task=asdict(task), result=result)
+
+    def fail(self, task: Task, error: str, max_attempts: int = 3) -> bool:
+        return self._call("fail", task=asdict(task), error=error, max_attempts=max_attempts)
+
+    def unmerged(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return self._call("unmerged", limit=limit)
+
+    def mark_merged(self, ids: Iterable[int]):
+        self._call("mark_merged", ids=list(ids))
+
+    def retry_failed(self) -> int:
+        return self._call("retry_failed")
+
+    def counts(self) -> Dict[str, int]:
+        return self._call("counts")
+
+    def remaining(self) -> int:
+        return self._call("remaining")
+
+
+class _QueueHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    queue: TaskQueue = None
+    token: Optional[str] = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.token and not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {self.token}"):
+            self._reply(401, {"error": "Invalid token"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            op = self.path.strip("/")
+            if op.startswith("limiter/"):
+                result = self._limiter(op.split("/", 1)[1], payload)
+            else:
+                result = self._queue(op, payload)
+        except (KeyError, TypeError, ValueError) as e:
+            self._reply(400, {"error": f"Bad request: {e}"})
+            return
+        except Exception:
+            logger.exception(f"Queue server failed on {self.path}")
+            self._reply(500, {"error": "Internal server error"})
+            return
+        self._reply(200, {"result": result})
+
+    def _queue(self, op: str, payload: Dict[str, Any]):
+        queue = self.queue
+        if op == "put":
+            return queue.put(payload["tasks"], payload["key_fields"])
+        if op == "lease":
+            task = queue.lease(payload["owner"], payload["visibility"], payload["max_attempts"])
+            return asdict(task) if task else None
+        if op == "heartbeat":
+            return queue.heartbeat(Task(**payload["task"]), payload["visibility"])
+        if op == "complete":
+            return queue.complete(Task(**payload["task"]), payload["result"])
+        if op == "fail":
+            return queue.fail(Task(**payload["task"]), payload["error"], payload["max_attempts"])
+        if op == "unmerged":
+            return [dict(row) for row in queue.unmerged(payload["limit"])]
+        if op == "mark_merged":
+            return queue.mark_merged(payload["ids"])
+        if op in ("retry_failed", "counts", "remaining"):
+            return getattr(queue, op)()
+        raise ValueError(f"unknown operation {op!r}")
+
+    def _limiter(self, op: str, payload: Dict[str, Any]):
+        from .ratelimit import get_limiter
+
+        settings = payload.get("settings") or {}
+        unknown = set(settings) - LIMITER_SETTINGS
+        if unknown:
+            raise ValueError(f"unknown limiter settings {sorted(unknown)}")
+        limiter = get_limiter(payload["host"], shared_db=self.queue.db_path, **settings)
+        if op == "reserve":
+            try:
+                return limiter.reserve(payload.get("timeout"))
+            except TimeoutError:
+                return None
+        if op == "record":
+            limiter.record(payload.get("latency"), payload.get("status"), bool(payload.get("throttled")),
+                           payload.get("retry_after"), bool(payload.get("failed")))
+            return limiter.rate
+        if op == "snapshot":
+            return limiter.snapshot()
+        raise ValueError(f"unknown limiter operation {op!r}")
+
+
+def serve_queue(queue: TaskQueue, host: str = "127.0.0.1", port: int = 8765,
+                token: Optional[str] = None) -> ThreadingHTTPServer:
+    """HTTP server exposing queue to remote workers; call serve_forever() on the result"""
+    handler = type("QueueHandler", (_QueueHandler,), {"queue": queue, "token": token})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
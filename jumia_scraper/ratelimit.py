@@ -0,0 +1,250 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import logging
+
+logger = logging.getLogger("jumia_scraper.ratelimit")
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = {429, 503}
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket for one host whose refill rate tunes itself AIMD-style.
+
+    acquire() blocks until a token is available. record() feeds back each
+    request: healthy fast responses add `increase` requests/s to the rate,
+    slow responses (over `target_latency`) shave it a little, and throttling
+    (429/503, bot challenges) multiplies it by `decrease` and drains the
+    bucket. Other failures (timeouts, DNS, ...) leave the rate as it is. A Retry-After pauses the bucket outright. One limiter is shared
+    by every worker that talks to the host (see get_limiter).
+    """
+
+    def __init__(
+        self,
+        rate: float = 0.5,
+        burst: float = 2.0,
+        min_rate: float = 0.05,
+        max_rate: float = 4.0,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+        target_latency: float = 5.0,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """Take one token, sleeping as needed; returns seconds waited (raises TimeoutError past timeout)"""
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - start
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            if timeout is not None and now - start + wait > timeout:
+                raise TimeoutError(f"Rate limiter wait of {wait:.1f}s exceeds timeout")
+            time.sleep(wait)
+
+    def _adjusted(self, rate: float, latency: Optional[float], status: Optional[int], throttled: bool,
+                  failed: bool = False) -> float:
+        """The AIMD step: new rate after one request's feedback"""
+        if throttled or status in THROTTLE_STATUSES:
+            rate = max(self.min_rate, rate * self.decrease)
+            logger.info(f"Throttled (status {status}); rate down to {rate:.2f} req/s")
+        elif failed:
+            # Not a signal about the site's tolerance either way
+            pass
+        elif latency is not None and latency > self.target_latency:
+            rate = max(self.min_rate, rate * 0.9)
+        elif status is None or status < 400:
+            rate = min(self.max_rate, rate + self.increase)
+        return rate
+
+    def record(self, latency: Optional[float] = None, status: Optional[int] = None,
+               throttled: bool = False, retry_after: Optional[float] = None, failed: bool = False):
+        with self._lock:
+            self.rate = self._adjusted(self.rate, latency, status, throttled, failed)
+            if throttled or status in THROTTLE_STATUSES:
+                self._tokens = min(self._tokens, 0.0)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {"rate": round(self.rate, 3), "tokens": round(self._tokens, 3)}
+
+
+class SharedRateLimiter(AdaptiveRateLimiter):
+    """
+    AdaptiveRateLimiter whose state lives in a SQLite table, so separate
+    processes (crawl workers) pace one host together and share its
+    throttling backoff and Retry-After pauses.
+
+    Pacing is GCRA over wall-clock time: each acquire() reserves the next
+    slot in one BEGIN IMMEDIATE transaction, allowing up to `burst`
+    requests back to back; the AIMD feedback in record() updates the
+    shared rate.
+    """
+
+    def __init__(self, db_path: str, host: str, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.host = host
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    host TEXT PRIMARY KEY,
+                    rate REAL NOT NULL,
+                    tat REAL NOT NULL DEFAULT 0,
+                    paused_until REAL NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO rate_limits (host, rate) VALUES (?, ?)", (host, self.rate))
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+
+    def _state(self, conn):
+        return conn.execute(
+            "SELECT rate, tat, paused_until FROM rate_limits WHERE host = ?", (self.host,)
+        ).fetchone()
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        wait = self.reserve(timeout)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def reserve(self, timeout: Optional[float] = None) -> float:
+        """Book the next slot without sleeping; returns how long until it starts"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rate, tat, paused_until = self._state(conn)
+            now = time.time()
+            # Earliest start allowed by the burst allowance and any pause
+            start = max(now, tat - (self.burst - 1) / rate, paused_until)
+            wait = start - now
+            if timeout is not None and wait > timeout:
+                conn.execute("ROLLBACK")
+                raise TimeoutError(f"Rate limiter wait of {wait:.1f}s exceeds timeout")
+            conn.execute(
+                "UPDATE rate_limits SET tat = ? WHERE host = ?", (max(tat, start) + 1 / rate, self.host)
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return max(wait, 0.0)
+
+    def record(self, latency: Optional[float] = None, status: Optional[int] = None,
+               throttled: bool = False, retry_after: Optional[float] = None, failed: bool = False):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rate, tat, paused_until = self._state(conn)
+            self.rate = self._adjusted(rate, latency, status, throttled, failed)
+            if throttled or status in THROTTLE_STATUSES:
+                now = time.time()
+                # Drain the burst allowance for every process
+                tat = max(tat, now + self.burst / self.rate)
+                if retry_after:
+                    paused_until = max(paused_until, now + retry_after)
+            conn.execute(
+                "UPDATE rate_limits SET rate = ?, tat = ?, paused_until = ? WHERE host = ?",
+                (self.rate, tat, paused_until, self.host),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def snapshot(self) -> Dict[str, float]:
+        conn = self._connect()
+        try:
+            rate, tat, _ = self._state(conn)
+        finally:
+            conn.close()
+        tokens = max(0.0, min(self.burst, self.burst - (tat - time.time()) * rate))
+        return {"rate": round(rate, 3), "tokens": round(tokens, 3)}
+
+
+class RemoteRateLimiter(AdaptiveRateLimiter):
+    """
+    SharedRateLimiter reached through a crawl queue server (see
+    queueserver.serve_queue), for workers on other hosts: the server books
+    slots and applies feedback, the client only sleeps.
+    """
+
+    def __init__(self, url: str, host: str, token: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url.rstrip("/")
+        self.host = host
+        self.token = token
+        self.settings = kwargs
+
+    def _call(self, op: str, **payload):
+        from .queueserver import post_json
+
+        return post_json(f"{self.url}/limiter/{op}", {"host": self.host, "settings": self.settings, **payload},
+                         self.token)
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        wait = self._call("reserve", timeout=timeout)
+        if wait is None:
+            raise TimeoutError("Rate limiter wait exceeds timeout")
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record(self, latency: Optional[float] = None, status: Optional[int] = None,
+               throttled: bool = False, retry_after: Optional[float] = None, failed: bool = False):
+        self.rate = self._call("record", latency=latency, status=status, throttled=throttled,
+                               retry_after=retry_after, failed=failed)
+
+    def snapshot(self) -> Dict[str, float]:
+        return self._call("snapshot")
+
+
+_LIMITERS: Dict[tuple, AdaptiveRateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_limiter(url_or_host: str, shared_db: Optional[str] = None, **kwargs) -> AdaptiveRateLimiter:
+    """
+    Process-wide limiter for a Jumia domain (created on first use with kwargs).
+    Accepts a URL or a bare host. With shared_db the limiter's state is kept
+    in that SQLite file and shared with every process using it; an http(s)
+    URL there points at a crawl queue server instead (see RemoteRateLimiter).
+    """
+    host = urlparse(url_or_host).netloc if "://" in url_or_host else url_or_host
+    host = host.lower()
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get((host, shared_db))
+        if limiter is None:
+            if shared_db and shared_db.startswith(("http://", "https://")):
+                limiter = RemoteRateLimiter(shared_db, host, token=os.environ.get("CRAWL_QUEUE_TOKEN"), **kwargs)
+            elif shared_db:
+                limiter = SharedRateLimiter(shared_db, host, **kwargs)
+            else:
+                limiter = AdaptiveRateLimiter(**kwargs)
+            _LIMITERS[(host, shared_db)] = limiter
+        return limiter
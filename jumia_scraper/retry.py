@@ -0,0 +1,247 @@
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Set
+from urllib.parse import urlparse
+import logging
+
+from tenacity import RetryCallState, Retrying, retry_if_exception, stop_after_attempt
+
+logger = logging.getLogger("jumia_scraper.retry")
+
+# Statuses worth another attempt; any other 4xx (404, 410, ...) is final
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504, 520, 521, 522, 524}
+
+# Page titles / markup of anti-bot interstitials (Cloudflare and friends)
+CHALLENGE_MARKERS = ("just a moment", "attention required", "checking your browser", "captcha", "access denied")
+CHALLENGE_SELECTOR = "#challenge-form, #cf-challenge-running, iframe[src*='captcha'], iframe[src*='challenges']"
+
+# Longest Retry-After we are willing to sleep for inside a single navigation
+MAX_RETRY_AFTER = 120.0
+
+
+class ScrapeError(Exception):
+    """A classified page failure; kind is one of timeout/network/http/challenge/dom/circuit/other"""
+    kind = "other"
+    retryable = True
+    trips_breaker = True  # counts as a sign the host is unhealthy
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class NavigationTimeout(ScrapeError):
+    kind = "timeout"
+
+
+class NetworkError(ScrapeError):
+    kind = "network"
+
+
+class HTTPStatusError(ScrapeError):
+    kind = "http"
+
+    def __init__(self, status: int, url: str, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status} for {url}", retry_after)
+        self.status = status
+        self.retryable = status in RETRYABLE_STATUSES
+        self.trips_breaker = status == 429 or status >= 500
+
+
+class BotChallenge(ScrapeError):
+    kind = "challenge"
+
+
+class DomNotFound(ScrapeError):
+    kind = "dom"
+    retryable = False
+    trips_breaker = False
+
+
+class CircuitOpen(ScrapeError):
+    kind = "circuit"
+    trips_breaker = False
+
+
+def classify(exc: BaseException) -> ScrapeError:
+    """Wraps a raw Playwright/OS exception into a ScrapeError subclass"""
+    if isinstance(exc, ScrapeError):
+        return exc
+    message = str(exc)
+    # Matched by name so this module does not need to import Playwright
+    if type(exc).__name__ == "TimeoutError" or isinstance(exc, TimeoutError):
+        return NavigationTimeout(message)
+    if "net::ERR_" in message or "NS_ERROR_" in message or isinstance(exc, ConnectionError):
+        return NetworkError(message)
+    return ScrapeError(message)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_challenge(title: Optional[str]) -> bool:
+    title = (title or "").lower()
+    return any(marker in title for marker in CHALLENGE_MARKERS)
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    After `threshold` consecutive failures a host is opened for `cooldown`
+    seconds (or for the server's Retry-After, if longer); requests fail fast
+    with CircuitOpen meanwhile. When the cooldown ends exactly one trial
+    request is let through (half-open) while other callers keep failing
+    fast: success closes the circuit, failure re-opens it. A trial that
+    never reports back (e.g. it ended in a 404) is replaced after `cooldown`.
+    """
+
+    # Retry-After handed to callers turned away while the half-open trial is in flight
+    HALF_OPEN_WAIT = 5.0
+
+    def __init__(self, threshold: int = 5, cooldown: float = 60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures: Dict[str, int] = {}
+        self._open_until: Dict[str, float] = {}
+        self._tripped: Set[str] = set()  # hosts opened by the threshold, half-open once the cooldown ends
+        self._trial_started: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def before_request(self, host: str):
+        with self._lock:
+            now = time.monotonic()
+            remaining = self._open_until.get(host, 0.0) - now
+            if remaining <= 0 and host in self._tripped:
+                started = self._trial_started.get(host)
+                if started is not None and now - started < self.cooldown:
+                    raise CircuitOpen(f"Circuit half-open for {host} (trial in flight)", retry_after=self.HALF_OPEN_WAIT)
+                # This caller is the trial
+                self._trial_started[host] = now
+        if remaining > 0:
+            raise CircuitOpen(f"Circuit open for {host} ({remaining:.0f}s left)", retry_after=remaining)
+
+    def record_success(self, host: str):
+        with self._lock:
+            self._failures.pop(host, None)
+            self._open_until.pop(host, None)
+            self._tripped.discard(host)
+            self._trial_started.pop(host, None)
+
+    def record_failure(self, host: str, retry_after: Optional[float] = None):
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            now = time.monotonic()
+            if retry_after:
+                # The server told us when to come back; don't hit it before that
+                self._open_until[host] = max(self._open_until.get(host, 0.0), now + retry_after)
+            trial_failed = self._trial_started.pop(host, None) is not None
+            if trial_failed or failures >= self.threshold:
+                self._open_until[host] = max(self._open_until.get(host, 0.0), now + self.cooldown)
+                self._tripped.add(host)
+                self._failures[host] = 0
+                reason = "failed half-open trial" if trial_failed else f"{failures} failures"
+                logger.warning(f"Circuit opened for {host} for {self.cooldown:.0f}s after {reason}")
+
+
+# Shared by every scraper in the process, so concurrent jobs back off a host together
+BREAKER = CircuitBreaker()
+
+
+class RetryStats:
+    """Per-error-class counters: failures seen, retries scheduled, and attempts given up"""
+
+    def __init__(self):
+        self.failures: Counter = Counter()
+        self.retries: Counter = Counter()
+        self.gave_up: Counter = Counter()
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def record_failure(self, kind: str):
+        with self._lock:
+            self.failures[kind] += 1
+
+    def record_retry(self, kind: str, wait: float):
+        with self._lock:
+            self.retries[kind] += 1
+            self.waited += wait
+
+    def record_gave_up(self, kind: str):
+        with self._lock:
+            self.gave_up[kind] += 1
+
+    def as_dict(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "failures": dict(self.failures),
+                "retries": dict(self.retries),
+                "gave_up": dict(self.gave_up),
+                "backoff_seconds": round(self.waited, 3),
+            }
+
+
+class BackoffWait:
+    """
+    tenacity wait strategy: exponential backoff with random jitter, except when
+    the error carries a Retry-After (or circuit cooldown), which is honored.
+    Bot challenges start from a longer base since they rarely clear quickly.
+    """
+
+    def __init__(self, base: float = 1.0, cap: float = 60.0, challenge_base: float = 5.0):
+        self.base = base
+        self.cap = cap
+        self.challenge_base = challenge_base
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_AFTER) + random.uniform(0, self.base)
+        base = self.challenge_base if isinstance(exc, BotChallenge) else self.base
+        ceiling = min(self.cap, base * 2 ** (retry_state.attempt_number - 1))
+        return random.uniform(base / 2, ceiling)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, CircuitOpen):
+        return (exc.retry_after or 0) <= MAX_RETRY_AFTER
+    return isinstance(exc, ScrapeError) and exc.retryable
+
+
+def build_retrying(stats: RetryStats, max_attempts: int = 4, base: float = 1.0, cap: float = 60.0) -> Retrying:
+    """Retrying controller for one navigation; raises the last ScrapeError when it gives up"""
+
+    def before_sleep(retry_state: RetryCallState):
+        exc = retry_state.outcome.exception()
+        wait = retry_state.next_action.sleep if retry_state.next_action else 0.0
+        stats.record_retry(getattr(exc, "kind", "other"), wait)
+        logger.warning(
+            f"{type(exc).__name__}: {exc} - retry {retry_state.attempt_number}/{max_attempts - 1} in {wait:.1f}s"
+        )
+
+    return Retrying(
+        stop=stop_after_attempt(max_attempts),
+        wait=BackoffWait(base, cap),
+        retry=retry_if_exception(_is_retryable),
+        before_sleep=before_sleep,
+        reraise=True,
+    )
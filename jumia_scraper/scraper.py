@@ -1,62 +1,289 @@
+import json
+import os
+import tempfile
 import time
-import random
-from typing import List, Optional
+import threading
+from datetime import datetime
+from typing import Callable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
 
 from .config import ScraperConfig
 from .models import ProductItem
-from .utils import setup_logging, get_random_user_agent, clean_price
+from .batch import Product, ProductBatch, row_type, select_fields
+from .normalize import EXTRACT_CARDS_JS, keyword_terms, normalize_cards, raw_keys_for
+from .utils import setup_logging
+from .useragents import get_pool
+from .proxies import get_pool as get_proxy_pool, proxy_fault
+from .ratelimit import get_limiter
+from .metrics import RunMetrics
+from .archive import ARCHIVE_MODES, SnapshotArchive
+from .retry import (
+    BREAKER, CHALLENGE_SELECTOR, BotChallenge, CircuitOpen, DomNotFound, HTTPStatusError, RetryStats, ScrapeError,
+    build_retrying, classify, host_of, is_challenge, parse_retry_after,
+)
 
 logger = setup_logging()
 
+PRODUCT_CARD_SELECTOR = "article.prd, article.c-prd"
+# Close buttons of the newsletter / consent overlays
+POPUP_CLOSE_SELECTOR = "button[aria-label='newsletter_popup_close-cta'], #newsletter_popup_close-cta, .cls"
+
+
+def page_url(category_url: str, page: int) -> str:
+    """Listing URL for an explicit page number (Jumia paginates with ?page=N)"""
+    parts = urlsplit(category_url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "page"]
+    if page > 1:
+        query.append(("page", str(page)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+
 class JumiaScraper:
-    def __init__(self, config: ScraperConfig):
+    def __init__(self, config: ScraperConfig, on_progress: Optional[Callable[[dict], None]] = None):
         self.config = config
         self.playwright = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        # Set when PROXY_LIST is configured; each browser context is bound to one proxy
+        self.proxy_pool = get_proxy_pool(config.PROXY_LIST) if config.PROXY_LIST else None
+        self.proxy = None
+        # Structured progress events (see _emit); used by the dashboard job runner
+        self.on_progress = on_progress
+        self._cancelled = threading.Event()
+        # Per-error-class counters for this run (see retry.py)
+        self.retry_stats = RetryStats()
+        # Per-stage timings and counters (see metrics.py); storage is timed by the caller
+        self.metrics = RunMetrics(retry_stats=self.retry_stats)
+        # Record every fetched listing page, or replay navigations from earlier recordings
+        mode = config.ARCHIVE_MODE.lower()
+        if mode not in ARCHIVE_MODES:
+            raise ValueError(f"ARCHIVE_MODE must be one of {', '.join(ARCHIVE_MODES)}, got {config.ARCHIVE_MODE!r}")
+        self.archive = SnapshotArchive(config.ARCHIVE_DIR) if config.ARCHIVE_DIR and mode != "off" else None
+        self.replaying = self.archive is not None and mode == "replay"
+        self.recording = self.archive is not None and mode == "record"
+        # Cookies / localStorage saved per country once overlays are dismissed (see _save_storage_state)
+        self.storage_state_path = (
+            os.path.join(config.STORAGE_STATE_DIR, f"{config.COUNTRY_CODE.lower()}.json")
+            if config.STORAGE_STATE_DIR else None
+        )
+        self._popups_checked = False
+        # KEYWORD is matched against card names inside EXTRACT_CARDS_JS, so misses are never extracted or built
+        self.keyword_terms = keyword_terms(config.KEYWORD)
+        # FIELDS projection: only the raw values those fields derive from are read from each card
+        self.fields = select_fields(config.FIELDS) if config.FIELDS else None
+        self.raw_keys = raw_keys_for(self.fields)
+        self._row_type = row_type(tuple(self.fields)) if self.fields else None
+
+    def cancel(self):
+        """Ask a running scrape to stop after the current page"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _emit(self, event: str, **data):
+        if not self.on_progress:
+            return
+        try:
+            self.on_progress({"event": event, "ts": time.time(), **data})
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
 
     def start(self):
         self.playwright = sync_playwright().start()
-        proxy = {"server": self.config.PROXY_URL} if self.config.PROXY_URL else None
+        if self.proxy_pool:
+            # Chromium needs a browser-level proxy before contexts can override it
+            proxy = {"server": "http://per-context"}
+        else:
+            proxy = {"server": self.config.PROXY_URL} if self.config.PROXY_URL else None
         
         self.browser = self.playwright.chromium.launch(
             headless=self.config.HEADLESS,
             proxy=proxy
         )
-        
-        self.context = self.browser.new_context(
-            user_agent=get_random_user_agent(),
-            viewport={'width': 1920, 'height': 1080}
-        )
+        self._new_context()
+
+    def _ua_key(self) -> str:
+        """Sticky user-agent key: one identity per exit proxy, or per scraper without proxies"""
+        owner = self.proxy.server if self.proxy else f"scraper-{id(self)}"
+        return f"{self.config.COUNTRY_CODE.lower()}|{owner}"
+
+    def _new_context(self):
+        if self.proxy_pool:
+            self.proxy = self.proxy_pool.acquire()
+            logger.info(f"Using proxy {self.proxy.server}")
+        # UA, viewport and client hints stay consistent for as long as this identity is used
+        profile = get_pool(self.config.USER_AGENT_FILE).for_context(self._ua_key())
+        logger.info(f"Using {profile.platform} user agent: {profile.user_agent}")
+        options = profile.context_options()
+        if self.storage_state_path and os.path.exists(self.storage_state_path):
+            # Returning visitor: consent / newsletter overlays and first-visit redirects are already behind us
+            options["storage_state"] = self.storage_state_path
+            logger.info(f"Reusing storage state {self.storage_state_path}")
+        if self.proxy:
+            options["proxy"] = self.proxy.playwright()
+        self.context = self.browser.new_context(**options)
+        if self.replaying:
+            self.context.route("**/*", self.archive.route_handler(
+                on_miss=lambda url: logger.warning(f"No archived snapshot of {url}")
+            ))
         self.page = self.context.new_page()
         self.page.set_default_timeout(self.config.TIMEOUT)
+        self.page.on("requestfinished", self.metrics.on_request_finished)
+        self._popups_checked = False
+
+    def _release_proxy(self):
+        if self.proxy_pool and self.proxy:
+            self.proxy_pool.release(self.proxy)
+            self.proxy = None
+
+    def _rotate_proxy(self):
+        """Replace the context with one bound to the next best proxy (and that proxy's user agent)"""
+        self._release_proxy()
+        try:
+            self.context.close()
+        except Exception:
+            pass
+        self._new_context()
+
+    def _save_storage_state(self):
+        """Persist the context's cookies / localStorage for the next run of this country"""
+        if not self.storage_state_path or self.replaying or not self.context:
+            return
+        try:
+            state = self.context.storage_state()
+            directory = os.path.dirname(self.storage_state_path) or "."
+            os.makedirs(directory, exist_ok=True)
+            # Concurrent scrapers of one country may save at once; rename keeps the file whole
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.storage_state_path)
+        except Exception as e:
+            logger.warning(f"Could not save storage state: {e}")
 
     def stop(self):
+        if not self.proxy_pool:
+            # Per-scraper identities are never reused once the scraper is gone
+            get_pool(self.config.USER_AGENT_FILE).release(self._ua_key())
+        self._release_proxy()
         if self.context:
+            self._save_storage_state()
             self.context.close()
         if self.browser:
             self.browser.close()
         if self.playwright:
             self.playwright.stop()
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
     def navigate(self, url: str):
+        """
+        Loads url, retrying only errors worth retrying (timeouts, network errors,
+        429/5xx, bot challenges) with exponential backoff and jitter. Raises the
+        classified ScrapeError once attempts are exhausted.
+        """
+        retrying = build_retrying(
+            self.retry_stats,
+            max_attempts=self.config.MAX_RETRIES,
+            base=self.config.RETRY_BACKOFF_BASE,
+            cap=self.config.RETRY_BACKOFF_CAP,
+        )
+        try:
+            with self.metrics.stage("navigate"):
+                for attempt in retrying:
+                    with attempt:
+                        response = self._navigate_once(url)
+        except ScrapeError as e:
+            self.retry_stats.record_gave_up(e.kind)
+            raise
+        if self.recording and response is not None:
+            with self.metrics.stage("archive"):
+                try:
+                    self.archive.put(url, response.body(), response.status, self.config.COUNTRY_CODE.lower())
+                except Exception as e:
+                    logger.warning(f"Could not archive {url}: {e}")
+        if not self._popups_checked:
+            # Once per context (first page): dismissed overlays stay closed through the context's cookies
+            with self.metrics.stage("popups"):
+                self._handle_popups()
+            self._popups_checked = True
+            self._save_storage_state()
+
+    def _navigate_once(self, url: str):
+        if self.replaying:
+            # Served from disk: no pacing, no breaker, nothing worth retrying
+            logger.info(f"Replaying {url}")
+            response = self.page.goto(url, wait_until="domcontentloaded")
+            if response is not None and response.status >= 400:
+                raise HTTPStatusError(response.status, url)
+            return response
+
+        host = host_of(url)
+        BREAKER.before_request(host)
+        # Shared per host, so concurrent scrapers of one country pace together
+        limiter = get_limiter(
+            host, shared_db=self.config.RATE_LIMIT_DB, rate=self.config.RATE_LIMIT, max_rate=self.config.RATE_LIMIT_MAX
+        )
+        limiter.acquire()
         logger.info(f"Navigating to {url}")
-        self.page.goto(url, wait_until="domcontentloaded")
-        self._handle_popups()
+        started = time.monotonic()
+        try:
+            response = self.page.goto(url, wait_until="domcontentloaded")
+            if response is not None and response.status >= 400:
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                if response.status in (403, 503) and self._on_challenge_page():
+                    raise BotChallenge(f"Bot challenge at {url}", retry_after)
+                raise HTTPStatusError(response.status, url, retry_after)
+            if self._on_challenge_page():
+                raise BotChallenge(f"Bot challenge at {url}")
+        except Exception as e:
+            error = classify(e)
+            self.retry_stats.record_failure(error.kind)
+            limiter.record(
+                latency=time.monotonic() - started,
+                status=getattr(error, "status", None),
+                throttled=error.kind == "challenge",
+                retry_after=error.retry_after,
+                failed=True,
+            )
+            blamed, banned = proxy_fault(error) if self.proxy else (False, False)
+            if blamed:
+                # The proxy's IP is the problem, not the site: rotate instead of backing off the host
+                self.proxy_pool.report(self.proxy, ok=False, banned=banned)
+                self._rotate_proxy()
+            elif error.trips_breaker:
+                BREAKER.record_failure(host, error.retry_after)
+            if error is e:
+                raise
+            raise error from e
+        latency = time.monotonic() - started
+        limiter.record(latency=latency, status=response.status if response is not None else None)
+        BREAKER.record_success(host)
+        if self.proxy:
+            self.proxy_pool.report(self.proxy, ok=True, latency=latency)
+        return response
+
+    def _on_challenge_page(self) -> bool:
+        try:
+            return is_challenge(self.page.title()) or self.page.locator(CHALLENGE_SELECTOR).count() > 0
+        except Exception:
+            return False
 
     def _handle_popups(self):
-        """Close common popups like newsletter subscription"""
+        """Close common popups like newsletter subscription (instant check, no waiting)"""
         try:
-            # Example selector for newsletter popup close button
-            # This is a guess and might need adjustment based on actual site
-            popup_close = self.page.locator("button[aria-label='newsletter_popup_close-cta']").or_(self.page.locator(".cls"))
-            if popup_close.is_visible(timeout=2000):
-                popup_close.click()
-                logger.info("Closed popup")
+            popup_close = self.page.locator(POPUP_CLOSE_SELECTOR).first
+            if popup_close.is_visible():
+                self._dismiss_popup(popup_close)
+        except Exception:
+            pass
+
+    def _dismiss_popup(self, popup_close):
+        try:
+            popup_close.click(timeout=2000)
+            logger.info("Closed popup")
         except Exception:
             pass
 
@@ -87,263 +314,116 @@ class JumiaScraper:
         self.page.evaluate("window.scrollTo(0, 0)")
         self.page.wait_for_timeout(1000)
 
-    def parse_page(self) -> List[ProductItem]:
-        # Ensure network is idle before scrolling
-        try:
-            self.page.wait_for_load_state("networkidle", timeout=10000)
-        except Exception:
-            pass
-            
-        self._scroll_to_bottom()
-        
-        items = []
-        product_cards = self.page.locator("article.prd, article.c-prd")
-        count = product_cards.count()
-        logger.info(f"Found {count} products on page")
+    def parse_page(self) -> List[Product]:
+        """
+        Products of the current page: ProductItem objects, or with FIELDS set
+        ProductRow namedtuples holding only the selected fields (no model
+        methods, and unselected fields raise AttributeError).
+        """
+        metrics = self.metrics
+        with metrics.stage("networkidle"):
+            # Ensure network is idle before scrolling
+            try:
+                self.page.wait_for_load_state("networkidle", timeout=10000)
+            except Exception:
+                pass
 
-        for i in range(count):
             try:
-                card = product_cards.nth(i)
+                self.page.wait_for_selector(PRODUCT_CARD_SELECTOR, timeout=10000)
+            except Exception as e:
+                self.retry_stats.record_failure(DomNotFound.kind)
+                raise DomNotFound(f"No product cards on {self.page.url}") from e
 
-                # Extract URL and Link Element
-                link = card.locator("a.core")
-                if not link.count():
+        if not self.replaying:
+            # Archived pages already hold every card and lazy loads have nothing to fetch offline
+            with metrics.stage("scroll"):
+                self._scroll_to_bottom()
+        
+        items = []
+        # One timestamp per page instead of a utcnow() call per item
+        crawled_at = datetime.utcnow()
+        product_cards = self.page.locator(PRODUCT_CARD_SELECTOR)
+
+        # Pull the raw attributes of every card in a single browser round trip,
+        # then clean the whole page in one pass (see normalize.py)
+        with metrics.stage("extract"):
+            raw_cards = product_cards.evaluate_all(EXTRACT_CARDS_JS, {"terms": self.keyword_terms, "keys": self.raw_keys})
+        if self.keyword_terms:
+            matched = sum(1 for raw in raw_cards if raw)
+            logger.info(f"Found {len(raw_cards)} products on page, {matched} matching '{self.config.KEYWORD}'")
+        else:
+            logger.info(f"Found {len(raw_cards)} products on page")
+
+        with metrics.stage("normalize"):
+            cards = normalize_cards(raw_cards, self.config.base_url, self.config.COUNTRY_CODE, self.fields)
+        with metrics.stage("build"):
+            for i, fields in enumerate(cards):
+                try:
+                    # Create ProductItem (values are already normalized, skip validation)
+                    if self.fields:
+                        # Projected run: rows carry only the selected fields, no model defaults
+                        items.append(self._row_type(**{**dict.fromkeys(self.fields), **fields, 'crawled_at': crawled_at}))
+                    else:
+                        items.append(ProductItem.trusted(crawled_at=crawled_at, **fields))
+                except Exception as e:
+                    logger.error(f"Error parsing product {i}: {e}")
                     continue
-                    
-                url = link.get_attribute("href")
-                if url and not url.startswith("http"):
-                    url = self.config.base_url + url
-
-                # ========== 必采字段 ==========
-                # Extract product_id (Jumia内部商品唯一ID)
-                # Priority: data-gtm-id > data-id > form action
-                product_id = link.get_attribute("data-gtm-id") or link.get_attribute("data-id") or card.get_attribute("data-id")
-                
-                if not product_id:
-                    # Try to extract from form action
-                    form = card.locator("form")
-                    if form.count():
-                        action = form.get_attribute("action")
-                        if action:
-                            import re
-                            match = re.search(r'/products/([^/]+)/', action)
-                            if match:
-                                product_id = match.group(1)
-
-                # Extract Name
-                name = "Unknown"
-                name_el = card.locator("h3.name")
-                if not name_el.count():
-                    name_el = card.locator(".name")
-                
-                if name_el.count():
-                    name = name_el.inner_text().strip()
-
-                # Extract Brand (data-gtm-brand) - on <a> tag
-                brand = link.get_attribute("data-gtm-brand") or card.get_attribute("data-brand")
-                if not brand:
-                    # Try to guess from name
-                    brand = name.split()[0] if name != "Unknown" else None
-
-                # Extract Price
-                # Support both div.prc and p.prc
-                price_el = card.locator("div.prc, p.prc")
-                price_text = price_el.inner_text() if price_el.count() else "0"
-                price = clean_price(price_text)
-
-                # Extract Image - try multiple attributes
-                img_el = card.locator("img.img")
-                img_url = None
-                if img_el.count():
-                    # Priority: data-src > src > srcset
-                    # Jumia uses data-src for lazy loading
-                    img_url = img_el.get_attribute("data-src")
-                    
-                    if not img_url or img_url.startswith("data:"):
-                        img_url = img_el.get_attribute("src")
-                    
-                    if not img_url or img_url.startswith("data:"):
-                        srcset = img_el.get_attribute("srcset")
-                        if srcset:
-                            img_url = srcset.split(',')[0].split()[0]
-
-                    # Clean up URL
-                    if img_url:
-                        img_url = img_url.strip()
-                        # Handle protocol-relative URLs (//example.com)
-                        if img_url.startswith("//"):
-                            img_url = "https:" + img_url
-                        # Handle relative URLs (/product/...)
-                        elif not img_url.startswith("http") and not img_url.startswith("data:"):
-                            img_url = self.config.base_url + img_url
-                        
-                        # Final check: if it's still a data URI, discard it
-                        if img_url.startswith("data:"):
-                            img_url = None
-
-                # Extract Rating (data-gtm-dimension27 或评分显示) - on <a> tag
-                rating = None
-                rating_attr = link.get_attribute("data-gtm-dimension27")
-                if rating_attr:
-                    try:
-                        rating = float(rating_attr)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if rating is None:
-                    rating_el = card.locator("div.stars._s")
-                    if rating_el.count():
-                        rating_text = rating_el.inner_text()
-                        try:
-                            rating = float(rating_text.split()[0]) if rating_text else None
-                        except (ValueError, IndexError):
-                            pass
-
-                # Extract Review Count (评论量) - on <a> tag
-                review_count = 0
-                review_attr = link.get_attribute("data-gtm-dimension26")
-                if review_attr:
-                    try:
-                        review_count = int(review_attr)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if review_count == 0:
-                    # Try to extract from text like "(696)"
-                    review_el = card.locator("div.rev, .stars")
-                    if review_el.count():
-                        review_text = review_el.inner_text()
-                        import re
-                        match = re.search(r'\((\d+)\)', review_text)
-                        if match:
-                            review_count = int(match.group(1))
-
-                # Extract Seller ID (店铺ID) - on <a> tag
-                seller_id = link.get_attribute("data-gtm-dimension23")
-
-                # Extract Category Path (完整类目层级) - on <a> tag
-                category_path = []
-                category_str = link.get_attribute("data-gtm-category")
-                if category_str:
-                    category_path = [c.strip() for c in category_str.split(" / ") if c.strip()]
-
-                # ========== 建议采集字段 ==========
-                # Extract Old Price
-                old_price_el = card.locator("div.old")
-                old_price = clean_price(old_price_el.inner_text()) if old_price_el.count() else None
-
-                # Extract Discount
-                discount_el = card.locator("div.bdg._dsct")
-                discount_text = discount_el.inner_text() if discount_el.count() else None
-                discount = None
-                if discount_text:
-                    try:
-                        discount = float(discount_text.replace('%', '').replace('-', '').strip())
-                    except ValueError:
-                        pass
-
-                # Extract Promo Tag (促销活动标签)
-                promo_tag = None
-                promo_el = card.locator("span.bdg:not(._dsct), div.bdg:not(._dsct)")
-                if promo_el.count():
-                    promo_tag = promo_el.first.inner_text().strip()
-
-                # Extract is_express (是否为Jumia Express)
-                is_express = card.locator("svg.ic.xprss").count() > 0
-
-                # Extract GTM Tags (Jumia内部标签集) - on <a> tag
-                gtm_tags = []
-                gtm_tags_str = link.get_attribute("data-gtm-dimension43")
-                if gtm_tags_str:
-                    gtm_tags = [tag.strip() for tag in gtm_tags_str.split("|") if tag.strip()]
-
-                # Extract List Position (商品在列表页的排序位置) - on <a> tag
-                list_position = None
-                position_str = link.get_attribute("data-gtm-position") or link.get_attribute("data-ga4-index")
-                if position_str:
-                    try:
-                        list_position = int(position_str)
-                    except (ValueError, TypeError):
-                        pass
-
-                # ========== 可选字段 ==========
-                # Extract Rating Ratio (评分比例)
-                rating_ratio = None
-                ratio_el = card.locator("div.in")
-                if ratio_el.count():
-                    style = ratio_el.get_attribute("style")
-                    if style:
-                        import re
-                        match = re.search(r'width:\s*(\d+)%', style)
-                        if match:
-                            rating_ratio = float(match.group(1)) / 100
-
-                # Extract GA4 Categories - on <a> tag
-                ga4_category_1 = link.get_attribute("data-ga4-item_category")
-                ga4_category_2 = link.get_attribute("data-ga4-item_category2")
-
-                # Extract GA4 Price - on <a> tag
-                ga4_price = None
-                ga4_price_str = link.get_attribute("data-ga4-price")
-                if ga4_price_str:
-                    try:
-                        ga4_price = float(ga4_price_str)
-                    except (ValueError, TypeError):
-                        pass
-
-                # Extract is_second_chance - on <a> tag
-                is_second_chance = None
-                second_chance_str = link.get_attribute("data-ga4-is_second_chance")
-                if second_chance_str:
-                    is_second_chance = second_chance_str.lower() == "true"
-
-                # Create ProductItem
-                item = ProductItem(
-                    # 必采字段
-                    product_id=product_id,
-                    name=name,
-                    brand=brand,
-                    url=url,
-                    image_url=img_url,
-                    currency=self.config.COUNTRY_CODE.upper(),
-                    current_price=price,
-                    rating=rating,
-                    review_count=review_count,
-                    seller_id=seller_id,
-                    category_path=category_path,
-                    # 建议采集字段
-                    old_price=old_price,
-                    discount_percentage=discount,
-                    promo_tag=promo_tag,
-                    is_express=is_express,
-                    gtm_tags=gtm_tags,
-                    list_position=list_position,
-                    # 可选字段
-                    rating_ratio=rating_ratio,
-                    ga4_category_1=ga4_category_1,
-                    ga4_category_2=ga4_category_2,
-                    ga4_price=ga4_price,
-                    is_second_chance=is_second_chance
-                )
-                items.append(item)
-            except Exception as e:
-                logger.error(f"Error parsing product {i}: {e}")
-                continue
         
         return items
 
-    def run(self) -> List[ProductItem]:
-        all_products = []
+    def scrape_page(self, url: str, page_num: int = 1) -> List[Product]:
+        """Navigate to one listing page and parse it (the browser must be started)"""
+        self.metrics.start_page(page_num, url)
+        try:
+            self.navigate(url)
+            products = self.parse_page()
+        except ScrapeError:
+            self.metrics.end_page(failed=True)
+            raise
+        self.metrics.end_page(items=len(products))
+        return products
+
+    def run(self) -> ProductBatch:
+        all_products = ProductBatch(self.fields)
+        started = time.time()
         try:
             self.start()
             current_url = self.config.CATEGORY_URL
+            self._emit("started", url=current_url, max_pages=self.config.MAX_PAGES)
+            failed_pages = 0
             
             for page_num in range(1, self.config.MAX_PAGES + 1):
+                if self._cancelled.is_set():
+                    logger.info("Scrape cancelled. Stopping.")
+                    self._emit("cancelled", pages_done=page_num - 1, items=len(all_products))
+                    break
+
                 logger.info(f"Scraping page {page_num}")
-                self.navigate(current_url)
-                
-                products = self.parse_page()
+                try:
+                    products = self.scrape_page(current_url, page_num)
+                except ScrapeError as e:
+                    # Skip the page instead of losing the rest of the category
+                    failed_pages += 1
+                    logger.error(f"Page {page_num} failed ({e.kind}): {e}")
+                    self._emit("page_failed", page=page_num, kind=e.kind, message=str(e))
+                    if isinstance(e, CircuitOpen) or failed_pages >= self.config.MAX_FAILED_PAGES:
+                        logger.error("Too many failures, giving up on this category.")
+                        break
+                    current_url = page_url(self.config.CATEGORY_URL, page_num + 1)
+                    continue
+                failed_pages = 0
                 all_products.extend(products)
+
+                elapsed = time.time() - started
+                self._emit(
+                    "page_done",
+                    page=page_num,
+                    max_pages=self.config.MAX_PAGES,
+                    page_items=len(products),
+                    items=len(all_products),
+                    elapsed=elapsed,
+                    items_per_sec=len(all_products) / elapsed if elapsed > 0 else 0.0,
+                )
                 
                 # Check for next page
                 # Jumia pagination usually has 'a[aria-label="Next Page"]'
@@ -360,13 +440,25 @@ class JumiaScraper:
                     current_url = self.config.base_url + next_url
                 else:
                     current_url = next_url
-                
-                # Random sleep
-                time.sleep(random.uniform(1, 3))
+                # No fixed sleep here: navigate() paces requests through the host's rate limiter
                 
         except Exception as e:
             logger.error(f"Scraping failed: {e}")
+            self._emit("error", message=str(e), items=len(all_products))
         finally:
             self.stop()
-            
+
+        retries = self.retry_stats.as_dict()
+        if retries["failures"]:
+            logger.info(f"Retry stats: {retries}")
+        if self.proxy_pool:
+            logger.info(f"Proxy stats: {self.proxy_pool.stats()}")
+        self.metrics.finish()
+        self._emit(
+            "finished",
+            items=len(all_products),
+            elapsed=time.time() - started,
+            retries=retries,
+            stages=self.metrics.stage_summary(),
+        )
         return all_products
@@ -0,0 +1,166 @@
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Union
+import logging
+
+from .models import ProductItem
+from .batch import ProductBatch
+
+logger = logging.getLogger("jumia_scraper.search")
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def sidecar_path(output_file: str) -> str:
+    """Path of the index database kept next to a JSONL/CSV output file"""
+    return output_file + ".idx.db"
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """
+    Turns free text like 'sams galax' into an FTS5 query matching every
+    term as a prefix: "sams"* AND "galax"*
+    """
+    terms = TOKEN_RE.findall(text or "")
+    if not terms:
+        return None
+    return " AND ".join(f'"{term}"*' for term in terms)
+
+
+class SearchIndex:
+    """
+    FTS5 index over product name, brand and category path.
+
+    For SQLite output the index lives in the product database itself,
+    for JSONL/CSV output in a sidecar database (see sidecar_path).
+    Rows are keyed by product_id (url when the id is missing).
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    @classmethod
+    def for_output(cls, output_file: str, format: str) -> "SearchIndex":
+        if format.lower() == 'sqlite':
+            return cls(output_file)
+        return cls(sidecar_path(output_file))
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def ensure_schema(conn: sqlite3.Connection):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_keys (id INTEGER PRIMARY KEY, product_id TEXT UNIQUE NOT NULL)"
+        )
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+            "name, brand, category_path, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+
+    @staticmethod
+    def exists(conn: sqlite3.Connection) -> bool:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='products_fts'"
+        ).fetchone()
+        return row is not None
+
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, rows: Iterable[tuple]):
+        """Index (key, name, brand, category_path) rows: one statement per step for the whole batch"""
+        # Last entry per key wins, so each FTS rowid is inserted once
+        latest = {key: (name or "", brand or "", category_path or "", key)
+                  for key, name, brand, category_path in rows}
+        if not latest:
+            return
+        conn.executemany("INSERT OR IGNORE INTO search_keys (product_id) VALUES (?)", ((key,) for key in latest))
+        conn.executemany(
+            "DELETE FROM products_fts WHERE rowid = (SELECT id FROM search_keys WHERE product_id = ?)",
+            ((key,) for key in latest),
+        )
+        conn.executemany(
+            "INSERT INTO products_fts (rowid, name, brand, category_path) "
+            "SELECT id, ?, ?, ? FROM search_keys WHERE product_id = ?",
+            latest.values(),
+        )
+
+    def add(self, items: Union[ProductBatch, Iterable[ProductItem]], conn: Optional[sqlite3.Connection] = None):
+        """Index (or re-index) items; pass conn to join the caller's transaction"""
+        if conn is None:
+            with self._connect() as own_conn:
+                return self.add(items, own_conn)
+
+        if isinstance(items, ProductBatch) and 'name' not in items.fields:
+            # Projected batch without names: indexing it would blank existing entries
+            return
+        self.ensure_schema(conn)
+        if isinstance(items, ProductBatch):
+            rows = zip(*(items.column(name) for name in ('product_id', 'url', 'name', 'brand', 'category_path')))
+        else:
+            rows = ((i.product_id, i.url, i.name, i.brand, i.category_path) for i in items)
+        self._upsert(conn, (
+            (product_id or url, name, brand, " / ".join(category_path or []))
+            for product_id, url, name, brand, category_path in rows
+            if product_id or url
+        ))
+
+    def rebuild_from_products(self):
+        """Index an existing products table written before the index existed"""
+        with self._connect() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(products)")}
+            if 'product_id' not in columns:
+                logger.warning(f"{self.db_path} has no product_id column; search index not built")
+                return
+            self.ensure_schema(conn)
+            category_expr = "category_path" if 'category_path' in columns else "NULL"
+            brand_expr = "brand" if 'brand' in columns else "NULL"
+            # Rows without a product_id are keyed by url, as in add()
+            key_expr = "COALESCE(product_id, url)" if 'url' in columns else "product_id"
+            rows = conn.execute(
+                f"SELECT {key_expr} AS search_key, name, {brand_expr}, {category_expr} "
+                f"FROM products WHERE search_key IS NOT NULL"
+            ).fetchall()
+            self._upsert(conn, (
+                (key, name, brand, self._category_text(category_path))
+                for key, name, brand, category_path in rows
+            ))
+        logger.info(f"Indexed {len(rows)} products in {self.db_path}")
+
+    @staticmethod
+    def _category_text(category_path: Optional[str]) -> Optional[str]:
+        # category_path is stored as a JSON list in SQLite
+        if category_path and category_path.startswith('['):
+            try:
+                return " / ".join(json.loads(category_path))
+            except json.JSONDecodeError:
+                pass
+        return category_path
+
+    def search(self, text: str, limit: Optional[int] = None) -> List[str]:
+        """Return product_ids matching all terms (as prefixes), best match first"""
+        match = build_match_query(text)
+        if not match or not os.path.exists(self.db_path):
+            return []
+        sql = (
+            "SELECT k.product_id FROM products_fts f JOIN search_keys k ON k.id = f.rowid "
+            "WHERE products_fts MATCH ? ORDER BY rank"
+        )
+        params: list = [match]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        try:
+            with self._connect() as conn:
+                return [row[0] for row in conn.execute(sql, params)]
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Search index unavailable at {self.db_path}: {e}")
+            return []
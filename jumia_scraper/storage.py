@@ -1,55 +1,126 @@
 import json
 import csv
 import sqlite3
-from typing import List
+from typing import List, Union
 from .models import ProductItem
+from .batch import Product, ProductBatch, LIST_FIELDS
+from .search import SearchIndex
+from .analytics import AnalyticsStore
+from .jsonl_index import JsonlOffsetIndex, iso_crawled_at
 import logging
 
 logger = logging.getLogger("jumia_scraper.storage")
 
+# Columns the dashboard filters and sorts on; indexed when the SQLite table is written
+INDEXED_COLUMNS = ['brand', 'current_price', 'discount_percentage', 'rating', 'review_count', 'crawled_at']
+# Appended to price_history on every SQLite save (products only keeps the latest crawl)
+HISTORY_FIELDS = ['current_price', 'old_price', 'discount_percentage', 'currency']
+
 class StorageHandler:
-    def __init__(self, output_file: str, format: str):
+    def __init__(self, output_file: str, format: str, search_index: bool = True, refresh_aggregates: bool = True):
         self.output_file = output_file
         self.format = format.lower()
+        # Full-text index over name/brand/category_path, see search.SearchIndex
+        self.search_index = SearchIndex.for_output(output_file, self.format) if search_index else None
+        # Dashboard analytics summaries (SQLite only), see analytics.AnalyticsStore
+        self.refresh_aggregates = refresh_aggregates
 
-    def save(self, items: List[ProductItem]):
+    def save(self, items: Union[ProductBatch, List[Product]]):
         if not items:
             logger.warning("No items to save.")
             return
 
+        # Writers work on columns; plain lists are converted once here (projected rows keep their fields)
+        if not isinstance(items, ProductBatch):
+            items = ProductBatch.from_items(items)
+
         if self.format == 'jsonl':
             self._save_jsonl(items)
         elif self.format == 'csv':
             self._save_csv(items)
         elif self.format == 'sqlite':
             self._save_sqlite(items)
+            return  # indexed inside the same transaction
         else:
             logger.error(f"Unsupported format: {self.format}")
+            return
 
-    def _save_jsonl(self, items: List[ProductItem]):
-        with open(self.output_file, 'a', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.model_dump_json() + '\n')
+        if self.search_index:
+            self.search_index.add(items)
+
+    def _save_jsonl(self, items: ProductBatch):
+        # Byte offset of every appended line goes to the sidecar, see jsonl_index.JsonlReader
+        offsets = JsonlOffsetIndex(self.output_file)
+        offsets.catch_up()
+        keys = zip(items.column('product_id'), items.column('url'), items.column('crawled_at'))
+        rows = []
+        with open(self.output_file, 'ab') as f:
+            offset = f.tell()
+            for line, (product_id, url, crawled_at) in zip(items.iter_json(), keys):
+                data = line.encode('utf-8')
+                f.write(data + b'\n')
+                rows.append((offset, len(data), product_id or url, iso_crawled_at(crawled_at)))
+                offset += len(data) + 1
+        offsets.add(rows, offset)
         logger.info(f"Saved {len(items)} items to {self.output_file}")
 
-    def _save_csv(self, items: List[ProductItem]):
+    def _save_csv(self, items: ProductBatch):
         # Check if file exists to write header
-        file_exists = False
+        header = None
         try:
-            with open(self.output_file, 'r') as f:
-                file_exists = True
+            with open(self.output_file, 'r', newline='', encoding='utf-8') as f:
+                header = next(csv.reader(f), None)
         except FileNotFoundError:
             pass
 
+        # Appending with a different projection (ScraperConfig.FIELDS): follow the file's header
+        if header and header != items.fields:
+            columns = {name: list(items.column(name)) for name in header}
+            items = ProductBatch(header)
+            for values in zip(*columns.values()):
+                items.append_values(**dict(zip(header, values)))
+
         with open(self.output_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=items[0].model_dump().keys())
-            if not file_exists:
-                writer.writeheader()
-            for item in items:
-                writer.writerow(item.model_dump())
+            writer = csv.writer(f)
+            if not header:
+                writer.writerow(items.fields)
+            list_positions = [i for i, name in enumerate(items.fields) if name in LIST_FIELDS]
+            for row in items.rows():
+                if list_positions:
+                    row = list(row)
+                    for i in list_positions:
+                        row[i] = list(row[i])
+                writer.writerow(row)
         logger.info(f"Saved {len(items)} items to {self.output_file}")
 
-    def _save_sqlite(self, items: List[ProductItem]):
+    @staticmethod
+    def _save_price_history(cursor: sqlite3.Cursor, items: ProductBatch):
+        """One row per product per crawl; re-saving the same crawl is a no-op"""
+        if 'product_id' not in items.fields or 'current_price' not in items.fields:
+            return
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS price_history (
+                product_id TEXT NOT NULL,
+                crawled_at TEXT NOT NULL,
+                current_price REAL,
+                old_price REAL,
+                discount_percentage REAL,
+                currency TEXT,
+                PRIMARY KEY (product_id, crawled_at)
+            ) WITHOUT ROWID
+        """)
+        columns = [items.column(name) for name in ['product_id', 'crawled_at', *HISTORY_FIELDS]]
+        cursor.executemany(
+            "INSERT OR IGNORE INTO price_history (product_id, crawled_at, current_price, old_price, "
+            "discount_percentage, currency) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (pid, crawled_at.isoformat() if hasattr(crawled_at, 'isoformat') else crawled_at, *rest)
+                for pid, crawled_at, *rest in zip(*columns)
+                if pid and crawled_at
+            ),
+        )
+
+    def _save_sqlite(self, items: ProductBatch):
         conn = sqlite3.connect(self.output_file)
         cursor = conn.cursor()
         
@@ -60,8 +131,10 @@ class StorageHandler:
             'brand': 'TEXT',
             'url': 'TEXT',
             'image_url': 'TEXT',
+            'country': 'TEXT',
             'currency': 'TEXT',
             'current_price': 'REAL',
+            'price_max': 'REAL',
             'old_price': 'REAL',
             'discount_percentage': 'REAL',
             'rating': 'REAL',
@@ -82,8 +155,7 @@ class StorageHandler:
             'crawled_at': 'TEXT'
         }
         
-        # Get all fields from the first item
-        fields = list(items[0].model_dump().keys())
+        fields = items.fields
         
         # Create table with proper types
         columns_def = []
@@ -93,30 +165,58 @@ class StorageHandler:
         
         create_table_sql = f"CREATE TABLE IF NOT EXISTS products ({', '.join(columns_def)})"
         cursor.execute(create_table_sql)
+
+        # Older databases may lack newer fields; add them instead of failing the insert
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(products)")}
+        for field in fields:
+            if field not in existing:
+                sql_type = field_type_mapping.get(field, 'TEXT').replace(' PRIMARY KEY', '')
+                cursor.execute(f"ALTER TABLE products ADD COLUMN {field} {sql_type}")
+                existing.add(field)
+
+        # Indexes backing the dashboard's filter/sort/pagination queries
+        for column in INDEXED_COLUMNS:
+            if column in existing:
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_products_{column} ON products ({column})")
         
         # Insert data
-        for item in items:
-            data = item.model_dump()
-            
-            # Convert list fields to JSON strings
-            if 'category_path' in data and isinstance(data['category_path'], list):
-                data['category_path'] = json.dumps(data['category_path'], ensure_ascii=False)
-            if 'gtm_tags' in data and isinstance(data['gtm_tags'], list):
-                data['gtm_tags'] = json.dumps(data['gtm_tags'], ensure_ascii=False)
-            
-            # Convert datetime to string
-            if 'crawled_at' in data and hasattr(data['crawled_at'], 'isoformat'):
-                data['crawled_at'] = data['crawled_at'].isoformat()
-            
-            placeholders = ', '.join(['?'] * len(data))
-            values = [str(v) if v is not None else None for v in data.values()]
-            
-            try:
-                cursor.execute(f"INSERT OR REPLACE INTO products VALUES ({placeholders})", values)
-            except sqlite3.IntegrityError as e:
-                logger.warning(f"Duplicate product_id, skipping: {e}")
-                continue
-        
+        insert_sql = f"INSERT OR REPLACE INTO products ({', '.join(fields)}) VALUES ({', '.join(['?'] * len(fields))})"
+        keyed = any(row[1] == 'product_id' and row[5] for row in cursor.execute("PRAGMA table_info(products)"))
+        if keyed and 'product_id' in fields and len(existing) > len(fields):
+            # Projected runs (ScraperConfig.FIELDS) update their columns and keep the rest of existing rows
+            updates = ', '.join(f"{field} = excluded.{field}" for field in fields if field != 'product_id')
+            insert_sql = (
+                f"INSERT INTO products ({', '.join(fields)}) VALUES ({', '.join(['?'] * len(fields))}) "
+                f"ON CONFLICT(product_id) DO UPDATE SET {updates}"
+            )
+
+        def to_sql(name, value):
+            if value is None:
+                return None
+            # List fields as JSON strings
+            if name in LIST_FIELDS:
+                return json.dumps(list(value), ensure_ascii=False)
+            # Datetime as ISO string
+            if hasattr(value, 'isoformat'):
+                return value.isoformat()
+            return str(value)
+
+        cursor.executemany(
+            insert_sql,
+            ([to_sql(name, v) for name, v in zip(fields, row)] for row in items.rows())
+        )
+
+        self._save_price_history(cursor, items)
+        if self.search_index:
+            self.search_index.add(items, conn)
         conn.commit()
-        conn.close()
         logger.info(f"Saved {len(items)} items to {self.output_file}")
+
+        if self.refresh_aggregates:
+            # Own transaction after the save: a full rebuild, so bulk writers (crawl.merge) turn it off
+            try:
+                AnalyticsStore(self.output_file).refresh(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not refresh analytics aggregates: {e}")
+        conn.close()
@@ -0,0 +1,186 @@
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger("jumia_scraper.taskqueue")
+
+
+@dataclass
+class Task:
+    id: int
+    key: str
+    payload: Dict[str, Any]
+    attempts: int
+    owner: str
+
+
+class TaskQueue:
+    """
+    Durable work queue in one SQLite file (WAL mode), shared by any number of
+    worker processes on the same host. WAL relies on shared memory, so the
+    file must live on a local disk; network filesystems are not supported.
+    Workers on other hosts go through queueserver.serve_queue instead.
+
+    lease() hands a pending task to one worker for `visibility` seconds; a
+    task whose lease runs out without complete()/fail() (the worker crashed
+    or hung) becomes visible again and is re-leased. Tasks are unique per
+    key, so enqueueing the same crawl twice is a no-op. Finished tasks keep
+    their result text until the coordinator marks them merged.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # Workers share their rate limiter state in the queue database (see ratelimit.SharedRateLimiter)
+        self.rate_limit_db = db_path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL UNIQUE,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    lease_expires REAL,
+                    created_at REAL,
+                    finished_at REAL,
+                    error TEXT,
+                    result TEXT,
+                    merged INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, id)")
+
+    @contextmanager
+    def _connect(self):
+        # isolation_level=None: transactions are opened explicitly (BEGIN IMMEDIATE) where they matter
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # ---------- Producer ----------
+
+    def put(self, tasks: Iterable[Dict[str, Any]], key_fields: Iterable[str]) -> int:
+        """Enqueue payload dicts, keyed by key_fields; returns how many were new"""
+        key_fields = list(key_fields)
+        now = time.time()
+        rows = [("|".join(str(t[f]) for f in key_fields), json.dumps(t, ensure_ascii=False), now) for t in tasks]
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO tasks (key, payload, created_at) VALUES (?, ?, ?)", rows)
+            added = conn.total_changes - before
+            conn.execute("COMMIT")
+        return added
+
+    # ---------- Worker ----------
+
+    def lease(self, owner: str, visibility: float = 300.0, max_attempts: int = 3) -> Optional[Task]:
+        """
+        Claim the oldest visible task for `visibility` seconds, or None when
+        nothing is available. Expired leases that already used max_attempts
+        (the page keeps crashing or hanging its worker, so fail() never ran)
+        are parked as failed instead of being handed out again.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            # IMMEDIATE takes the write lock up front, so two workers never claim the same row
+            conn.execute("BEGIN IMMEDIATE")
+            parked = conn.execute(
+                "UPDATE tasks SET status = 'failed', error = 'lease expired on every attempt', "
+                "lease_expires = NULL, finished_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, max_attempts),
+            ).rowcount
+            if parked:
+                logger.warning(f"Parked {parked} tasks whose lease expired {max_attempts} times")
+            row = conn.execute(
+                "SELECT id, key, payload, attempts FROM tasks "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (owner, now + visibility, row["id"]),
+            )
+            conn.execute("COMMIT")
+        return Task(row["id"], row["key"], json.loads(row["payload"]), row["attempts"] + 1, owner)
+
+    def _finish(self, task: Task, sql: str, params: tuple) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(sql + " WHERE id = ? AND owner = ? AND status = 'leased'", (*params, task.id, task.owner))
+        if cursor.rowcount == 0:
+            # Lease expired and another worker took the task over; its outcome wins
+            logger.warning(f"Lost lease on task {task.key}")
+            return False
+        return True
+
+    def heartbeat(self, task: Task, visibility: float = 300.0) -> bool:
+        """Extend a lease still held by this worker"""
+        return self._finish(task, "UPDATE tasks SET lease_expires = ?", (time.time() + visibility,))
+
+    def complete(self, task: Task, result: Optional[str] = None) -> bool:
+        return self._finish(
+            task, "UPDATE tasks SET status = 'done', finished_at = ?, result = ?, error = NULL", (time.time(), result)
+        )
+
+    def fail(self, task: Task, error: str, max_attempts: int = 3) -> bool:
+        """Return the task to the queue, or park it as failed after max_attempts"""
+        status = "failed" if task.attempts >= max_attempts else "pending"
+        return self._finish(
+            task, "UPDATE tasks SET status = ?, error = ?, lease_expires = NULL, finished_at = ?",
+            (status, error, time.time()),
+        )
+
+    # ---------- Coordinator ----------
+
+    def unmerged(self, limit: int = 100) -> List[sqlite3.Row]:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT id, key, result FROM tasks WHERE status = 'done' AND merged = 0 ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+
+    def mark_merged(self, ids: Iterable[int]):
+        ids = list(ids)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE tasks SET merged = 1, result = NULL WHERE id IN ({','.join('?' * len(ids))})", ids
+            )
+
+    def retry_failed(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("UPDATE tasks SET status = 'pending', attempts = 0 WHERE status = 'failed'").rowcount
+
+    def counts(self) -> Dict[str, int]:
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT CASE WHEN status = 'leased' AND lease_expires < ? THEN 'expired' ELSE status END AS s, "
+                "COUNT(*) FROM tasks GROUP BY s",
+                (now,),
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def remaining(self) -> int:
+        counts = self.counts()
+        return counts.get("pending", 0) + counts.get("leased", 0) + counts.get("expired", 0)
+
+
+def open_queue(location: str):
+    """TaskQueue for a local SQLite path, RemoteTaskQueue for an http(s) URL of a queue server"""
+    if location.startswith(("http://", "https://")):
+        from .queueserver import RemoteTaskQueue
+
+        return RemoteTaskQueue(location)
+    return TaskQueue(location)
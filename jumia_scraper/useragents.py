@@ -0,0 +1,96 @@
+import json
+import os
+import random
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger("jumia_scraper.useragents")
+
+# Desktop Chromium profiles shipped with the package; the scraper drives Chromium,
+# so Firefox/Safari strings would contradict navigator.* and the client hints.
+BUNDLED_USER_AGENTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "user_agents.json")
+
+FALLBACK_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+@dataclass(frozen=True)
+class UserAgentProfile:
+    """A user agent together with the viewport and client-hint headers that match it"""
+    user_agent: str
+    weight: float = 1.0
+    platform: str = "Windows"
+    viewport: Dict[str, int] = field(default_factory=lambda: {"width": 1920, "height": 1080})
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def context_options(self) -> Dict[str, Any]:
+        """Keyword arguments for browser.new_context()"""
+        return {
+            "user_agent": self.user_agent,
+            "viewport": dict(self.viewport),
+            "screen": dict(self.viewport),
+            "extra_http_headers": dict(self.headers),
+        }
+
+
+FALLBACK_PROFILE = UserAgentProfile(
+    user_agent=FALLBACK_USER_AGENT,
+    headers={
+        "sec-ch-ua": '"Chromium";v="120", "Google Chrome";v="120", "Not-A.Brand";v="99"',
+        "sec-ch-ua-mobile": "?0",
+        "sec-ch-ua-platform": '"Windows"',
+    },
+)
+
+
+class UserAgentPool:
+    """
+    Weighted user-agent sampling with sticky assignment.
+
+    for_context(key) hands out one profile per key (e.g. a country and exit
+    proxy, or a worker/context id) and keeps returning it, so a browsing
+    session never changes identity halfway through.
+    """
+
+    def __init__(self, profiles: List[UserAgentProfile], seed: Optional[int] = None):
+        self.profiles = profiles or [FALLBACK_PROFILE]
+        self._weights = [max(p.weight, 0.0) or 1.0 for p in self.profiles]
+        self._rng = random.Random(seed)
+        self._assigned: Dict[str, UserAgentProfile] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str, seed: Optional[int] = None) -> "UserAgentPool":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            profiles = [UserAgentProfile(**entry) for entry in entries]
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Could not load user agents from {path}: {e}; using the fallback profile")
+            profiles = []
+        return cls(profiles, seed=seed)
+
+    def sample(self) -> UserAgentProfile:
+        with self._lock:
+            return self._rng.choices(self.profiles, weights=self._weights, k=1)[0]
+
+    def for_context(self, key: str) -> UserAgentProfile:
+        with self._lock:
+            profile = self._assigned.get(key)
+            if profile is None:
+                profile = self._rng.choices(self.profiles, weights=self._weights, k=1)[0]
+                self._assigned[key] = profile
+            return profile
+
+    def release(self, key: str):
+        """Forget a sticky assignment so the next context under key gets a fresh draw"""
+        with self._lock:
+            self._assigned.pop(key, None)
+
+
+@lru_cache(maxsize=None)
+def get_pool(path: Optional[str] = None) -> UserAgentPool:
+    """Process-wide pool, loaded once per file (the bundled list by default)"""
+    return UserAgentPool.from_file(path or BUNDLED_USER_AGENTS)
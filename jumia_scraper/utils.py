@@ -1,5 +1,4 @@
 import logging
-from fake_useragent import UserAgent
 
 def setup_logging(level=logging.INFO):
     logging.basicConfig(
@@ -12,21 +11,13 @@ def setup_logging(level=logging.INFO):
     return logging.getLogger("jumia_scraper")
 
 def get_random_user_agent():
-    try:
-        ua = UserAgent()
-        return ua.random
-    except Exception:
-        return "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    """Weighted draw from the bundled user-agent pool (loaded once per process)"""
+    from .useragents import get_pool
+    return get_pool().sample().user_agent
 
 def clean_price(price_str: str) -> float:
     """
     Cleans price string like 'KSh 12,345' to float 12345.0
     """
-    if not price_str:
-        return 0.0
-    # Remove currency symbols and commas
-    cleaned = ''.join(c for c in price_str if c.isdigit() or c == '.')
-    try:
-        return float(cleaned)
-    except ValueError:
-        return 0.0
+    from .normalize import clean_price as _clean_price
+    return _clean_price(price_str)
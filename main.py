@@ -1,8 +1,6 @@
 import argparse
 import sys
-from jumia_scraper.config import ScraperConfig
-from jumia_scraper.scraper import JumiaScraper
-from jumia_scraper.storage import StorageHandler
+from jumia_scraper.archive import ARCHIVE_MODES
 from jumia_scraper.utils import setup_logging
 
 logger = setup_logging()
@@ -10,53 +8,97 @@ logger = setup_logging()
 def main():
     parser = argparse.ArgumentParser(description="Jumia Scraper")
     parser.add_argument("--country", type=str, default="ke", help="Country code (ng, ke, eg, gh, ma, dz, ci, sn, ug)")
-    parser.add_argument("--category", type=str, required=True, help="Category URL or path (e.g. /phones-tablets/)")
+    parser.add_argument("--category", type=str, default=None, help="Category URL or path (e.g. /phones-tablets/)")
+    parser.add_argument("--keyword", type=str, default=None,
+                        help="Only scrape products whose name contains every word; without --category, searches the whole site")
     parser.add_argument("--pages", type=int, default=1, help="Number of pages to scrape")
     parser.add_argument("--output", type=str, default="jumia_products.jsonl", help="Output file path")
     parser.add_argument("--format", type=str, default="jsonl", help="Output format (jsonl, csv, sqlite)")
+    parser.add_argument("--fields", type=str, default=None,
+                        help="Comma separated fields to extract and store, e.g. current_price,discount_percentage "
+                             "(product_id and crawled_at are always kept)")
     parser.add_argument("--headless", action="store_true", default=True, help="Run in headless mode")
     parser.add_argument("--no-headless", action="store_false", dest="headless", help="Run in headful mode")
+    parser.add_argument("--base-url", type=str, default=None, help="Override the site root (e.g. a local fixture server)")
+    parser.add_argument("--images-dir", type=str, default=None, help="Download product images (and thumbnails) into this directory")
+    parser.add_argument("--metrics-file", type=str, default=None, help="Write a JSON run metrics report to this path")
+    parser.add_argument("--archive-dir", type=str, default=None, help="HTML snapshot archive directory")
+    parser.add_argument("--archive-mode", type=str, default="record", choices=ARCHIVE_MODES,
+                        help="With --archive-dir: record fetched pages or replay them offline")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port while running")
 
     args = parser.parse_args()
+    if not args.category and not args.keyword:
+        parser.error("--category or --keyword is required")
 
-    # Construct full URL if only path is given
-    base_url_map = {
-        "ng": "https://www.jumia.com.ng",
-        "ke": "https://www.jumia.co.ke",
-        "eg": "https://www.jumia.com.eg",
-        "gh": "https://www.jumia.com.gh",
-        "ma": "https://www.jumia.ma",
-        "dz": "https://www.jumia.dz",
-        "ci": "https://www.jumia.ci",
-        "sn": "https://www.jumia.sn",
-        "ug": "https://www.jumia.ug"
-    }
-    base_url = base_url_map.get(args.country, "https://www.jumia.co.ke")
-    
-    category_url = args.category
-    if not category_url.startswith("http"):
-        if not category_url.startswith("/"):
-            category_url = "/" + category_url
-        category_url = base_url + category_url
+    # Imported after argument parsing so --help and bad arguments never load Playwright/pydantic
+    from jumia_scraper.config import ScraperConfig
+    from jumia_scraper.scraper import JumiaScraper
+    from jumia_scraper.storage import StorageHandler
+    from jumia_scraper.metrics import serve_prometheus
+    from jumia_scraper.batch import select_fields
+
+    fields = None
+    if args.fields:
+        try:
+            # --images-dir needs the image URLs even when they were not asked for
+            fields = select_fields(args.fields.split(",") + (["image_url"] if args.images_dir else []))
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.category:
+        category_url = ScraperConfig.build_category_url(args.country, args.category, args.base_url)
+    else:
+        category_url = ScraperConfig.build_search_url(args.country, args.keyword, args.base_url)
 
     config = ScraperConfig(
         COUNTRY_CODE=args.country,
+        BASE_URL=args.base_url,
         CATEGORY_URL=category_url,
+        KEYWORD=args.keyword,
         MAX_PAGES=args.pages,
         OUTPUT_FILE=args.output,
         OUTPUT_FORMAT=args.format,
-        HEADLESS=args.headless
+        FIELDS=fields,
+        HEADLESS=args.headless,
+        ARCHIVE_DIR=args.archive_dir,
+        ARCHIVE_MODE=args.archive_mode if args.archive_dir else "off",
+        IMAGES_DIR=args.images_dir,
+        METRICS_FILE=args.metrics_file,
+        METRICS_PORT=args.metrics_port,
     )
 
     logger.info(f"Starting scraper for {config.CATEGORY_URL}")
     
     scraper = JumiaScraper(config)
+    metrics_server = serve_prometheus(scraper.metrics, config.METRICS_PORT) if config.METRICS_PORT else None
     products = scraper.run()
     
     logger.info(f"Scraped {len(products)} products")
     
     storage = StorageHandler(config.OUTPUT_FILE, config.OUTPUT_FORMAT)
-    storage.save(products)
+    with scraper.metrics.stage("storage"):
+        storage.save(products)
+
+    if config.IMAGES_DIR:
+        from jumia_scraper.images import ImageDownloader, ImageStore, image_urls
+
+        downloader = ImageDownloader(
+            ImageStore(config.IMAGES_DIR),
+            workers=config.IMAGE_WORKERS,
+            per_host=config.IMAGE_PER_HOST,
+            thumbnail_size=(config.THUMBNAIL_SIZE, config.THUMBNAIL_SIZE) if config.THUMBNAIL_SIZE else None,
+        )
+        with scraper.metrics.stage("images"):
+            image_stats = downloader.download(image_urls(products))
+        scraper.metrics.count("images_downloaded", image_stats["downloaded"])
+        scraper.metrics.count("images_failed", image_stats["failed"])
+    scraper.metrics.finish()
+
+    if config.METRICS_FILE:
+        scraper.metrics.write_json(config.METRICS_FILE)
+    if metrics_server:
+        metrics_server.shutdown()
 
 if __name__ == "__main__":
     main()